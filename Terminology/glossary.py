@@ -0,0 +1,166 @@
+"""
+This module contains the terminology enforcement engine.
+
+Glossaries (source term -> target term) are compiled into a character trie and enforced
+in a single left-to-right pass over the text:
+- Longest match wins, so "cancerous tumor" is preferred over "cancerous" and "cancer"
+- Matches must start and end on word boundaries, "cancer" never matches inside "cancers"
+- Matching is case-insensitive and the replacement follows the case of the matched text
+
+The cost is O(text length x longest term) instead of O(terms x text length), and the
+engine reports every enforced term so QA can verify terminology without rescanning.
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Terminology import medical
+
+
+# domain -> target language -> glossary
+DOMAIN_GLOSSARIES: Dict[str, Dict[str, Dict[str, str]]] = {
+    "medical": {"es": medical.english_to_spanish},
+}
+
+_TERMINAL = ""  # children are single characters, so the empty string can mark a term end
+
+
+def is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def match_case(matched_text: str, target_term: str) -> str:
+    """
+    Apply the case of the matched source text to the target term
+    """
+    if matched_text.isupper() and len(matched_text) > 1:
+        return target_term.upper()
+    if matched_text[:1].isupper():
+        return target_term[:1].upper() + target_term[1:]
+    return target_term
+
+
+class GlossaryTrie:
+    """
+    Character trie of glossary terms for longest-match lookups
+    """
+    def __init__(self, terms: Iterable[Tuple[str, str]] = ()):
+        self.root: dict = {}
+        self.size = 0
+        for source_term, target_term in terms:
+            self.add(source_term, target_term)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, source_term: str, target_term: str):
+        """Add a term, a later duplicate overrides the earlier translation"""
+        source_term = source_term.strip()
+        if not source_term:
+            return
+        node = self.root
+        for char in source_term:
+            node = node.setdefault(char.lower(), {})
+        if _TERMINAL not in node:
+            self.size += 1
+        node[_TERMINAL] = (source_term, target_term)
+
+    def match_at(self, text: str, start: int) -> Optional[Tuple[int, str, str]]:
+        """
+        Find the longest term starting at a position and ending on a word boundary
+        Args:
+            text (str): The text to search
+            start (int): The position to match from
+
+        Returns:
+            tuple[int, str, str]: The end position, source term and target term, None if nothing matches
+        """
+        node = self.root
+        longest_match = None
+        position = start
+        text_length = len(text)
+        while position < text_length:
+            node = node.get(text[position].lower())
+            if node is None:
+                break
+            position += 1
+            if _TERMINAL in node and (position == text_length or not is_word_char(text[position])):
+                longest_match = (position, *node[_TERMINAL])
+        return longest_match
+
+
+class CombinedGlossary:
+    """
+    Several glossaries searched together, e.g. session phrases over a compiled domain store
+    The longest match wins, on equal length the earlier glossary takes precedence.
+    """
+    def __init__(self, *glossaries):
+        self.glossaries = [glossary for glossary in glossaries if glossary is not None and len(glossary)]
+        self.lookups = [glossary.match_at for glossary in self.glossaries]
+        if len(self.lookups) == 1:
+            self.match_at = self.lookups[0]  # nothing to combine, skip the extra call per position
+
+    def __len__(self) -> int:
+        return sum(len(glossary) for glossary in self.glossaries)
+
+    def match_at(self, text: str, start: int) -> Optional[Tuple[int, str, str]]:
+        longest_match = None
+        for lookup in self.lookups:
+            match = lookup(text, start)
+            if match and (longest_match is None or match[0] > longest_match[0]):
+                longest_match = match
+        return longest_match
+
+
+def enforce_terminology(text: str, glossary) -> Tuple[str, List[Dict[str, str]]]:
+    """
+    Replace glossary terms in a single left-to-right longest-match pass
+    Args:
+        text (str): The text to enforce the terminology on
+        glossary: Any glossary with a match_at(text, start) lookup e.g. GlossaryTrie
+
+    Returns:
+        tuple[str, list[dict]]: The new text and the enforced terms
+    """
+    if not text or not len(glossary):
+        return text, []
+
+    output = []
+    enforced_terms = []
+    position = 0
+    copied_until = 0
+    text_length = len(text)
+    while position < text_length:
+        # terms can only start at a word boundary
+        if position and is_word_char(text[position - 1]):
+            position += 1
+            continue
+        match = glossary.match_at(text, position)
+        if match is None:
+            position += 1
+            continue
+
+        end, source_term, target_term = match
+        replacement = match_case(text[position:end], target_term)
+        output.append(text[copied_until:position])
+        output.append(replacement)
+        enforced_terms.append({"source_term": source_term, "target_term": replacement})
+        position = copied_until = end
+
+    output.append(text[copied_until:])
+    return "".join(output), enforced_terms
+
+
+def get_domain_terms(domain: str, target_language: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    Get the glossary terms of a domain for a target language
+    """
+    glossary = DOMAIN_GLOSSARIES.get(domain or "", {}).get(target_language, {})
+    return tuple(glossary.items())
+
+
+@lru_cache(maxsize=128)
+def compile_domain_glossary(domain: str, target_language: str) -> GlossaryTrie:
+    """
+    Compile the glossary of a domain into a trie, once per (domain, target language)
+    """
+    return GlossaryTrie(get_domain_terms(domain, target_language))
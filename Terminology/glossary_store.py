@@ -0,0 +1,251 @@
+"""
+This module contains the memory-mapped glossary store.
+
+Large glossaries are compiled once from TBX, CSV or JSON term lists into marisa-trie
+files. Workers memory-map the files, so they start instantly and every process shares
+the same pages through the OS page cache instead of each one parsing a Python module.
+
+Files are named {domain}.{source_language}-{target_language}.marisa inside GLOSSARY_DIR.
+Keys are lowercased source terms, values are "source term\\0target term" in UTF-8.
+
+Usage:
+    python -m Terminology.glossary_store build terms.tbx --domain medical --source en --target es
+    python -m Terminology.glossary_store lookup --domain medical --source en --target es "cancerous tumor"
+    python -m Terminology.glossary_store prefix --domain medical --source en --target es "cancer"
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+import xml.etree.ElementTree as ElementTree
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+import marisa_trie
+
+from config.settings import config
+from Terminology.glossary import is_word_char
+
+
+MAX_TERM_LENGTH = 256  # characters looked ahead when matching terms in a text
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+
+def get_glossary_path(domain: str, source_language: str, target_language: str) -> Path:
+    return Path(config.GLOSSARY_DIR) / f"{domain}.{source_language}-{target_language}.marisa"
+
+
+def read_csv_terms(file_path: str, source_language: str, target_language: str) -> Iterator[Tuple[str, str]]:
+    """
+    Read terms from a CSV file with language code headers (en,es) or source,target columns
+    """
+    with open(file_path, "r", encoding="utf-8", newline="") as file:
+        reader = csv.DictReader(file)
+        source_column = source_language if source_language in reader.fieldnames else "source"
+        target_column = target_language if target_language in reader.fieldnames else "target"
+        for row in reader:
+            yield row[source_column], row[target_column]
+
+
+def read_json_terms(file_path: str, source_language: str, target_language: str) -> Iterator[Tuple[str, str]]:
+    """
+    Read terms from a JSON object {"source": "target"} or a list of {"en": ..., "es": ...} records
+    """
+    with open(file_path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    if isinstance(data, dict):
+        yield from data.items()
+        return
+    for record in data:
+        yield (record.get(source_language, record.get("source")),
+               record.get(target_language, record.get("target")))
+
+
+def read_tbx_terms(file_path: str, source_language: str, target_language: str) -> Iterator[Tuple[str, str]]:
+    """
+    Stream terms from a TBX file, pairing the first source and target term of each entry
+    """
+    entry_terms = {}
+    for _, element in ElementTree.iterparse(file_path, events=("end",)):
+        tag = element.tag.rsplit("}", 1)[-1]
+        if tag == "langSet":
+            language = (element.get(XML_LANG) or element.get("lang") or "").split("-")[0].lower()
+            term = next((child.text for child in element.iter() if child.tag.rsplit("}", 1)[-1] == "term"), None)
+            if term and language not in entry_terms:
+                entry_terms[language] = term
+        elif tag == "termEntry" or tag == "conceptEntry":
+            if source_language in entry_terms and target_language in entry_terms:
+                yield entry_terms[source_language], entry_terms[target_language]
+            entry_terms = {}
+            element.clear()  # keep memory flat on large files
+
+
+TERM_READERS = {
+    ".csv": read_csv_terms,
+    ".json": read_json_terms,
+    ".tbx": read_tbx_terms,
+    ".xml": read_tbx_terms,
+}
+
+
+def build_glossary(input_path: str, domain: str, source_language: str, target_language: str,
+                   output_path: str = None) -> Path:
+    """
+    Compile a term list into a marisa-trie glossary file
+    Args:
+        input_path (str): TBX, CSV or JSON term list
+        domain (str): The glossary domain e.g. "medical"
+        source_language (str): Source language code
+        target_language (str): Target language code
+        output_path (str): Optional output file, defaults to the GLOSSARY_DIR naming scheme
+
+    Returns:
+        Path: The compiled glossary file
+    """
+    reader = TERM_READERS.get(Path(input_path).suffix.lower())
+    if reader is None:
+        raise ValueError(f"Unsupported glossary format: {input_path}")
+
+    # later duplicates override earlier ones, like the in-memory glossaries
+    terms = {}
+    for source_term, target_term in reader(input_path, source_language, target_language):
+        if source_term and target_term:
+            source_term = source_term.strip()
+            terms[source_term.lower()] = f"{source_term}\0{target_term.strip()}".encode("utf-8")
+
+    output_path = Path(output_path or get_glossary_path(domain, source_language, target_language))
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    marisa_trie.BytesTrie(terms.items()).save(str(output_path))
+    return output_path
+
+
+class GlossaryStore:
+    """
+    Read-only memory-mapped glossary, usable wherever a GlossaryTrie is
+    """
+    def __init__(self, path: str):
+        self.path = str(path)
+        self.trie = marisa_trie.BytesTrie()
+        self.trie.mmap(self.path)
+
+    def __len__(self) -> int:
+        return len(self.trie)
+
+    def _decode(self, key: str) -> Tuple[str, str]:
+        source_term, target_term = self.trie[key][0].decode("utf-8").split("\0", 1)
+        return source_term, target_term
+
+    def lookup(self, term: str) -> Optional[str]:
+        """Get the target term of an exact (case-insensitive) source term"""
+        key = term.strip().lower()
+        return self._decode(key)[1] if key in self.trie else None
+
+    def terms_with_prefix(self, prefix: str, limit: int = 100) -> list[Tuple[str, str]]:
+        """Get the terms starting with a prefix e.g. for autocomplete"""
+        terms = []
+        for key in self.trie.iterkeys(prefix.lower()):
+            terms.append(self._decode(key))
+            if len(terms) >= limit:
+                break
+        return terms
+
+    def match_at(self, text: str, start: int) -> Optional[Tuple[int, str, str]]:
+        """
+        Find the longest term starting at a position and ending on a word boundary
+        Same contract as GlossaryTrie.match_at, so enforce_terminology accepts both.
+        """
+        window = text[start:start + MAX_TERM_LENGTH]
+        lowered_window = window.lower()
+        if len(lowered_window) != len(window):
+            return None  # lowercasing changed offsets, positions can't be mapped back
+        for key in sorted(self.trie.prefixes(lowered_window), key=len, reverse=True):
+            end = start + len(key)
+            if end == len(text) or not is_word_char(text[end]):
+                return (end, *self._decode(key))
+        return None
+
+
+MAX_MISSING_GLOSSARIES = 1024
+
+# (domain, source_language, target_language) -> monotonic time the glossary was found missing
+_missing_glossaries: Dict[Tuple[str, str, str], float] = {}
+
+
+def find_glossary_path(domain: str, source_language: str, target_language: str) -> Optional[Path]:
+    """
+    The compiled glossary file of a domain and language pair, None when it wasn't built
+    With an "auto" source language any source language for the target is used.
+    """
+    if source_language and source_language != "auto":
+        path = get_glossary_path(domain, source_language, target_language)
+        return path if path.exists() else None
+    return next(iter(sorted(Path(config.GLOSSARY_DIR).glob(f"{domain}.*-{target_language}.marisa"))), None)
+
+
+@lru_cache(maxsize=64)
+def open_glossary_store(domain: str, source_language: str, target_language: str) -> GlossaryStore:
+    """
+    Memory-map the glossary of a domain and language pair once
+    Raises:
+        FileNotFoundError: The glossary wasn't built, lru_cache doesn't keep the miss
+    """
+    path = find_glossary_path(domain, source_language, target_language)
+    if path is None:
+        raise FileNotFoundError(f"No glossary built for {domain} {source_language}-{target_language}")
+    return GlossaryStore(path)
+
+
+def get_glossary_store(domain: str, source_language: str, target_language: str) -> Optional[GlossaryStore]:
+    """
+    Get the compiled glossary of a domain and language pair, None when it wasn't built
+    A missing glossary is looked up again after config.GLOSSARY_RECHECK_INTERVAL, so one built
+    while the process runs is picked up without a restart.
+    """
+    if not domain:
+        return None
+    key = (domain, source_language, target_language)
+    missing_since = _missing_glossaries.get(key)
+    if missing_since is not None and time.monotonic() - missing_since < config.GLOSSARY_RECHECK_INTERVAL:
+        return None
+    try:
+        store = open_glossary_store(domain, source_language, target_language)
+    except FileNotFoundError:
+        if len(_missing_glossaries) >= MAX_MISSING_GLOSSARIES:
+            _missing_glossaries.clear()
+        _missing_glossaries[key] = time.monotonic()
+        return None
+    _missing_glossaries.pop(key, None)
+    return store
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build and query memory-mapped glossaries")
+    parser.add_argument("command", choices=["build", "lookup", "prefix"])
+    parser.add_argument("value", help="Term list to build from, or the term/prefix to query")
+    parser.add_argument("--domain", required=True)
+    parser.add_argument("--source", default="en", help="Source language code")
+    parser.add_argument("--target", default="es", help="Target language code")
+    parser.add_argument("--output", help="Output file for build")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        output_path = build_glossary(args.value, args.domain, args.source, args.target, args.output)
+        print(f"Built {len(GlossaryStore(output_path))} terms into {output_path}")
+        return 0
+
+    store = get_glossary_store(args.domain, args.source, args.target)
+    if store is None:
+        print(f"No glossary built for {args.domain} {args.source}-{args.target}")
+        return 1
+    if args.command == "lookup":
+        print(store.lookup(args.value))
+    else:
+        for source_term, target_term in store.terms_with_prefix(args.value):
+            print(f"{source_term}\t{target_term}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,4 @@ english_to_spanish = {
     "cancer": "cáncer",
     "cancerous": "canceroso",
     "cancerous tumor": "tumor canceroso",
-    "cancerous tumor": "tumor canceroso",
-    "cancerous tumor": "tumor canceroso",
-    "cancerous tumor": "tumor canceroso",
 }
\ No newline at end of file
@@ -25,7 +25,11 @@ Business Intelligence:
 - Cost Optimization: Which service combinations provide best value
 - Scalability Insights: When to upgrade services or add capacity
 """
-from agent_architecture.States.translation_state import TranslationState
+from agent_architecture.States.memory_handles import get_memory
+from agent_architecture.States.translation_state import FULL_STATE_PROFILE, TranslationState
+from agent_architecture.States.translation_memory import get_translation_memory_store
+from config.settings import config
+from db.write_behind import get_write_behind_queue
 
 
 def orchestrator_agent(state: TranslationState) -> dict:
@@ -34,6 +38,18 @@ def orchestrator_agent(state: TranslationState) -> dict:
     quality_issues = state.get("quality_issues", [])
     translated_text = state["translated_text"]
     
+    # Bounded memory structures: the translation memory is updated in place and
+    # the conversation context is trimmed to the limit after appending (a copy of it in the full profile).
+    # A memory handle (lean profile) is updated in place and nothing is copied into the state,
+    # a lean run without one has no conversation to remember and only persists the translation.
+    full_profile = config.STATE_PROFILE == FULL_STATE_PROFILE
+    memory = get_memory(state)
+    translation_memory = get_translation_memory_store(state) if full_profile or memory is not None else None
+    if memory is not None:
+        conversation_context = memory.setdefault("conversation_context", [])
+    else:
+        conversation_context = list(state.get("conversation_context", []))
+
     # Prepare final response
     if quality_score >= 0.6:
         # Acceptable translation
@@ -41,19 +57,28 @@ def orchestrator_agent(state: TranslationState) -> dict:
         output_text = translated_text
         
         # Update translation memory for future consistency
-        translation_memory = state.get("translation_memory", {})
-        translation_memory[state["source_text"]] = translated_text
+        if translation_memory is not None:
+            translation_memory.put(state["source_text"], state.get("target_language", "es"), translated_text)
         
         # Update conversation context
-        conversation_context = state.get("conversation_context", [])
-        conversation_context.append(f"Source: {state['source_text']} → Target: {translated_text}")
+        context_entry = f"Source: {state['source_text']} → Target: {translated_text}"
+        conversation_context.append(context_entry)
+        del conversation_context[:-config.CONVERSATION_CONTEXT_SIZE]
+
+        # Persist the memory updates in the background, off the response path
+        if config.MEMORY_PERSISTENCE_ENABLED:
+            write_behind_queue = get_write_behind_queue()
+            write_behind_queue.enqueue_translation_memory(
+                state["source_text"], state.get("target_language", "es"), translated_text
+            )
+            # only a conversation's context is worth keeping, a standalone translation has no session
+            if state.get("session_id"):
+                write_behind_queue.enqueue_conversation_context(state["session_id"], context_entry)
         
     else:
         # Quality issues detected
         final_status = "needs_review"
         output_text = f"Translation quality issues detected: {', '.join(quality_issues)}"
-        translation_memory = state.get("translation_memory", {})
-        conversation_context = state.get("conversation_context", [])
     
     # Generate summary for user
     service_used = state.get("service_used", "unknown")
@@ -65,10 +90,14 @@ def orchestrator_agent(state: TranslationState) -> dict:
         "issues": quality_issues if quality_issues else None
     }
     
-    return {
+    update = {
         "final_status": final_status,
         "translation_summary": summary,
-        "translation_memory": translation_memory,
-        "conversation_context": conversation_context[-10:],  # Keep last 10 for memory management
         "messages": [f"Orchestrator: {final_status} - Quality: {quality_score:.2f}"]
-    }
\ No newline at end of file
+    }
+    if translation_memory is not None:
+        update["translation_memory_metrics"] = translation_memory.get_metrics()
+    if memory is None and full_profile:
+        update["translation_memory"] = translation_memory
+        update["conversation_context"] = conversation_context
+    return update
\ No newline at end of file
@@ -27,14 +27,99 @@ Localization: Currency, dates, phone numbers in target format
 
 Professional Frameworks:
 
-BLEU/METEOR Scoring: Automated metrics for baseline quality
+BLEU/METEOR Scoring: Automated metrics for baseline quality (offline corpus BLEU/chrF in evaluation/harness.py)
 DQF (Dynamic Quality Framework): Professional translation industry standard
 Custom Rubrics: Domain-specific quality criteria
 
 Critical Innovation: Most MT systems stop at linguistic accuracy. This agent evaluates like a professional translation agency.
 """
 
+import re
+
 from agent_architecture.States.translation_state import TranslationState
+from agent_architecture.States.token_cache import SENTENCE_TERMINATORS, get_tokens, tokenize, update_token_cache
+from config.settings import config
+
+
+# Untranslated content detection
+MIN_CONTENT_TOKEN_LENGTH = 3  # short words ("de", "a", "no") are shared across languages
+UNTRANSLATED_RATIO_THRESHOLD = 0.3  # share of source content tokens found verbatim in the translation
+PROTECTED_TERMS = {"soundworks", "roland", "windows", "mac", "macos"}  # product names
+PROTECTED_PHRASES = {"dw soundworks", "pro tools", "logic pro", "studio one"}  # multiword product names
+PROTECTED_TOKEN_PATTERN = re.compile(
+    r"^(?:[\d.,:/+-]+"  # numbers, dates, versions, phone numbers
+    r"|\S+@\S+"  # emails
+    r"|https?://\S+"  # urls
+    r"|\w*\d\w*"  # alphanumeric codes and models (HP18, Rubix22)
+    r"|[A-Z]{2,}\w*"  # acronyms (OS, DAW)
+    r"|[a-z]+[A-Z]\w*)$"  # camelCase product names (iPhone)
+)
+
+
+def index_phrases(phrases: set[str]) -> dict[str, list[tuple[str, ...]]]:
+    """
+    Index multiword phrases by their first token, as tuples of lowercased tokens
+    """
+    index = {}
+    for phrase in phrases:
+        phrase_tokens = tuple(token.lower() for token in tokenize(phrase))
+        index.setdefault(phrase_tokens[0], []).append(phrase_tokens)
+    return index
+
+
+PROTECTED_PHRASE_INDEX = index_phrases(PROTECTED_PHRASES)
+
+
+def get_protected_tokens(tokens: list[str]) -> set[str]:
+    """
+    Get the source tokens that are expected to stay untranslated
+    Named entities are approximated as capitalized tokens that don't start a sentence.
+    Multiword product names are matched on consecutive tokens.
+    Args:
+        tokens (list[str]): The source tokens
+
+    Returns:
+        set[str]: The lowercased tokens to allowlist
+    """
+    protected = set()
+    sentence_start = True
+    lowered_tokens = [token.lower() for token in tokens]
+    for position, token in enumerate(tokens):
+        for phrase_tokens in PROTECTED_PHRASE_INDEX.get(lowered_tokens[position], ()):
+            if tuple(lowered_tokens[position:position + len(phrase_tokens)]) == phrase_tokens:
+                protected.update(phrase_tokens)
+        if token in SENTENCE_TERMINATORS:
+            sentence_start = True
+            continue
+        if (token.lower() in PROTECTED_TERMS
+                or PROTECTED_TOKEN_PATTERN.match(token)
+                or (token[0].isupper() and not sentence_start)):
+            protected.add(token.lower())
+        sentence_start = False
+    return protected
+
+
+def get_untranslated_tokens(source_tokens: list[str], translated_tokens: list[str]) -> tuple[list[str], float]:
+    """
+    Find the source content tokens that appear verbatim in the translation
+    Runs in linear time using set intersections.
+    Args:
+        source_tokens (list[str]): The source tokens
+        translated_tokens (list[str]): The translated tokens
+
+    Returns:
+        tuple[list[str], float]: The untranslated tokens and their ratio over the source content tokens
+    """
+    protected = get_protected_tokens(source_tokens)
+    content_tokens = {
+        token.lower() for token in source_tokens
+        if len(token) >= MIN_CONTENT_TOKEN_LENGTH and token not in SENTENCE_TERMINATORS
+    } - protected
+    if not content_tokens:
+        return [], 0.0
+
+    untranslated = content_tokens & {token.lower() for token in translated_tokens}
+    return sorted(untranslated), len(untranslated) / len(content_tokens)
 
 
 def qa_agent(translation_state: TranslationState) -> dict:
@@ -64,17 +149,21 @@ def qa_agent(translation_state: TranslationState) -> dict:
         quality_issues.append("Suspicious length difference")
         quality_score -= 0.2
     
-    # Check for untranslated text (common issue)
-    if any(word in translated_text for word in source_text.split()[:3]):
-        untranslated_words = [word for word in source_text.split()[:3] 
-                            if word in translated_text]
-        if len(untranslated_words) > 1:
-            quality_issues.append(f"Possibly untranslated words: {untranslated_words}")
-            quality_score -= 0.1
+    # Check for untranslated text (common issue), tokens are cached on the state for reuse
+    source_tokens = get_tokens(translation_state, "source_text")
+    translated_tokens = get_tokens(translation_state, "translated_text")
+    untranslated_words, untranslated_ratio = get_untranslated_tokens(source_tokens, translated_tokens)
+    if untranslated_ratio > UNTRANSLATED_RATIO_THRESHOLD:
+        quality_issues.append(f"Possibly untranslated words: {untranslated_words[:10]}")
+        quality_score -= 0.1
     
-    # Terminology consistency check
+    # Terminology consistency check, terms enforced by the translator are already consistent
     repeated_phrases = translation_state.get("repeated_phrases", [])
-    for original_phrase, expected_translation in repeated_phrases:
+    enforced_terms = {term["source_term"].lower() for term in translation_state.get("enforced_terms", [])}
+    for phrase in repeated_phrases:
+        original_phrase, expected_translation = phrase[0], phrase[-1]
+        if original_phrase.lower() in enforced_terms:
+            continue
         if original_phrase in source_text and expected_translation not in translated_text:
             quality_issues.append(f"Terminology inconsistency: {original_phrase}")
             quality_score -= 0.15
@@ -88,11 +177,19 @@ def qa_agent(translation_state: TranslationState) -> dict:
         next_action = "retry"  # Try different approach
     else:
         next_action = "human_review"  # Needs human attention
+
+    # Stop retrying once the attempts are used up
+    if next_action == "retry" and translation_state.get("translation_attempts", 1) >= config.MAX_TRANSLATION_ATTEMPTS:
+        next_action = "human_review"
     
     return {
         "quality_score": quality_score,
         "quality_issues": quality_issues,
         "next_action": next_action,
         "needs_human_review": next_action == "human_review",
+        "untranslated_ratio": untranslated_ratio,
+        "token_cache": update_token_cache(
+            translation_state, source_text=source_tokens, translated_text=translated_tokens
+        ),
         "messages": [f"QA: Quality score {quality_score:.2f}, action: {next_action}"]
     }
\ No newline at end of file
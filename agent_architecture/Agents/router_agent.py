@@ -18,22 +18,27 @@ Decision Framework:
 Key Innovation: Unlike traditional MT that treats all text the same, this agent creates custom workflows for each request type.
 """
 from agent_architecture.States.translation_state import TranslationState
+from agent_architecture.States.token_cache import SENTENCE_TERMINATORS, get_tokens, tokenize, update_token_cache
+from monitoring.metrics import FAST_PATH
 
 
 TECHNICAL_TERMS = ["api", "database", "algorithm", "function"]
 FORMAL_LANGUAGE = ["dear sir", "sincerely", "respectfully"]
 
 
-def get_complexity(text: str) -> tuple[str, str]:
+def get_complexity(text: str, tokens: list[str] = None) -> tuple[str, str]:
     """
     Get the complexity of the text
     Args:
         text (str): The text to analyze
+        tokens (list[str]): The tokens of the text, tokenized here when not given
 
     Returns:
         tuple[str, str]: A tuple containing the complexity and translation approach
     """
-    text_length = len(text.split())
+    if tokens is None:
+        tokens = tokenize(text)
+    text_length = sum(1 for token in tokens if token not in SENTENCE_TERMINATORS)
 
     # Todo: Extend the router to detect other text types (questions, commands, creative content)
     # and set appropriate handling strategies.
@@ -71,11 +76,15 @@ def router_agent(state: TranslationState) -> dict:
     Returns:
         dict: A dictionary containing the complexity and translation approach
     """
-    text = state["source_text"]
-    complexity, translation_approach = get_complexity(text)
+    # Tokenize the source once, later agents read the tokens from the cache
+    source_tokens = get_tokens(state, "source_text")
+    complexity, translation_approach = get_complexity(state["source_text"], source_tokens)
+    if translation_approach == "direct_translation":
+        FAST_PATH.inc()
   
     return {
         "complexity": complexity,
         "translation_approach": translation_approach,
+        "token_cache": update_token_cache(state, source_text=source_tokens),
         "messages": [f"Router: Selected {translation_approach} approach for {complexity} text"]
     }
\ No newline at end of file
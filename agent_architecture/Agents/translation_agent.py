@@ -18,6 +18,9 @@ Innovation: Rather than one-size-fits-all, this agent has specialized "sub-brain
 """
 from agent_architecture.States.translation_state import TranslationState
 from translation_services.translate_factory import TranslateFactory
+from Terminology.glossary import CombinedGlossary, GlossaryTrie, compile_domain_glossary, enforce_terminology
+from Terminology.glossary_store import get_glossary_store
+from monitoring.metrics import observe_backend
 
 
 def translate_libretranslate(data: dict, source_language: str="auto", target_language: str="es") -> tuple[str, float]:
@@ -25,9 +28,11 @@ def translate_libretranslate(data: dict, source_language: str="auto", target_lan
     Function to instantiate LibreTranslate object and translate text using libretranslate
     """
     libre_translate = TranslateFactory().get_translate("libretranslate")
-    translated_text, confidence = libre_translate.translate_text(data, source_language, target_language)
+    with observe_backend("libretranslate") as call:
+        result = libre_translate.translate_text(data, source_language, target_language)
+        call["outcome"] = "success" if result["translated_text"] else "empty"
     
-    return translated_text, confidence
+    return result["translated_text"], result["confidence"]
 
 def translation_agent(translation_state: TranslationState) -> dict:
     """
@@ -47,6 +52,7 @@ def translation_agent(translation_state: TranslationState) -> dict:
     translation_result = None
     confidence_score = 0.0
     service_used = None
+    enforced_terms = []
 
     try:
         # create instances of translation service
@@ -57,8 +63,7 @@ def translation_agent(translation_state: TranslationState) -> dict:
         # deepl_translate_result, deepl_confidence = translate_deepl(source_text, source_language, target_language)
         # huggingface_translate_result, huggingface_confidence = translate_huggingface(source_text, source_language, target_language)
 
-        if (libre_confidence > max(libre_confidence, confidence_score) 
-                and libre_confidence > 0.5 
+        if (libre_confidence > max(0.5, confidence_score)
                 and libre_translate_result
                 and libre_translate_result != source_text):
             confidence_score = libre_confidence
@@ -68,17 +73,25 @@ def translation_agent(translation_state: TranslationState) -> dict:
             confidence_score = 0.0
             service_used = None
 
-        # Apply translation approach adjustments
-        if approach == "terminology_focused" and translation_result:
-            translation_result = apply_terminology_consistency(
-                translation_result, translation_state.get("repeated_phrases", [])
+        # Apply translation approach adjustments, phrases the conversation already translated are always kept consistent
+        repeated_phrases = translation_state.get("repeated_phrases", [])
+        if translation_result and (approach == "terminology_focused" or repeated_phrases):
+            translation_result, enforced_terms = apply_terminology_consistency(
+                translation_result,
+                repeated_phrases,
+                domain=translation_state.get("domain"),
+                source_language=source_language,
+                target_language=target_language
             )
-            confidence_score += 0.1  # Boost confidence for terminology consistency
+            if approach == "terminology_focused":
+                confidence_score += 0.1  # Boost confidence for terminology consistency
 
         return {
             "translated_text": translation_result or "Translation failed",
             "confidence_score": confidence_score,
             "service_used": service_used,
+            "enforced_terms": enforced_terms,
+            "translation_attempts": translation_state.get("translation_attempts", 0) + 1,
             "messages": [f"Translation: {service_used} produced result with {confidence_score:.2f} confidence"]
         }
     except Exception as e:
@@ -86,13 +99,31 @@ def translation_agent(translation_state: TranslationState) -> dict:
             "translated_text": "Translation service error",
             "confidence_score": 0.0,
             "service_used": "error",
+            "translation_attempts": translation_state.get("translation_attempts", 0) + 1,
             "error_messages": [str(e)],
             "messages": [f"Translation: Error occurred - {str(e)}"]
         }
 
-def apply_terminology_consistency(translation: str, repeated_phrases: list) -> str:
-    """Ensure consistent translation of repeated terms"""
-    for original, consistent_translation in repeated_phrases:
-        # Simple replacement - in production, use more sophisticated matching
-        translation = translation.replace(original, consistent_translation)
-    return translation
\ No newline at end of file
+def apply_terminology_consistency(translation: str, repeated_phrases: list, domain: str = None,
+                                  source_language: str = "auto", target_language: str = "es") -> tuple[str, list[dict]]:
+    """
+    Ensure consistent translation of repeated terms and domain terminology
+    The phrases are compiled into a small trie put in front of the domain glossary, compiled once
+    per domain, and all are enforced in one longest-match pass, see Terminology/glossary.py and Terminology/glossary_store.py.
+    Args:
+        translation (str): The translated text
+        repeated_phrases (list): (original, ..., consistent_translation) tuples from the context manager
+        domain (str): Optional domain whose glossary is enforced as well e.g. "medical"
+        source_language (str): The source language of the domain glossary
+        target_language (str): The target language of the domain glossary
+
+    Returns:
+        tuple[str, list[dict]]: The translation and the enforced terms for QA
+    """
+    # repeated phrases take precedence over the domain glossary, only their small trie is built per call
+    glossary = CombinedGlossary(
+        GlossaryTrie((phrase[0], phrase[-1]) for phrase in repeated_phrases),
+        compile_domain_glossary(domain, target_language),
+        get_glossary_store(domain, source_language, target_language)
+    )
+    return enforce_terminology(translation, glossary)
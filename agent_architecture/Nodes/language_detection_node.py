@@ -3,7 +3,7 @@ This module contains the language detection node functions.
 """
 
 from agent_architecture.States.translation_state import TranslationState
-from Translator.libre_translate import LibreTranslate
+from translation_services.libre_translate import LibreTranslate
 
 def language_detection_node(state: TranslationState) -> dict:
     """
@@ -11,6 +11,7 @@ class ConversationState(TypedDict):
     terminology_glossary: dict[str, str]  # specialized terms
     user_preferences: dict[str, Any]  # formality, style choices
     session_context: str  # current conversation topic
+    conversation_context: list[str]  # previous turns, seeds the translation state of the next turn
     
 def get_initial_conversation_state() -> ConversationState:
     """
@@ -20,7 +21,8 @@ def get_initial_conversation_state() -> ConversationState:
             "translation_memory": {},
             "terminology_glossary": {},
             "user_preferences": {},
-            "session_context": ""
+            "session_context": "",
+            "conversation_context": []
         })
 
 
@@ -34,6 +36,8 @@ def get_translation_memory(conversation_state: ConversationState) -> dict:
 def get_repeated_phrases(conversation_state: ConversationState, source_text: str, target_language: str) -> list[tuple[str, str, str]]:
     """
     Get the repeated phrases from the conversation state
+    Sentences already in the translation memory and terms of the session glossary found in the
+    source text are returned as (phrase, target_language, translation) tuples.
     """
     translation_memory = get_translation_memory(conversation_state)
     repeated_phrases = []
@@ -42,4 +46,9 @@ def get_repeated_phrases(conversation_state: ConversationState, source_text: str
         if (phrase, target_language) in translation_memory:
             repeated_phrases.append((phrase, target_language, translation_memory[(phrase, target_language)]))
 
+    lowered_text = source_text.lower()
+    for term, translation in conversation_state.get("terminology_glossary", {}).items():
+        if term.lower() in lowered_text:
+            repeated_phrases.append((term, target_language, translation))
+
     return repeated_phrases
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""
+This module contains the handles of the memory structures shared with a graph run.
+
+In the lean state profile (config.STATE_PROFILE) a conversation's translation memory and
+context are not copied into the TranslationState. The run carries a short handle under
+"memory_handle" instead, and the agents resolve it here to read and update the resident
+ConversationState in place:
+
+    handle = memory_handles.register(conversation_state)
+    try:
+        translation_system.invoke({..., "memory_handle": handle})
+    finally:
+        memory_handles.release(handle)
+"""
+import itertools
+import threading
+from typing import Any, Dict, Optional
+
+from agent_architecture.States.conversation_state import ConversationState
+
+
+class MemoryHandles:
+    """
+    Registry of the conversation states referenced by the graph runs in flight
+    """
+    def __init__(self):
+        self.memories: Dict[str, ConversationState] = {}
+        self.counter = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def register(self, conversation_state: ConversationState) -> str:
+        """
+        Returns:
+            str: The handle to put in the state of a run, release it once the run is over
+        """
+        with self.lock:
+            handle = f"memory-{next(self.counter)}"
+            self.memories[handle] = conversation_state
+        return handle
+
+    def get(self, handle: str) -> Optional[ConversationState]:
+        return self.memories.get(handle)
+
+    def release(self, handle: str):
+        with self.lock:
+            self.memories.pop(handle, None)
+
+    def __len__(self) -> int:
+        return len(self.memories)
+
+
+memory_handles = MemoryHandles()
+
+
+def get_memory(state: Dict[str, Any]) -> Optional[ConversationState]:
+    """
+    Get the conversation state a run references through its memory handle, None without one
+    """
+    handle = state.get("memory_handle")
+    return memory_handles.get(handle) if handle else None
@@ -0,0 +1,74 @@
+"""
+This module contains the tokenization shared by the agents.
+
+The source and translated texts are tokenized once and the tokens are cached on the
+TranslationState under "token_cache", so the router, QA and any later agent can reuse
+them instead of re-splitting the same strings at every step.
+
+Cache layout:
+    token_cache = {
+        "source_text": (hash(source_text), [tokens]),
+        "translated_text": (hash(translated_text), [tokens]),
+    }
+The hash is kept so a retried translation invalidates the cached tokens of the old text.
+"""
+import re
+from typing import Any, Dict, List
+
+# emails and urls are kept whole so they can be allowlisted as single tokens,
+# sentence terminators are kept so sentence starts can be detected in one pass
+TOKEN_PATTERN = re.compile(
+    r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+"  # email
+    r"|https?://\S+"  # url
+    r"|\w+(?:['’\-.]\w+)*"  # words, numbers, hyphenated words, versions (11.2)
+    r"|[.!?]",  # sentence terminators
+    re.UNICODE
+)
+SENTENCE_TERMINATORS = frozenset(".!?")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenize the text in a single left-to-right pass
+    Args:
+        text (str): The text to tokenize
+
+    Returns:
+        List[str]: The tokens, including sentence terminators
+    """
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text)
+
+
+def get_tokens(translation_state: Dict[str, Any], field: str) -> List[str]:
+    """
+    Get the tokens of a text field, reusing the cached tokens when the text is unchanged
+    Args:
+        translation_state (TranslationState): The current state of the translation process
+        field (str): The text field to tokenize e.g. "source_text" or "translated_text"
+
+    Returns:
+        List[str]: The tokens of the field
+    """
+    text = translation_state.get(field) or ""
+    cached = (translation_state.get("token_cache") or {}).get(field)
+    if cached and cached[0] == hash(text):
+        return cached[1]
+    return tokenize(text)
+
+
+def update_token_cache(translation_state: Dict[str, Any], **tokens: List[str]) -> Dict[str, Any]:
+    """
+    Build the token_cache update for the given fields
+    Args:
+        translation_state (TranslationState): The current state of the translation process
+        **tokens: The tokens per field e.g. source_text=[...]
+
+    Returns:
+        dict: The full token cache to return as a state update
+    """
+    token_cache = dict(translation_state.get("token_cache") or {})
+    for field, field_tokens in tokens.items():
+        token_cache[field] = (hash(translation_state.get(field) or ""), field_tokens)
+    return token_cache
@@ -0,0 +1,168 @@
+"""
+This module contains the size-bounded translation memory.
+
+The translation memory is keyed by (source_text, target_language) like the
+ConversationState declares, and is bounded both by number of entries and by bytes.
+When a bound is exceeded entries are evicted with either policy:
+- lru: least recently used entry first
+- lfu: least frequently used entry first, ties broken by least recently used
+
+The memory object is passed by reference through the graph, so the orchestrator
+updates it in place instead of copying a growing dict into every state update.
+"""
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from agent_architecture.States.memory_handles import get_memory
+from config.settings import config
+
+
+TranslationMemoryKey = Tuple[str, str]  # (source_text, target_language)
+
+
+def get_entry_size(key: TranslationMemoryKey, translated_text: str) -> int:
+    """
+    Get the size in bytes of a translation memory entry
+    """
+    source_text, target_language = key
+    return len(source_text.encode("utf-8")) + len(target_language) + len(translated_text.encode("utf-8"))
+
+
+class BoundedTranslationMemory:
+    """
+    Translation memory with LRU/LFU eviction and byte-size accounting
+    """
+    def __init__(self, max_entries: int = None, max_bytes: int = None, policy: str = None):
+        self.max_entries = max_entries or config.TRANSLATION_MEMORY_MAX_ENTRIES
+        self.max_bytes = max_bytes or config.TRANSLATION_MEMORY_MAX_BYTES
+        self.policy = (policy or config.TRANSLATION_MEMORY_POLICY).lower()
+        if self.policy not in ("lru", "lfu"):
+            raise ValueError(f"Invalid translation memory policy: {self.policy}")
+
+        self.entries: "OrderedDict[TranslationMemoryKey, str]" = OrderedDict()
+        self.frequencies: Dict[TranslationMemoryKey, int] = {}
+        # frequency -> keys in recency order, lfu evicts from the lowest frequency bucket
+        self.frequency_buckets: Dict[int, "OrderedDict[TranslationMemoryKey, None]"] = defaultdict(OrderedDict)
+
+        self.size_bytes = 0
+        self.evictions = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: TranslationMemoryKey) -> bool:
+        return key in self.entries
+
+    def __getitem__(self, key: TranslationMemoryKey) -> str:
+        translated_text = self.get(*key)
+        if translated_text is None:
+            raise KeyError(key)
+        return translated_text
+
+    def __iter__(self) -> Iterator[TranslationMemoryKey]:
+        return iter(self.entries)
+
+    def items(self):
+        return self.entries.items()
+
+    def get(self, source_text: str, target_language: str) -> Optional[str]:
+        """Get a translation and mark it as used"""
+        key = (source_text, target_language)
+        translated_text = self.entries.get(key)
+        if translated_text is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touch(key)
+        return translated_text
+
+    def put(self, source_text: str, target_language: str, translated_text: str):
+        """Add or update a translation, evicting entries until the bounds hold"""
+        key = (source_text, target_language)
+        entry_size = get_entry_size(key, translated_text)
+        if entry_size > self.max_bytes:
+            return  # a single entry larger than the whole memory is never stored
+
+        if key in self.entries:
+            self.size_bytes -= get_entry_size(key, self.entries[key])
+            self.entries[key] = translated_text
+            self._touch(key)
+        else:
+            self.entries[key] = translated_text
+            self.frequencies[key] = 1
+            self.frequency_buckets[1][key] = None
+        self.size_bytes += entry_size
+
+        while len(self.entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            self._evict(protected_key=key)
+
+    def _touch(self, key: TranslationMemoryKey):
+        self.entries.move_to_end(key)
+        frequency = self.frequencies[key]
+        bucket = self.frequency_buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self.frequency_buckets[frequency]
+        self.frequencies[key] = frequency + 1
+        self.frequency_buckets[frequency + 1][key] = None
+
+    def _evict(self, protected_key: TranslationMemoryKey):
+        if self.policy == "lfu":
+            candidates = (
+                key for frequency in sorted(self.frequency_buckets)
+                for key in self.frequency_buckets[frequency]
+            )
+        else:
+            candidates = iter(self.entries)
+        # never evict the entry that is being written
+        key = next((key for key in candidates if key != protected_key), protected_key)
+        self._remove(key)
+        self.evictions += 1
+
+    def _remove(self, key: TranslationMemoryKey):
+        translated_text = self.entries.pop(key)
+        self.size_bytes -= get_entry_size(key, translated_text)
+        frequency = self.frequencies.pop(key)
+        bucket = self.frequency_buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self.frequency_buckets[frequency]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Size and eviction metrics for monitoring"""
+        return {
+            "policy": self.policy,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def get_translation_memory_store(state: Dict[str, Any]) -> BoundedTranslationMemory:
+    """
+    Get the bounded translation memory from a state, converting a plain dict if needed
+    Plain dicts keyed by source text only are migrated using the state's target language.
+    A state with a memory handle gets the memory of the referenced conversation, a migrated
+    memory replaces the plain dict there.
+    """
+    memory = get_memory(state)
+    translation_memory = (memory if memory is not None else state).get("translation_memory")
+    if isinstance(translation_memory, BoundedTranslationMemory):
+        return translation_memory
+
+    store = BoundedTranslationMemory()
+    target_language = state.get("target_language", "es")
+    for key, translated_text in (translation_memory or {}).items():
+        if isinstance(key, tuple):
+            store.put(key[0], key[1], translated_text)
+        else:
+            store.put(key, target_language, translated_text)
+    if memory is not None:
+        memory["translation_memory"] = store
+    return store
@@ -4,6 +4,14 @@ from typing import TypedDict, Annotated, List, Optional, Dict, Any
 from langgraph.graph.message import add_messages
 from langchain_core.messages import BaseMessage
 
+from agent_architecture.States.memory_handles import get_memory
+from agent_architecture.States.token_cache import get_tokens, tokenize
+from config.settings import config
+
+
+FULL_STATE_PROFILE = "full"
+LEAN_STATE_PROFILE = "lean"
+
 
 class TranslationComplexity(Enum):
     SIMPLE = "simple"
@@ -21,16 +29,32 @@ class TranslationStatus(Enum):
     FAILED = "failed"
 
 
+def merge_messages(left: list, right) -> list:
+    """
+    Reducer of the agents' messages, depends on config.STATE_PROFILE
+    The full profile uses add_messages, which wraps every string in a message with an id and
+    merges by id. The lean profile keeps the plain strings in a ring of the last
+    config.STATE_MESSAGE_RING_SIZE messages, or drops them when the size is 0.
+    """
+    if config.STATE_PROFILE != LEAN_STATE_PROFILE:
+        return add_messages(left, right)
+    if not config.STATE_MESSAGE_RING_SIZE:
+        return left or []
+    if not isinstance(right, list):
+        right = [right]
+    return (left + right)[-config.STATE_MESSAGE_RING_SIZE:]
+
+
 class TranslationState(TypedDict):
     """
     The shared memory for machine translation system
     Why this structure works: 
-    - messages uses add_messages to automatically append new conversation turns. 
+    - messages uses add_messages to automatically append new conversation turns (a bounded ring in the lean profile). 
     - Each specialist can read the full context and update their specific fields. 
     - The orchestrator tracks overall progress through confidence_score and needs_human_review
     """
-    # messages uses add_messages to automatically append new conversation turns
-    messages: Annotated[List[BaseMessage], add_messages]
+    # messages uses add_messages to automatically append new conversation turns, see merge_messages
+    messages: Annotated[List[BaseMessage], merge_messages]
 
     # input
     source_text: str  # the source text to be translated
@@ -38,21 +62,42 @@ class TranslationState(TypedDict):
     target_language: str  # the language to translate the source text to
 
     # Processing
+    complexity: str  # set by the router
+    translation_approach: str  # set by the router
+    context_strategy: str  # set by the context manager
+    relevant_context: List[str]  # set by the context manager
+    repeated_phrases: List[tuple]  # set by the context manager
     complexity_analysis: Optional[Dict[str, Any]]
+    domain: Optional[str]  # e.g. "medical", selects the domain glossary
     conversation_context: List[str]  # Previous translations for context
+    translation_memory: Any  # BoundedTranslationMemory keyed by (source_text, target_language)
+    translation_memory_metrics: Dict[str, Any]  # size and eviction counters of the translation memory
+    memory_handle: Optional[str]  # lean profile: the conversation memory by reference, see States/memory_handles.py
     context_data: Optional[Dict[str, Any]]
     translation_candidates: List[Dict[str, Any]]
 
     # Quality assessment
     quality_scores: Optional[Dict[str, float]]
+    quality_score: float  # set by QA
     quality_issues: List[str]
+    next_action: str  # QA decision: complete, retry or human_review
+    untranslated_ratio: float  # share of source content tokens left untranslated
+
+    # Cached tokenizations shared by the agents, see States/token_cache.py
+    token_cache: Dict[str, Any]
 
     # output
     translated_text: str  # the translated text
     confidence_score: float  # the confidence score of the translation
+    service_used: Optional[str]  # the translation service that produced the translation
+    final_status: str  # set by the orchestrator
+    translation_summary: Dict[str, Any]  # set by the orchestrator
+    enforced_terms: List[Dict[str, str]]  # glossary terms enforced by the translator
+    translation_attempts: int  # translator runs, bounds the QA retry loop
     needs_human_review: bool  # whether the translation needs human review
 
     # Metadata
+    session_id: str  # conversation the translation belongs to, used to persist context
     processing_time: float
     agents_involved: List[str]
 
@@ -103,8 +148,11 @@ class TranslationStateHelper:
 
     def get_conversation_context(translation_state: TranslationState) -> List[str]:
         """
-        Get the conversation context from the translation state
+        Get the conversation context from the translation state, or from its memory handle
         """
+        memory = get_memory(translation_state)
+        if memory is not None:
+            return memory.get("conversation_context", [])
         return translation_state.get("conversation_context", [])
 
 
@@ -112,12 +160,19 @@ class TranslationStateHelper:
         """
         Get the relevant context from the translation state
         """
-        source_text = translation_state["source_text"]
         conversation_context = TranslationStateHelper.get_conversation_context(translation_state)
         relevant_context = []
-        
+        # the source tokens come from the token cache the router filled
+        source_words = {token.lower() for token in get_tokens(translation_state, "source_text")}
+
         # Look for related previous translations
         for previous_translation in conversation_context[-5:]:  # Last 5 for context
-            if any(word in source_text.lower() for word in previous_translation.split()):
+            if any(token.lower() in source_words for token in tokenize(previous_translation)):
                 relevant_context.append(previous_translation)
-        return relevant_context
\ No newline at end of file
+        return relevant_context
+
+
+# Module level access to the helpers, as imported by the agents and the workflow
+get_initial_translation_state = TranslationStateHelper.get_initial_translation_state
+get_conversation_context = TranslationStateHelper.get_conversation_context
+get_relevant_context = TranslationStateHelper.get_relevant_context
\ No newline at end of file
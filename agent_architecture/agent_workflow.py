@@ -7,6 +7,7 @@ Context awareness: Maintains consistency across conversations
 Error resilience: Multiple fallback strategies prevent failures
 """
 # Third-party imports
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 
 # Local imports
@@ -17,13 +18,16 @@ from agent_architecture.Agents.context_manager_agent import context_manager_agen
 from agent_architecture.Agents.translation_agent import translation_agent
 from agent_architecture.Agents.qa_agent import qa_agent
 from agent_architecture.Agents.orchestrator_agent import orchestrator_agent
+from monitoring.metrics import QA_OUTCOMES, RETRIES, instrument_node
 
 
 def decide_next_step(state: TranslationState) -> str:
     """Conditional routing logic for quality-based workflow"""
     next_action = state.get("next_action", "complete")
+    QA_OUTCOMES.labels(next_action).inc()
     
     if next_action == "retry":
+        RETRIES.inc()
         return "translator"  # Try translation again
     elif next_action == "human_review":
         return "orchestrator"  # Send to orchestrator for human handling
@@ -37,17 +41,20 @@ def create_translation_system():
     workflow = StateGraph(TranslationState)
 
     # Wrap context manager to handle the conversation state
-    def context_manager_wrapper(state: TranslationState) -> dict:
-        # Create empty conversation state if needed
-        conversation_state = get_initial_conversation_state()
+    def context_manager_wrapper(state: TranslationState, config: RunnableConfig) -> dict:
+        # A conversation session passes its resident state as config={"configurable": {"conversation_state": ...}},
+        # a standalone translation gets an empty one
+        conversation_state = config.get("configurable", {}).get("conversation_state")
+        if conversation_state is None:
+            conversation_state = get_initial_conversation_state()
         return context_manager_agent(state, conversation_state)
     
-    # Add all agents
-    workflow.add_node("router", router_agent)
-    workflow.add_node("context_manager", context_manager_wrapper)  # Use wrapper
-    workflow.add_node("translator", translation_agent)
-    workflow.add_node("qa_checker", qa_agent)
-    workflow.add_node("orchestrator", orchestrator_agent)
+    # Add all agents, each one timed per node and sized per state update
+    workflow.add_node("router", instrument_node("router", router_agent))
+    workflow.add_node("context_manager", instrument_node("context_manager", context_manager_wrapper))  # Use wrapper
+    workflow.add_node("translator", instrument_node("translator", translation_agent))
+    workflow.add_node("qa_checker", instrument_node("qa_checker", qa_agent))
+    workflow.add_node("orchestrator", instrument_node("orchestrator", orchestrator_agent, final=True))
     
     # Define workflow edges
     workflow.add_edge(START, "router")
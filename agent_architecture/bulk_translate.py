@@ -0,0 +1,331 @@
+"""
+Bulk translation of a whole corpus through the translation graph
+
+Reads a corpus (JSON array like Data/messages_train.json, or JSONL), fans the records out
+over a worker pool where each worker owns one compiled graph, and writes one
+serialize_translation_result line per record to a JSONL output file, in input order.
+
+Records are processed in windows and deduplicated first (see agent_architecture/dedup.py):
+every distinct line segment runs through the graph once and its result is fanned back to
+all records containing it. The dedup ratio is reported with the progress.
+
+Resuming: a checkpoint file next to the output records how many input records and output
+bytes are durably written. A killed job truncates the output back to the checkpoint and
+skips the finished records, so nothing is translated twice.
+
+Failed records (a segment the graph raised on keeps its source text) are written with
+"success": false and their indexes are listed in the checkpoint. Running the job again
+retries them first and appends their new lines with the same "index", so readers keep the
+last line of each index. Records that still fail stay listed for the next run.
+
+Usage:
+    python -m agent_architecture.bulk_translate Data/messages_train.json --output results.jsonl
+    python -m agent_architecture.bulk_translate jobs.jsonl --output results.jsonl --workers 8 --executor thread
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from itertools import islice
+from typing import Iterator, Optional
+
+import orjson
+
+from agent_architecture.agent_workflow import create_translation_system
+from agent_architecture.dedup import SegmentDeduplicator
+from agent_architecture.States.translation_state import get_initial_translation_state
+from db.read_file import iter_json_records, map_json_to_translation_state, serialize_translation_result
+from monitoring.monitoring import setup_logging
+
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_EVERY = 50  # records between checkpoint writes
+WINDOW_RECORDS_PER_WORKER = 16  # records deduplicated and translated together
+PROGRESS_INTERVAL = 10.0  # seconds between progress reports
+
+_translation_system = None  # one compiled graph per worker
+
+
+def iter_corpus(file_path: str) -> Iterator[dict]:
+    """
+    Stream the records of a JSON array or JSONL corpus
+    """
+    if file_path.endswith(".jsonl"):
+        with open(file_path, "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    else:
+        yield from iter_json_records(file_path)
+
+
+def count_records(file_path: str) -> int:
+    """
+    Count the records of a corpus for progress and ETA reporting
+    """
+    return sum(1 for _ in iter_corpus(file_path))
+
+
+def record_to_state(record: dict, target_language: str) -> dict:
+    """
+    Convert a corpus record to an initial TranslationState
+    Supports corpus records ({"messages": [...]}), flat messages ({"msg_o": ...})
+    and translation requests ({"source_text": ...}).
+    """
+    if record.get("messages"):
+        state = map_json_to_translation_state(record)
+    elif "source_text" in record:
+        state = get_initial_translation_state(record)
+    else:
+        state = map_json_to_translation_state({"messages": [record]})
+    state["target_language"] = record.get("target_language", target_language)
+    return state
+
+
+def init_worker():
+    """Compile the translation graph once per worker"""
+    global _translation_system
+    _translation_system = create_translation_system()
+
+
+def translate_segment(key: int, state: dict, include_messages: bool = False) -> tuple[int, dict]:
+    """
+    Run one distinct segment through the graph
+    Returns:
+        tuple[int, dict]: The segment key and the parts of the result needed to merge it
+    """
+    if _translation_system is None:
+        init_worker()
+    try:
+        result = serialize_translation_result(_translation_system.invoke(state), include_messages)
+    except Exception as e:
+        return key, {
+            "translated_text": state["source_text"],
+            "quality_score": 0.0,
+            "service_used": None,
+            "needs_human_review": True,
+            "issues": [],
+            "error": str(e),
+            "messages": [],
+        }
+    return key, {
+        "translated_text": result["translated_text"],
+        "quality_score": result["quality_score"],
+        "service_used": result["service_used"],
+        "needs_human_review": result["needs_human_review"],
+        "issues": (result["translation_summary"] or {}).get("issues") or [],
+        "error": None,
+        "messages": result.get("processing_messages", []),
+    }
+
+
+def merge_segment_results(index: int, state: dict, plan: list, deduplicator: SegmentDeduplicator,
+                          include_messages: bool = False) -> tuple[bytes, bool]:
+    """
+    Merge the segment results of a record into its serialized JSON line
+    Returns:
+        tuple[bytes, bool]: The JSON line and whether a segment of the record failed
+    """
+    segment_results = deduplicator.get_results(plan)
+    translated_text = deduplicator.assemble(plan, get_text=lambda result: result["translated_text"])
+    quality_score = min((result["quality_score"] for result in segment_results), default=0.0)
+    needs_human_review = any(result["needs_human_review"] for result in segment_results)
+    service_used = next((result["service_used"] for result in segment_results if result["service_used"]), None)
+    issues = [issue for result in segment_results for issue in result["issues"]]
+    errors = [result["error"] for result in segment_results if result["error"]]
+
+    result = serialize_translation_result({
+        "translated_text": translated_text,
+        "quality_score": quality_score,
+        "service_used": service_used,
+        "needs_human_review": needs_human_review,
+        "source_text": state.get("source_text", ""),
+        "target_language": state.get("target_language", ""),
+        "messages": [message for result in segment_results for message in result["messages"]],
+        "translation_summary": {
+            "translation": translated_text,
+            "quality_score": quality_score,
+            "service_used": service_used,
+            "status": "needs_review" if needs_human_review else "completed",
+            "issues": issues or None,
+        },
+    }, include_messages)
+    if errors:
+        result["success"] = False
+        result["error"] = "; ".join(errors)
+    result["index"] = index
+    result["original_message_id"] = state.get("original_message_id", "")
+    return orjson.dumps(result), bool(errors)
+
+
+def read_checkpoint(checkpoint_path: str) -> dict:
+    checkpoint = {"records": 0, "output_bytes": 0, "failed": []}
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r", encoding="utf-8") as file:
+            checkpoint.update(json.load(file))
+    return checkpoint
+
+
+def write_checkpoint(checkpoint_path: str, records: int, output_bytes: int, failed: set = frozenset()):
+    """Atomically replace the checkpoint so a crash never leaves it half written"""
+    temporary_path = f"{checkpoint_path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump({"records": records, "output_bytes": output_bytes, "failed": sorted(failed)}, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, checkpoint_path)
+
+
+class ProgressReporter:
+    """
+    Periodic throughput and ETA logging
+    """
+    def __init__(self, total: Optional[int], already_done: int):
+        self.total = total
+        self.already_done = already_done
+        self.start_time = time.monotonic()
+        self.last_report = self.start_time
+
+    def update(self, done: int, dedup_stats: dict, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self.last_report < PROGRESS_INTERVAL:
+            return
+        self.last_report = now
+        processed = done - self.already_done
+        throughput = processed / max(now - self.start_time, 1e-9)
+        dedup = (f"{dedup_stats['unique_segments']}/{dedup_stats['segments']} unique segments, "
+                 f"dedup ratio {dedup_stats['dedup_ratio']:.1%}")
+        if self.total:
+            remaining = self.total - done
+            eta = remaining / throughput if throughput else float("inf")
+            logger.info(f"{done}/{self.total} records, {throughput:.2f} records/s, ETA {eta:.0f}s, {dedup}")
+        else:
+            logger.info(f"{done} records, {throughput:.2f} records/s, {dedup}")
+
+
+def run_bulk_translation(input_path: str, output_path: str, checkpoint_path: str = None,
+                         target_language: str = "es", workers: int = 4, executor: str = "process",
+                         total: int = None, dedup_lines: bool = True, include_messages: bool = False) -> int:
+    """
+    Translate a corpus into a JSONL file, resuming from the checkpoint if there is one
+    Args:
+        input_path (str): JSON array or JSONL corpus
+        output_path (str): JSONL output file
+        checkpoint_path (str): Checkpoint file, defaults to <output_path>.checkpoint
+        target_language (str): Target language for records that don't specify one
+        workers (int): Number of workers
+        executor (str): "process" for a process pool, "thread" for a thread pool
+        total (int): Number of records, counted from the input when not given
+        dedup_lines (bool): Deduplicate line segments, False deduplicates whole records only
+        include_messages (bool): Keep the agents' processing messages in the output
+
+    Returns:
+        int: The number of records written in total
+    """
+    checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+    checkpoint = read_checkpoint(checkpoint_path)
+    done = checkpoint["records"]
+    failed = set(checkpoint["failed"])
+    retry = frozenset(failed)
+
+    # drop lines written after the last checkpoint, they are translated again
+    with open(output_path, "a+b") as output_file:
+        output_file.truncate(checkpoint["output_bytes"])
+    if done:
+        logger.info(f"Resuming after {done} finished records, retrying {len(retry)} failed records")
+
+    total = total or count_records(input_path)
+    progress = ProgressReporter(total, done)
+    if retry:
+        records = ((index, record) for index, record in enumerate(iter_corpus(input_path))
+                   if index >= done or index in retry)
+    else:
+        records = islice(enumerate(iter_corpus(input_path)), done, None)
+    written = 0
+    deduplicator = SegmentDeduplicator(split_lines=dedup_lines)
+    window_size = workers * WINDOW_RECORDS_PER_WORKER
+
+    pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    with pool_class(max_workers=workers, initializer=init_worker) as pool, \
+            open(output_path, "ab") as output_file:
+        while True:
+            window = list(islice(records, window_size))
+            if not window:
+                break
+
+            # plan every record, then translate each distinct segment of the window once
+            plans = []
+            for index, record in window:
+                state = record_to_state(record, target_language)
+                plan = deduplicator.plan(
+                    state["source_text"], state.get("source_language", "auto"), state["target_language"]
+                )
+                plans.append((index, state, plan))
+
+            futures = [
+                pool.submit(translate_segment, key, get_initial_translation_state({
+                    "source_text": segment,
+                    "source_language": source_language,
+                    "target_language": segment_target_language,
+                }), include_messages)
+                for key, (segment, source_language, segment_target_language) in deduplicator.take_pending().items()
+            ]
+            for future in as_completed(futures):
+                key, segment_result = future.result()
+                # a failed segment only serves this window, a later occurrence is translated again
+                deduplicator.set_result(key, segment_result, cache=segment_result["error"] is None)
+
+            for index, state, plan in plans:
+                line, record_failed = merge_segment_results(index, state, plan, deduplicator, include_messages)
+                output_file.write(line + b"\n")
+                if record_failed:
+                    failed.add(index)
+                else:
+                    failed.discard(index)
+                if index not in retry:
+                    done += 1
+                written += 1
+                if written % CHECKPOINT_EVERY == 0:
+                    output_file.flush()
+                    write_checkpoint(checkpoint_path, done, output_file.tell(), failed)
+            deduplicator.release()
+            progress.update(done, deduplicator.get_stats())
+
+        output_file.flush()
+        write_checkpoint(checkpoint_path, done, output_file.tell(), failed)
+    progress.update(done, deduplicator.get_stats(), force=True)
+    if failed:
+        logger.warning(f"{len(failed)} records failed, run the job again to retry them")
+    return done
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Translate a corpus through the translation graph")
+    parser.add_argument("input", help="JSON array or JSONL corpus")
+    parser.add_argument("--output", required=True, help="JSONL output file")
+    parser.add_argument("--checkpoint", help="Checkpoint file, defaults to <output>.checkpoint")
+    parser.add_argument("--target-language", default="es")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--executor", choices=["process", "thread"], default="process",
+                        help="thread suits I/O bound backends, process suits CPU bound ones")
+    parser.add_argument("--total", type=int, help="Number of records, skips counting the input")
+    parser.add_argument("--dedup", choices=["segment", "record"], default="segment",
+                        help="Deduplicate line segments or only identical records")
+    parser.add_argument("--debug", action="store_true", help="Include the agents' processing messages")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    run_bulk_translation(
+        args.input, args.output, args.checkpoint, args.target_language,
+        args.workers, args.executor, args.total, args.dedup == "segment", args.debug
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Content-hash deduplication before translation
+
+Support corpora repeat a lot of boilerplate: form headers ("Device Information",
+"Computer OS:", "Audio Interface:"), greetings and signatures. Texts are split into
+line segments, each segment is normalized (unicode NFKC, collapsed whitespace) and hashed
+with xxhash together with the language pair. Every distinct segment is translated once
+and its result is fanned back to all of its occurrences, so backend calls scale with the
+unique content instead of the number of messages.
+
+Usage:
+    deduplicator = SegmentDeduplicator()
+    plans = [deduplicator.plan(text, "en", "es") for text in texts]
+    for key, (segment, source_language, target_language) in deduplicator.take_pending().items():
+        deduplicator.set_result(key, translate(segment))
+    translations = [deduplicator.assemble(plan) for plan in plans]
+"""
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+import xxhash
+
+
+SEGMENT_SEPARATOR = re.compile(r"(\s*\n\s*)")  # line breaks with the whitespace around them
+DEDUP_CACHE_SIZE = 100000  # translated segments kept for later occurrences
+
+Part = Tuple[str, Any]  # ("text", separator) or ("segment", key)
+
+
+def normalize_segment(segment: str) -> str:
+    """
+    Normalize a segment so trivially different copies hash the same
+    """
+    return " ".join(unicodedata.normalize("NFKC", segment).split())
+
+
+def segment_key(segment: str, source_language: str, target_language: str) -> int:
+    """
+    Hash a normalized segment together with its language pair
+    """
+    key_text = f"{source_language}\0{target_language}\0{normalize_segment(segment)}"
+    return xxhash.xxh3_64_intdigest(key_text.encode("utf-8"))
+
+
+class SegmentDeduplicator:
+    """
+    Tracks distinct segments across texts and fans their results back out
+    Args:
+        split_lines (bool): Deduplicate line segments, False deduplicates whole texts only
+        cache_size (int): Number of translated segments kept for reuse
+    """
+    def __init__(self, split_lines: bool = True, cache_size: int = DEDUP_CACHE_SIZE):
+        self.split_lines = split_lines
+        self.cache_size = cache_size
+        self.results: "OrderedDict[int, Any]" = OrderedDict()
+        self.uncached: Dict[int, Any] = {}  # results only used by the plans already made, e.g. failures
+        self.pending: Dict[int, Tuple[str, str, str]] = {}
+        self.total_segments = 0
+        self.unique_segments = 0
+
+    def plan(self, text: str, source_language: str, target_language: str) -> List[Part]:
+        """
+        Split a text into segments and register the segments that still need a translation
+        Returns:
+            list: The parts to assemble the translated text from
+        """
+        pieces = SEGMENT_SEPARATOR.split(text) if self.split_lines else [text]
+        parts = []
+        for position, piece in enumerate(pieces):
+            if position % 2:  # separators are at the odd positions of re.split
+                parts.append(("text", piece))
+                continue
+            segment = piece.strip()
+            if not segment:
+                parts.append(("text", piece))
+                continue
+
+            # keep the whitespace around the segment, only its content is translated
+            leading = piece[:len(piece) - len(piece.lstrip())]
+            trailing = piece[len(piece.rstrip()):]
+            key = segment_key(segment, source_language, target_language)
+            self.total_segments += 1
+            if key in self.results:
+                self.results.move_to_end(key)
+            elif key not in self.pending:
+                self.pending[key] = (segment, source_language, target_language)
+                self.unique_segments += 1
+            if leading:
+                parts.append(("text", leading))
+            parts.append(("segment", key))
+            if trailing:
+                parts.append(("text", trailing))
+        return parts
+
+    def take_pending(self) -> Dict[int, Tuple[str, str, str]]:
+        """
+        Get the distinct segments that need a translation and clear them
+        Returns:
+            dict: key -> (segment, source_language, target_language)
+        """
+        pending, self.pending = self.pending, {}
+        return pending
+
+    def set_result(self, key: int, result: Any, cache: bool = True):
+        """
+        Store the translation result of a segment
+        Args:
+            key (int): The segment key from take_pending
+            result: The translation result
+            cache (bool): Reuse the result for later occurrences, False only serves the plans
+                already made (until release) and translates the segment again when it shows up later
+        """
+        if cache:
+            self.results[key] = result
+            self.results.move_to_end(key)
+        else:
+            self.uncached[key] = result
+
+    def get_result(self, key: int) -> Any:
+        """Get the result of a segment"""
+        return self.results[key] if key in self.results else self.uncached[key]
+
+    def get_results(self, plan: List[Part]) -> List[Any]:
+        """Get the results of every segment of a plan, in order"""
+        return [self.get_result(key) for kind, key in plan if kind == "segment"]
+
+    def assemble(self, plan: List[Part], get_text=lambda result: result) -> str:
+        """
+        Rebuild a translated text from its plan
+        Args:
+            plan (list): The parts returned by plan
+            get_text: Extracts the translated text from a stored result
+        """
+        return "".join(
+            get_text(self.get_result(value)) if kind == "segment" else value
+            for kind, value in plan
+        )
+
+    def release(self):
+        """Trim the stored results to the cache size once the plans using them are assembled"""
+        self.uncached.clear()
+        while len(self.results) > self.cache_size:
+            self.results.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Deduplication ratio of the segments seen so far"""
+        return {
+            "segments": self.total_segments,
+            "unique_segments": self.unique_segments,
+            "dedup_ratio": 1 - self.unique_segments / self.total_segments if self.total_segments else 0.0,
+        }
+
+
+def group_duplicates(items: List[Tuple[int, str]], source_language: str,
+                     target_language: str) -> Tuple[List[Tuple[int, str]], Dict[int, List[int]]]:
+    """
+    Group whole texts by content hash, for batches where each text is translated as a unit
+    Args:
+        items (list): (index, text) pairs
+        source_language (str): The source language of the texts
+        target_language (str): The target language of the texts
+
+    Returns:
+        tuple: The (index, text) pairs to translate and, per translated index, the indexes of its duplicates
+    """
+    first_index_by_key = {}
+    unique_items = []
+    duplicates: Dict[int, List[int]] = {}
+    for index, text in items:
+        key = segment_key(text, source_language, target_language)
+        first_index = first_index_by_key.get(key)
+        if first_index is None:
+            first_index_by_key[key] = index
+            unique_items.append((index, text))
+        else:
+            duplicates.setdefault(first_index, []).append(index)
+    return unique_items, duplicates
@@ -1,24 +1,96 @@
-import requests
-from fastapi import FastAPI
-
-from apis.views import translate_request
-
-app = FastAPI()
-
-@app.get("/")
-async def home():
-    return {"message": "Hello World"}
-
-@app.post("/translate")
-async def translate(translation_request: TranslationRequest):
-    req = await request.json()
-    response = translate_request(req)
-    if response.status_code == 200:
-        return {
-            "translated_text": response.json()["translated_text"],
-            "status": response.json()["status"],
-            "source_language": response.json()["source_language"],
-            "target_language": response.json()["target_language"]
-        }
-    else:
-        return {"error": "Failed to translate"}
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
+
+from agent_architecture.agent_workflow import create_translation_system
+from agent_architecture.States.translation_state import get_initial_translation_state
+from apis.models.requests import TranslateTextRequest
+from apis.urls import admin, batch, conversation, health, stream, translation
+from apis.services.admission import INTERACTIVE, AdmissionRejected
+from apis.urls.deps import get_cache_service, get_job_queue, get_system_sampler, get_translation_service
+from apis.utils.config import Config
+from apis.worker import JobWorker
+from config.settings import config
+from apis.utils.serialization import OrjsonResponse
+from db.read_file import serialize_translation_result
+from monitoring.metrics import track_workflow
+from monitoring.monitoring import log_translation_request, setup_logging
+from monitoring.profiling import PSTATS_MEDIA_TYPE, profile_store, run_profiled
+
+# Compile the translation graph once per process
+translation_system = create_translation_system()
+
+
+def run_translation(state: dict) -> dict:
+    with track_workflow():
+        return translation_system.invoke(state)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # sample system metrics and probe the backends in the background from the start
+    sampler = get_system_sampler()
+    # dedicated workers (apis/worker.py) run the queued jobs, in development the API can run them itself
+    worker = worker_task = None
+    if config.JOB_WORKER_IN_PROCESS:
+        worker = JobWorker(get_job_queue(), get_translation_service(), get_cache_service())
+        worker_task = asyncio.create_task(worker.run())
+    yield
+    if worker is not None:
+        worker.stop()
+        await worker_task
+    sampler.stop()
+
+
+def create_app() -> FastAPI:
+    """
+    Create the FastAPI app, every route responds through orjson by default
+    """
+    setup_logging()
+    app = FastAPI(title="Agentic AI Machine Translator", default_response_class=OrjsonResponse,
+                  lifespan=lifespan)
+
+    @app.exception_handler(AdmissionRejected)
+    async def admission_rejected(request: Request, exc: AdmissionRejected):
+        # shed load early, the client retries once the queue had time to drain
+        return OrjsonResponse(
+            {"detail": str(exc), "priority": exc.priority, "reason": exc.reason},
+            status_code=503,
+            headers={"Retry-After": str(max(1, round(exc.retry_after)))}
+        )
+
+    @app.get("/")
+    async def home():
+        return {"message": "Hello World"}
+
+    @app.post("/translate")
+    async def translate(translation_request: TranslateTextRequest, debug: bool = False,
+                        profile: bool = Depends(admin.profiling_requested)):
+        state = get_initial_translation_state(translation_request.model_dump())
+        # the direct graph call takes its slot from the service's admission control like chat traffic
+        async with get_translation_service().admission.admit(INTERACTIVE):
+            if profile:
+                result, pstats = await asyncio.to_thread(run_profiled, run_translation, state)
+            else:
+                result = await asyncio.to_thread(run_translation, state)
+        serialized = serialize_translation_result(result, include_messages=debug)
+        if profile:
+            profile_id = profile_store.add("cprofile", "pstats", PSTATS_MEDIA_TYPE, pstats).profile_id
+            serialized["profile_id"] = profile_id
+            serialized["profile_url"] = f"{admin.router.prefix}/{profile_id}"
+        log_translation_request(state, serialized)
+        # returning the response directly skips FastAPI's jsonable_encoder pass
+        return OrjsonResponse(serialized)
+
+    app.include_router(batch.router)
+    app.include_router(stream.router)
+    app.include_router(conversation.router)
+    app.include_router(health.router)
+    app.include_router(admin.router)
+    # the cached translation API, /translate above stays the direct graph call
+    app.include_router(translation.router, prefix=f"/api/{Config.API_VERSION}")
+
+    return app
+
+
+app = create_app()
@@ -1,5 +1,6 @@
 from datetime import datetime
-from pydantic import BaseModel
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class TranslateTextRequest(BaseModel):
@@ -14,11 +15,34 @@ class TranslateMultipleTextRequest(BaseModel):
     target_language: str = "es"
 
 
+class BatchTranslationRequest(BaseModel):
+    texts: list[str] = Field(..., min_length=1)
+    source_language: str = "auto"
+    target_language: str = "es"
+
+
 class TranslateJsonRequest(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     msg_o: str
-    from: str = "customer"
+    from_: str = Field("customer", alias="from")  # "from" is a keyword, the JSON field keeps its name
     name: str
     ts: datetime
     msg: str
-    source_lang: str = None
-    channel: str = "api"
\ No newline at end of file
+    source_lang: Optional[str] = None
+    channel: str = "api"
+
+
+class ConversationTurnRequest(BaseModel):
+    """A turn sent over the conversation WebSocket, "from" defaults to the agent"""
+    model_config = ConfigDict(populate_by_name=True)
+
+    msg_o: str
+    from_: Optional[str] = Field(None, alias="from")
+    name: Optional[str] = None
+    ts: Optional[datetime] = None
+
+
+class ConversationGlossaryRequest(BaseModel):
+    """Session glossary terms, source term (customer language) -> target term (agent language)"""
+    terms: dict[str, str]
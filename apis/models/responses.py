@@ -1,5 +1,46 @@
+from datetime import datetime
+from typing import Any, Optional
 from pydantic import BaseModel
 
 
 class TranslationResponse(BaseModel):
-    pass
\ No newline at end of file
+    request_id: str
+    status: str
+    source_text: str
+    source_language: str
+    target_language: str
+    translation: Optional[str] = None
+    complexity: Optional[str] = None
+    quality_metrics: Optional[dict[str, Any]] = None
+    agent_history: list[str] = []
+    processing_time: float = 0.0
+    cached: bool = False
+    message: Optional[str] = None
+    timestamp: datetime
+
+
+class ErrorResponse(BaseModel):
+    detail: str
+    request_id: Optional[str] = None
+
+
+class BatchResult(BaseModel):
+    index: int
+    source_text: str
+    translation: Optional[str] = None
+    status: str
+    quality_score: float = 0.0
+    processing_time: float = 0.0
+    cached: bool = False
+    error_message: Optional[str] = None
+
+
+class BatchTranslationResponse(BaseModel):
+    batch_id: str
+    status: str
+    total_count: int
+    completed_count: int
+    success_count: int = 0
+    results: list[BatchResult] = []
+    message: Optional[str] = None
+    timestamp: datetime
\ No newline at end of file
@@ -0,0 +1,208 @@
+"""
+This module contains the priority-aware admission control of backend capacity.
+
+Every graph run needs one of the capacity slots of its process (see get_backend_capacity).
+Requests belong to a priority class:
+- interactive: chat and short API translations
+- inline_batch: small batches translated while the client waits for the response
+- document: long translations run by the job worker
+- bulk: queued batches and NDJSON streams
+
+The controller arbitrates within one process. The queued jobs run on dedicated job workers
+and the backend capacity is split up front (config.WORKER_CAPACITY_SHARE): the API arbitrates
+chat against inline batches and streams, and the workers arbitrate queued documents against
+queued batches in their reserved share, which can't take the API's slots. When the API runs
+the queued jobs itself (config.JOB_WORKER_IN_PROCESS, for development) its controller
+arbitrates all of them alike.
+
+Free slots go straight to the caller. Otherwise the caller waits, and freed slots are
+handed out by weighted fair queueing: each waiter gets a virtual finish tag of
+max(virtual time, last tag of its class) + 1 / weight and the smallest tag goes next, so
+under contention the classes share capacity in proportion to PRIORITY_WEIGHTS and a bulk
+flood can't starve chat.
+
+Deadlines: a request waits at most PRIORITY_MAX_QUEUE_TIME of its class. It is rejected
+up front when the predicted wait (waiters ahead of it x average service time / capacity)
+already exceeds that, and rejected when the deadline passes while still queued. Rejections
+raise AdmissionRejected, which the API answers with 503 and Retry-After.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from apis.utils.config import Config
+from monitoring.metrics import ADMISSION_WAIT, ADMISSIONS
+
+
+INTERACTIVE = "interactive"
+INLINE_BATCH = "inline_batch"
+DOCUMENT = "document"
+BULK = "bulk"
+
+SERVICE_TIME_SMOOTHING = 0.2  # weight of the newest service time in the moving average
+
+
+class AdmissionRejected(Exception):
+    """
+    A request was not admitted within its class's queue time
+    Args:
+        priority (str): The priority class
+        reason (str): "predicted_wait" or "deadline"
+        retry_after (float): Seconds after which a retry is likely to be admitted
+    """
+    def __init__(self, priority: str, reason: str, retry_after: float):
+        super().__init__(f"{priority} request rejected: {reason.replace('_', ' ')} exceeds the queue time")
+        self.priority = priority
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass(order=True)
+class Waiter:
+    finish_tag: float
+    sequence: int
+    priority: str = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    timer: asyncio.TimerHandle = field(compare=False, default=None)
+
+
+class AdmissionController:
+    """
+    Weighted fair queueing of capacity slots with per-class queue deadlines
+    Args:
+        capacity (int): Slots, graph runs at once
+        weights (dict): priority class -> share weight
+        max_queue_times (dict): priority class -> seconds a request may wait
+    """
+    def __init__(self, capacity: int, weights: Dict[str, int] = None, max_queue_times: Dict[str, float] = None):
+        self.capacity = capacity
+        self.weights = weights or Config.PRIORITY_WEIGHTS
+        self.max_queue_times = max_queue_times or Config.PRIORITY_MAX_QUEUE_TIME
+        self.in_use = 0
+        self.waiters: List[Waiter] = []
+        self.queued = 0
+        self.sequence = itertools.count()
+        self.virtual_time = 0.0
+        self.last_finish_tags = {priority: 0.0 for priority in self.weights}
+        self.service_time = Config.ADMISSION_INITIAL_SERVICE_TIME
+        self.metrics = {
+            priority: {"admitted": 0, "rejected": 0, "expired": 0, "total_wait": 0.0}
+            for priority in self.weights
+        }
+
+    def predict_wait(self, finish_tag: float) -> float:
+        """Expected queue time of a request with this finish tag"""
+        ahead = sum(1 for waiter in self.waiters if waiter.finish_tag <= finish_tag and not waiter.future.done())
+        return (ahead + 1) * self.service_time / self.capacity
+
+    async def acquire(self, priority: str):
+        """
+        Wait for a capacity slot
+        Raises:
+            AdmissionRejected: The wait would exceed, or did exceed, the class's queue time
+        """
+        if priority not in self.weights:
+            raise ValueError(f"Unknown priority class {priority}")
+        if self.in_use < self.capacity and not self.queued:
+            self.in_use += 1
+            self._admitted(priority, 0.0)
+            return
+
+        max_queue_time = self.max_queue_times[priority]
+        finish_tag = max(self.virtual_time, self.last_finish_tags[priority]) + 1 / self.weights[priority]
+        predicted_wait = self.predict_wait(finish_tag)
+        if predicted_wait > max_queue_time:
+            self.metrics[priority]["rejected"] += 1
+            ADMISSIONS.labels(priority, "rejected").inc()
+            raise AdmissionRejected(priority, "predicted_wait", predicted_wait)
+
+        loop = asyncio.get_running_loop()
+        self.last_finish_tags[priority] = finish_tag
+        waiter = Waiter(finish_tag, next(self.sequence), priority, time.monotonic(), loop.create_future())
+        waiter.timer = loop.call_later(max_queue_time, self._expire, waiter)
+        heapq.heappush(self.waiters, waiter)
+        self.queued += 1
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+                self.release()  # the slot was granted as the caller went away
+            else:
+                self._dequeued(waiter)
+            raise
+
+    def release(self, service_time: float = None):
+        """Free a slot and hand it to the next waiter"""
+        if service_time is not None:
+            self.service_time += SERVICE_TIME_SMOOTHING * (service_time - self.service_time)
+        self.in_use -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def admit(self, priority: str):
+        """
+        Hold a capacity slot for the block
+        Usage:
+            async with admission.admit("interactive"):
+                await run_graph()
+        """
+        await self.acquire(priority)
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start_time)
+
+    def _dispatch(self):
+        while self.in_use < self.capacity and self.waiters:
+            waiter = heapq.heappop(self.waiters)
+            if waiter.future.done():
+                continue
+            self._dequeued(waiter)
+            self.virtual_time = waiter.finish_tag
+            self.in_use += 1
+            waiter.future.set_result(None)
+            self._admitted(waiter.priority, time.monotonic() - waiter.enqueued_at)
+        if not self.queued:
+            # idle classes don't bank credit while the queue is empty
+            self.last_finish_tags = dict.fromkeys(self.last_finish_tags, self.virtual_time)
+
+    def _expire(self, waiter: Waiter):
+        if waiter.future.done():
+            return
+        self._dequeued(waiter)
+        self.metrics[waiter.priority]["expired"] += 1
+        ADMISSIONS.labels(waiter.priority, "expired").inc()
+        waiter.future.set_exception(AdmissionRejected(waiter.priority, "deadline", self.service_time))
+
+    def _dequeued(self, waiter: Waiter):
+        self.queued -= 1
+        if waiter.timer is not None:
+            waiter.timer.cancel()
+            waiter.timer = None
+
+    def _admitted(self, priority: str, wait: float):
+        self.metrics[priority]["admitted"] += 1
+        self.metrics[priority]["total_wait"] += wait
+        ADMISSIONS.labels(priority, "admitted").inc()
+        ADMISSION_WAIT.labels(priority).observe(wait)
+
+    def get_metrics(self) -> dict:
+        metrics = {
+            "in_use": self.in_use,
+            "queued": self.queued,
+            "service_time": self.service_time,
+        }
+        for priority, counts in self.metrics.items():
+            metrics[priority] = {
+                "admitted": counts["admitted"],
+                "rejected": counts["rejected"],
+                "expired": counts["expired"],
+                "avg_wait": counts["total_wait"] / counts["admitted"] if counts["admitted"] else 0.0,
+            }
+        return metrics
@@ -0,0 +1,264 @@
+"""
+This module contains the two-tier cache of translation results used by the API.
+
+- L1: an in-process LRU bounded by entries and a short TTL, answers repeated texts without I/O
+- L2: Redis at REDIS_URL, shared by all API processes and kept for REDIS_TTL
+
+Redis is optional. Without REDIS_URL, or while Redis is unreachable, the cache runs on L1
+alone and retries L2 after REDIS_RETRY_INTERVAL. REDIS_URL=memory:// uses an in-memory fake
+Redis (see fake_redis.py) for tests. Values go to Redis as orjson.
+
+Translations are keyed by the content hash of the exact text and language pair, texts that
+differ only in their line structure translate to different layouts. A whole batch is looked
+up with one get_many (one MGET) and stored with one set_many (one pipeline). get_or_set
+(used through get_or_translate by the NDJSON stream) protects against stampedes: concurrent
+misses of one key await a single loader (see single_flight.py), and TTLs are jittered so
+entries written together don't expire together.
+"""
+import logging
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+import xxhash
+
+from apis.services.fake_redis import FakeRedis
+from apis.services.single_flight import SingleFlight
+from apis.utils.config import Config
+from apis.utils.serialization import dumps, loads
+from monitoring.metrics import CACHE_REQUESTS
+
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+
+def create_redis_client(redis_url: str):
+    """
+    Create the L2 client for a URL, None disables L2 and memory:// gives the fake Redis
+    """
+    if not redis_url:
+        return None
+    if redis_url.startswith("memory://"):
+        return FakeRedis()
+    try:
+        import redis.asyncio as redis
+    except ImportError:
+        logger.warning("redis is not installed, the cache runs without L2")
+        return None
+    return redis.from_url(redis_url, socket_connect_timeout=Config.REDIS_TIMEOUT,
+                          socket_timeout=Config.REDIS_TIMEOUT)
+
+
+class LocalCache:
+    """
+    In-process LRU cache with a time to live
+    Args:
+        max_entries (int): Number of entries kept, the least recently used are evicted
+        ttl (int): Seconds an entry stays valid
+    """
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: str) -> Any:
+        """Get a value, MISSING when the key is absent or expired"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return MISSING
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            return MISSING
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        self.entries[key] = (value, time.monotonic() + (ttl or self.ttl))
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def delete(self, key: str):
+        self.entries.pop(key, None)
+
+
+class CacheService:
+    """
+    L1 in-process LRU in front of an optional L2 Redis
+    Args:
+        max_entries (int): Number of L1 entries
+        ttl (int): Seconds an entry stays in L1
+        redis_client: An asyncio Redis client, created from REDIS_URL when not given
+        redis_ttl (int): Seconds an entry stays in L2
+    """
+    def __init__(self, max_entries: int = Config.CACHE_MAX_ENTRIES, ttl: int = Config.CACHE_TTL,
+                 redis_client=MISSING, redis_ttl: int = Config.REDIS_TTL):
+        self.l1 = LocalCache(max_entries, ttl)
+        self.l2 = create_redis_client(Config.REDIS_URL) if redis_client is MISSING else redis_client
+        self.redis_ttl = redis_ttl
+        self.l2_retry_at = 0.0
+        self.loads = SingleFlight()
+        self.metrics = {
+            "l1": {"hits": 0, "misses": 0},
+            "l2": {"hits": 0, "misses": 0, "errors": 0},
+        }
+
+    @staticmethod
+    def translation_key(text: str, source_language: str, target_language: str) -> str:
+        key_text = f"{source_language}\0{target_language}\0{text}"
+        return f"translation:{xxhash.xxh3_64_intdigest(key_text.encode('utf-8')):016x}"
+
+    @staticmethod
+    def translation_value(result) -> dict:
+        """The cached form of a TranslationResult, without the agent history kept for debugging"""
+        value = result.to_dict()
+        value.pop("agent_history", None)
+        return value
+
+    @staticmethod
+    def jitter(ttl: float) -> float:
+        return ttl * (1 + random.uniform(0, Config.CACHE_TTL_JITTER))
+
+    def l2_available(self) -> bool:
+        return self.l2 is not None and time.monotonic() >= self.l2_retry_at
+
+    def _l2_failed(self, error: Exception):
+        """Skip L2 for a while, the cache keeps serving from L1"""
+        if self.l2_retry_at <= time.monotonic():
+            logger.warning(f"Redis unavailable, using the local cache only: {error}")
+        self.metrics["l2"]["errors"] += 1
+        self.l2_retry_at = time.monotonic() + Config.REDIS_RETRY_INTERVAL
+
+    async def get(self, key: str) -> Optional[Any]:
+        return (await self.get_many([key])).get(key)
+
+    async def set(self, key: str, value: Any, ttl: int = None):
+        await self.set_many({key: value}, ttl)
+
+    async def delete(self, key: str):
+        self.l1.delete(key)
+        if self.l2_available():
+            try:
+                await self.l2.delete(key)
+            except Exception as e:
+                self._l2_failed(e)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Look up several keys, L1 first and the L1 misses with one MGET on L2
+        Returns:
+            dict: key -> value for the keys that are cached
+        """
+        found = {}
+        l1_misses = []
+        for key in dict.fromkeys(keys):
+            value = self.l1.get(key)
+            if value is MISSING:
+                l1_misses.append(key)
+            else:
+                found[key] = value
+        self.metrics["l1"]["hits"] += len(found)
+        self.metrics["l1"]["misses"] += len(l1_misses)
+        CACHE_REQUESTS.labels("l1", "hit").inc(len(found))
+        CACHE_REQUESTS.labels("l1", "miss").inc(len(l1_misses))
+
+        if l1_misses and self.l2_available():
+            try:
+                values = await self.l2.mget(l1_misses)
+            except Exception as e:
+                self._l2_failed(e)
+                return found
+            for key, value in zip(l1_misses, values):
+                if value is None:
+                    self.metrics["l2"]["misses"] += 1
+                    CACHE_REQUESTS.labels("l2", "miss").inc()
+                    continue
+                self.metrics["l2"]["hits"] += 1
+                CACHE_REQUESTS.labels("l2", "hit").inc()
+                found[key] = loads(value)
+                self.l1.set(key, found[key], self.jitter(self.l1.ttl))
+        return found
+
+    async def set_many(self, mapping: Dict[str, Any], ttl: int = None):
+        """
+        Store several values in L1 and with one pipeline in L2
+        Args:
+            mapping (dict): key -> value
+            ttl (int): Seconds the values stay in L2, L1 keeps its own shorter TTL
+        """
+        for key, value in mapping.items():
+            self.l1.set(key, value, self.jitter(min(ttl or self.l1.ttl, self.l1.ttl)))
+        if not mapping or not self.l2_available():
+            return
+        try:
+            pipeline = self.l2.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipeline.set(key, dumps(value), ex=int(self.jitter(ttl or self.redis_ttl)))
+            await pipeline.execute()
+        except Exception as e:
+            self._l2_failed(e)
+
+    async def get_or_set(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: int = None) -> Any:
+        """
+        Get a value, loading and caching it on a miss
+        Concurrent misses of the same key await the first caller's loader instead of loading again.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        async def load():
+            value = await loader()
+            await self.set(key, value, ttl)
+            return value
+
+        return await self.loads.do(key, load)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Hits, misses and hit rates per tier
+        """
+        metrics = {
+            "l1": dict(self.metrics["l1"], entries=len(self.l1)),
+            "l2": dict(self.metrics["l2"], enabled=self.l2 is not None, available=self.l2_available()),
+            "loads": self.loads.metrics["calls"],
+            "load_waits": self.loads.metrics["coalesced"],
+        }
+        for tier in ("l1", "l2"):
+            lookups = metrics[tier]["hits"] + metrics[tier]["misses"]
+            metrics[tier]["hit_rate"] = metrics[tier]["hits"] / lookups if lookups else 0.0
+        lookups = metrics["l1"]["hits"] + metrics["l1"]["misses"]
+        metrics["hit_rate"] = (metrics["l1"]["hits"] + metrics["l2"]["hits"]) / lookups if lookups else 0.0
+        return metrics
+
+    async def close(self):
+        if self.l2 is not None:
+            await self.l2.close()
+
+    async def get_translation(self, text: str, source_language: str, target_language: str) -> Optional[dict]:
+        return await self.get(self.translation_key(text, source_language, target_language))
+
+    async def cache_translation(self, text: str, source_language: str, target_language: str, result):
+        await self.set(self.translation_key(text, source_language, target_language), self.translation_value(result))
+
+    async def get_or_translate(self, text: str, source_language: str, target_language: str,
+                               translate: Callable[[], Awaitable[Any]]) -> dict:
+        """
+        Get a cached translation, concurrent misses of the same text await one translate() call
+        Args:
+            translate: Returns the TranslationResult of the text on a miss
+
+        Returns:
+            dict: The cached form of the translation, see translation_value
+        """
+        async def load():
+            return self.translation_value(await translate())
+
+        return await self.get_or_set(self.translation_key(text, source_language, target_language), load)
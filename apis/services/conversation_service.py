@@ -0,0 +1,156 @@
+"""
+This module contains the conversation sessions of the WebSocket channel.
+
+A session is a two-party support chat between a customer and an agent who write in
+different languages. It keeps one ConversationState resident for the life of the
+connection: the translation memory, the session glossary and the conversation context
+are built up turn by turn and handed to the graph by reference, instead of every turn
+rebuilding them from nothing.
+
+Turns are translated in both directions: customer turns from the customer language to the
+agent language, agent turns back. The translation memory is keyed by target language so
+one memory serves both directions; the glossary is given customer -> agent and inverted for
+agent turns. A turn the memory already holds exactly is answered from it without a graph run.
+
+Session ids are issued by the server and signed (SESSION_SECRET), only a signed id resumes
+the persisted context of a session, so a client can't read another session by guessing ids.
+"""
+import hashlib
+import hmac
+import logging
+import time
+import uuid
+from typing import Dict, Optional
+
+from agent_architecture.States.conversation_state import get_initial_conversation_state
+from agent_architecture.States.translation_memory import BoundedTranslationMemory
+from apis.services.admission import INTERACTIVE
+from apis.services.translation_service import TranslationResult, TranslationService
+from apis.utils.config import Config
+from config.settings import config
+from db.write_behind import get_write_behind_queue
+from translation_services.base_translate import ConversationContextTracking
+
+
+logger = logging.getLogger(__name__)
+
+CUSTOMER = "customer"
+AGENT = "agent"
+TRANSLATION_MEMORY_SERVICE = "translation_memory"
+SIGNATURE_LENGTH = 32  # hex characters of the session id signature
+
+
+def sign_session_id(session_id: str) -> str:
+    return hmac.new(Config.SESSION_SECRET.encode(), session_id.encode(), hashlib.sha256).hexdigest()[:SIGNATURE_LENGTH]
+
+
+def issue_session_id() -> str:
+    """A new session id, "{id}.{signature}" """
+    session_id = uuid.uuid4().hex
+    return f"{session_id}.{sign_session_id(session_id)}"
+
+
+def verify_session_id(session_id: str) -> bool:
+    """Whether a session id was issued by this server (same SESSION_SECRET)"""
+    session_id, _, signature = session_id.rpartition(".")
+    return bool(session_id) and hmac.compare_digest(signature, sign_session_id(session_id))
+
+
+class ConversationSession:
+    """
+    Resident state of one two-party conversation
+    Args:
+        session_id (str): The conversation, persisted with the context
+        customer_language (str): The language the customer writes in
+        agent_language (str): The language the agent writes in
+        domain (str): The terminology domain e.g. "medical"
+        conversation_context (list): Earlier context entries when a session is resumed
+    """
+    def __init__(self, session_id: str, customer_language: str, agent_language: str, domain: str = None,
+                 conversation_context: list = None):
+        self.session_id = session_id
+        self.languages = {CUSTOMER: customer_language, AGENT: agent_language}
+        self.domain = domain
+        self.conversation_state = get_initial_conversation_state()
+        self.conversation_state["translation_memory"] = BoundedTranslationMemory()
+        self.conversation_state["conversation_context"] = list(conversation_context or [])
+        self.glossaries: Dict[str, Dict[str, str]] = {CUSTOMER: {}, AGENT: {}}
+        self.turns = 0
+        self.memory_hits = 0
+
+    def get_direction(self, speaker: str) -> tuple[str, str]:
+        """
+        (source_language, target_language) of a speaker's turns
+        Raises:
+            ValueError: The speaker is neither the customer nor the agent
+        """
+        if speaker == CUSTOMER:
+            return self.languages[CUSTOMER], self.languages[AGENT]
+        if speaker == AGENT:
+            return self.languages[AGENT], self.languages[CUSTOMER]
+        raise ValueError(f"Unknown speaker {speaker}, expected {CUSTOMER} or {AGENT}")
+
+    def add_glossary_terms(self, terms: Dict[str, str]):
+        """Add customer -> agent terms, agent turns use them inverted"""
+        self.glossaries[CUSTOMER].update(terms)
+        self.glossaries[AGENT].update({target: source for source, target in terms.items()})
+
+    async def translate_turn(self, translation_service: TranslationService, message: dict,
+                             request_id: Optional[str] = None) -> tuple[str, TranslationResult]:
+        """
+        Translate a turn against the session's resident state
+        Turns of a session must be translated one at a time, each one sees the memory and
+        context the previous ones left.
+        Args:
+            message (dict): The turn, {"msg_o": ..., "from": "customer" | "agent"}
+
+        Returns:
+            tuple[str, TranslationResult]: The speaker and the translation
+        """
+        # a turn without a speaker is the agent's, like in the two-party corpus
+        speaker = ConversationContextTracking([message]).get_speaker()[0]["from"]
+        source_language, target_language = self.get_direction(speaker)
+        self.conversation_state["terminology_glossary"] = self.glossaries[speaker]
+        self.turns += 1
+        memorized = self.conversation_state["translation_memory"].get(message["msg_o"], target_language)
+        if memorized is not None:
+            return speaker, self.remember_turn(message["msg_o"], memorized)
+        result = await translation_service.translate(
+            message["msg_o"], source_language, target_language,
+            request_id=request_id or f"{self.session_id}_{self.turns}",
+            domain=self.domain,
+            priority=INTERACTIVE,
+            conversation_state=self.conversation_state,
+            session_id=self.session_id
+        )
+        return speaker, result
+
+    def remember_turn(self, source_text: str, translated_text: str) -> TranslationResult:
+        """
+        Answer a turn from the translation memory, recording it in the context like the orchestrator does
+        """
+        start_time = time.perf_counter()
+        context_entry = f"Source: {source_text} → Target: {translated_text}"
+        conversation_context = self.conversation_state["conversation_context"]
+        conversation_context.append(context_entry)
+        del conversation_context[:-config.CONVERSATION_CONTEXT_SIZE]
+        if config.MEMORY_PERSISTENCE_ENABLED:
+            get_write_behind_queue().enqueue_conversation_context(self.session_id, context_entry)
+        self.memory_hits += 1
+        return TranslationResult(
+            translation=translated_text,
+            quality_metrics={"overall_score": 1.0},
+            agent_history=["Translation memory: exact match"],
+            processing_time=time.perf_counter() - start_time,
+            service_used=TRANSLATION_MEMORY_SERVICE,
+        )
+
+    def get_metrics(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "turns": self.turns,
+            "memory_hits": self.memory_hits,
+            "context_entries": len(self.conversation_state["conversation_context"]),
+            "translation_memory": self.conversation_state["translation_memory"].get_metrics(),
+            "glossary_terms": len(self.glossaries[CUSTOMER]),
+        }
@@ -0,0 +1,74 @@
+"""
+This module contains an in-memory stand-in for the asyncio Redis client.
+
+It implements the commands the cache service uses (get, set with ex, mget, delete, ping and
+pipelines of set), so the two-tier cache runs against REDIS_URL=memory:// in tests and
+local runs without a Redis server.
+"""
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+
+    def _get(self, key: str) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def _set(self, key: str, value: Any, ex: int = None):
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        self.data[key] = (value, time.monotonic() + ex if ex else None)
+
+    async def ping(self) -> bool:
+        return True
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._get(key)
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self._get(key) for key in keys]
+
+    async def set(self, key: str, value: Any, ex: int = None) -> bool:
+        self._set(key, value, ex)
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+    async def close(self):
+        self.data.clear()
+
+
+class FakePipeline:
+    def __init__(self, client: FakeRedis):
+        self.client = client
+        self.commands = []
+
+    def set(self, key: str, value: Any, ex: int = None) -> "FakePipeline":
+        self.commands.append((key, value, ex))
+        return self
+
+    async def execute(self) -> List[bool]:
+        for key, value, ex in self.commands:
+            self.client._set(key, value, ex)
+        results = [True] * len(self.commands)
+        self.commands = []
+        return results
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.commands = []
@@ -0,0 +1,67 @@
+"""
+This module contains single-flight coalescing of identical concurrent calls.
+
+The first caller of a key runs the call, every caller arriving with the same key while it
+is in flight awaits that run and shares its result (or its exception). Nothing is kept
+once the call completes, caching the result is left to the caller. A run is cancelled once
+every caller awaiting it was cancelled, so it doesn't hold e.g. an admission slot for nobody.
+
+Usage:
+    flights = SingleFlight()
+    result = await flights.do(key, lambda: translate(text))
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    def __init__(self):
+        self.in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.waiters: Dict[asyncio.Future, int] = {}
+        self.metrics = {"calls": 0, "coalesced": 0}
+
+    def __len__(self) -> int:
+        return len(self.in_flight)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run a call once per key at a time
+        The call runs as its own task that every caller awaits shielded, the first caller
+        included, so cancelling a caller never cancels the run the others share. The run is
+        cancelled when its last caller is.
+        Args:
+            key: Identifies identical calls
+            call: Creates the awaitable to run, only invoked by the first caller
+
+        Returns:
+            The result of the call
+        """
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.metrics["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(call())
+            self.in_flight[key] = task
+            self.metrics["calls"] += 1
+            task.add_done_callback(lambda done: self._forget(key, done))
+        self.waiters[task] = self.waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self.waiters[task] -= 1
+            if not self.waiters[task]:
+                del self.waiters[task]
+                if not task.done():
+                    # every caller left, a later caller starts a new run
+                    task.cancel()
+                    if self.in_flight.get(key) is task:
+                        del self.in_flight[key]
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved, a run whose callers all left would log it otherwise
+
+    def get_metrics(self) -> Dict[str, int]:
+        return dict(self.metrics, in_flight=len(self.in_flight))
@@ -0,0 +1,239 @@
+"""
+This module contains the translation service used by the API routes.
+
+The service owns one compiled translation graph and a thread pool sized from the backend
+capacity (config.BACKEND_CAPACITY), so the number of graphs running at once matches what
+the translation backends can take instead of a constant in each route. The capacity is split
+between the API and the job worker (config.WORKER_CAPACITY_SHARE), see get_backend_capacity. Graph runs are
+blocking, they are handed to the pool and awaited from the event loop.
+
+Identical requests in flight at the same time are coalesced (see single_flight.py): they
+are keyed by the exact text, language pair, domain, priority class and debug flag, and all
+await one graph run. A chat request never waits on a run queued as bulk work.
+
+Turns of a conversation session (see conversation_service.py) carry the session's resident
+ConversationState, they depend on it and are never coalesced. In the lean state profile
+(config.STATE_PROFILE) the turn's state only holds a handle to it (see memory_handles.py).
+
+Graph runs are admitted by priority class (see admission.py), so chat traffic keeps its
+share of the capacity while batches queue behind it.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agent_architecture.agent_workflow import create_translation_system
+from agent_architecture.States.conversation_state import ConversationState
+from agent_architecture.States.memory_handles import memory_handles
+from agent_architecture.States.translation_state import LEAN_STATE_PROFILE, get_initial_translation_state
+from apis.services.admission import BULK, INTERACTIVE, AdmissionController
+from apis.services.single_flight import SingleFlight
+from config.settings import config
+from db.read_file import serialize_translation_result
+from monitoring.metrics import COALESCED_REQUESTS, track_workflow
+from translation_services.translate_factory import TranslateFactory
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TranslationResult:
+    translation: str
+    complexity: str = "simple"
+    quality_metrics: Dict[str, Any] = field(default_factory=dict)
+    agent_history: List[str] = field(default_factory=list)
+    processing_time: float = 0.0
+    needs_human_review: bool = False
+    service_used: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+API = "api"
+WORKER = "worker"
+
+
+def get_backend_capacity(role: str = API, processes: int = None) -> int:
+    """
+    Concurrent requests one process of a role may send the translation backends
+    The job worker processes share config.WORKER_CAPACITY_SHARE of the total capacity and the
+    API processes the rest, so neither can push the backends past config.BACKEND_CAPACITY.
+    While the API runs the jobs itself (config.JOB_WORKER_IN_PROCESS) nothing is reserved.
+    Args:
+        role (str): "api" or "worker"
+        processes (int): Processes of the role, defaults to config.API_PROCESSES for the API and 1
+
+    Returns:
+        int: The process's capacity, at least 1
+    """
+    total = max(sum(config.BACKEND_CAPACITY.values()), 1)
+    worker_share = 0 if config.JOB_WORKER_IN_PROCESS else config.WORKER_CAPACITY_SHARE
+    worker_capacity = max(round(total * worker_share), 1) if worker_share > 0 else 0
+    if role == WORKER:
+        capacity = worker_capacity
+        processes = processes or 1
+    else:
+        capacity = total - worker_capacity
+        processes = processes or config.API_PROCESSES
+    return max(capacity // max(processes, 1), 1)
+
+
+class TranslationService:
+    """
+    Runs texts through the translation graph on a worker pool sized from the backend capacity
+    Args:
+        capacity (int): Concurrent graph runs, defaults to get_backend_capacity()
+        translation_system: A compiled translation graph, compiled here when not given
+    """
+    def __init__(self, capacity: int = None, translation_system=None):
+        self.capacity = capacity or get_backend_capacity()
+        self.translation_system = translation_system or create_translation_system()
+        self.executor = ThreadPoolExecutor(max_workers=self.capacity, thread_name_prefix="translation")
+        self.backends = {name: TranslateFactory().get_translate(name) for name in config.BACKEND_CAPACITY}
+        self.stats = {"total_translations": 0, "failed_translations": 0, "total_time": 0.0}
+        self.flights = SingleFlight()
+        self.admission = AdmissionController(self.capacity)
+
+    def _run_graph(self, text: str, source_language: str, target_language: str, domain: str = None,
+                   conversation_state: ConversationState = None, session_id: str = None,
+                   include_messages: bool = False) -> TranslationResult:
+        start_time = time.perf_counter()
+        state = get_initial_translation_state({
+            "source_text": text,
+            "source_language": source_language,
+            "target_language": target_language,
+        })
+        if domain:
+            state["domain"] = domain
+        run_config = None
+        memory_handle = None
+        if conversation_state is not None:
+            state["session_id"] = session_id
+            run_config = {"configurable": {"conversation_state": conversation_state}}
+            if config.STATE_PROFILE == LEAN_STATE_PROFILE:
+                # only a handle goes into the state, the orchestrator updates the session's memory through it
+                memory_handle = state["memory_handle"] = memory_handles.register(conversation_state)
+            else:
+                # the session's memory is passed by reference, the orchestrator updates it in place
+                state["translation_memory"] = conversation_state["translation_memory"]
+                state["conversation_context"] = conversation_state["conversation_context"]
+        try:
+            with track_workflow():
+                result = self.translation_system.invoke(state, config=run_config)
+        finally:
+            if memory_handle is not None:
+                memory_handles.release(memory_handle)
+        if conversation_state is not None and memory_handle is None:
+            conversation_state["conversation_context"] = result.get("conversation_context", [])
+        serialized = serialize_translation_result(result, include_messages)
+        return TranslationResult(
+            translation=serialized["translated_text"],
+            complexity=result.get("complexity") or "simple",
+            quality_metrics={
+                "overall_score": serialized["quality_score"] or 0.0,
+                "untranslated_ratio": result.get("untranslated_ratio", 0.0),
+            },
+            agent_history=serialized.get("processing_messages", []),
+            processing_time=time.perf_counter() - start_time,
+            needs_human_review=serialized["needs_human_review"],
+            service_used=serialized["service_used"],
+        )
+
+    async def translate(self, text: str, source_language: str = "auto", target_language: str = "es",
+                        request_id: str = None, domain: str = None, priority: str = INTERACTIVE,
+                        conversation_state: ConversationState = None,
+                        session_id: str = None, include_messages: bool = False) -> TranslationResult:
+        """
+        Translate one text through the graph, sharing the run of an identical request in flight
+        Args:
+            text (str): The text to translate
+            source_language (str): The source language, "auto" to detect it
+            target_language (str): The target language
+            request_id (str): The request the text belongs to, for logging
+            domain (str): The terminology domain e.g. "medical"
+            priority (str): The admission class, "interactive", "inline_batch", "document" or "bulk"
+            conversation_state (ConversationState): The resident state of a conversation session,
+                the turn is run against it and never shares another request's run
+            session_id (str): The conversation session, persisted with the context
+            include_messages (bool): Fill agent_history with the agents' processing messages, for debugging
+
+        Returns:
+            TranslationResult: The translation with its quality metrics
+
+        Raises:
+            AdmissionRejected: No capacity within the priority class's queue time
+        """
+        loop = asyncio.get_running_loop()
+
+        async def run_graph():
+            try:
+                async with self.admission.admit(priority):
+                    result = await loop.run_in_executor(
+                        self.executor, self._run_graph, text, source_language, target_language, domain,
+                        conversation_state, session_id, include_messages
+                    )
+            except Exception:
+                self.stats["failed_translations"] += 1
+                raise
+            self.stats["total_translations"] += 1
+            self.stats["total_time"] += result.processing_time
+            return result
+
+        if conversation_state is not None:
+            result = await run_graph()
+        else:
+            # the priority class is part of the key, a follower waits in its own class's queue
+            key = (text, source_language, target_language, domain, priority, include_messages)
+            if key in self.flights.in_flight:
+                COALESCED_REQUESTS.inc()
+            result = await self.flights.do(key, run_graph)
+        logger.debug(f"Translated {request_id}: {result.processing_time:.2f}s via {result.service_used}")
+        return result
+
+    async def translate_many(self, items: List[Tuple[int, str]], source_language: str = "auto",
+                             target_language: str = "es",
+                             request_id: str = None, priority: str = BULK) -> List[Tuple[int, Any]]:
+        """
+        Translate (index, text) pairs concurrently, at most capacity of them run at once
+        They are admitted as bulk work unless another priority class is given
+        Returns:
+            list: (index, TranslationResult) pairs, or (index, exception) for the failed texts
+        """
+        results = await asyncio.gather(*(
+            self.translate(text, source_language, target_language, f"{request_id}_{index}", priority=priority)
+            for index, text in items
+        ), return_exceptions=True)
+        return [(index, result) for (index, _), result in zip(items, results)]
+
+    def get_backend_probes(self) -> Dict[str, Callable[[], Any]]:
+        """
+        A probe per backend for the system sampler, each translates a short text directly
+        """
+        return {name: partial(self._probe_backend, backend) for name, backend in self.backends.items()}
+
+    @staticmethod
+    def _probe_backend(backend) -> str:
+        return backend.translate_text("Hello", "en", "es")["translated_text"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        translations = self.stats["total_translations"]
+        attempts = translations + self.stats["failed_translations"]
+        return {
+            "total_translations": translations,
+            "avg_translation_time": self.stats["total_time"] / translations if translations else 0.0,
+            "success_rate": translations / attempts if attempts else 0.0,
+            "available_services": list(self.backends),
+            "capacity": self.capacity,
+            "coalesced_requests": self.flights.metrics["coalesced"],
+            "in_flight": len(self.flights),
+            "admission": self.admission.get_metrics(),
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,93 @@
+"""
+Admin profiling endpoints
+
+Every route needs the X-Admin-Token header to match ADMIN_TOKEN; while no token is set
+they answer 404. Profiles are listed and downloaded by id:
+- POST /admin/profiling/sample?seconds=10 starts a whole-process sampling profile
+- POST /admin/profiling/memory/start, /memory/snapshot and /memory/stop drive tracemalloc
+- POST /translate?profile=1 profiles that request's graph run with cProfile
+
+Usage:
+    curl -X POST -H "X-Admin-Token: $ADMIN_TOKEN" "http://localhost:8000/admin/profiling/sample?seconds=10"
+    curl -H "X-Admin-Token: $ADMIN_TOKEN" -o profile.collapsed http://localhost:8000/admin/profiling/<profile_id>
+"""
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import Response
+
+from apis.utils.config import Config
+from apis.utils.serialization import OrjsonResponse
+from monitoring.profiling import FAILED, RUNNING, memory_profiler, profile_store, sampling_profiler
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """
+    Raises:
+        HTTPException: 404 while profiling is disabled, 403 for a wrong token
+    """
+    if not Config.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, Config.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def profiling_requested(profile: bool = False, x_admin_token: Optional[str] = Header(None)) -> bool:
+    """The ?profile=1 flag of a route, only admins may set it"""
+    if profile:
+        require_admin(x_admin_token)
+    return profile
+
+
+router = APIRouter(prefix="/admin/profiling", default_response_class=OrjsonResponse,
+                   dependencies=[Depends(require_admin)])
+
+
+@router.get("", summary="List the profiles kept for download")
+async def list_profiles():
+    return {"profiles": profile_store.list(), "memory": memory_profiler.get_status()}
+
+
+@router.post("/sample", status_code=202, summary="Start a whole-process sampling profile")
+async def start_sampling(seconds: float = Query(10.0, gt=0)):
+    try:
+        profile = sampling_profiler.start(seconds)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {**profile.describe(), "url": f"{router.prefix}/{profile.profile_id}"}
+
+
+@router.post("/memory/start", summary="Start tracing allocations with tracemalloc")
+async def start_memory_profiling(frames: Optional[int] = Query(None, gt=0)):
+    memory_profiler.start(frames)
+    return memory_profiler.get_status()
+
+
+@router.post("/memory/snapshot", summary="Snapshot allocations, diffed against the previous snapshot")
+async def take_memory_snapshot(top: Optional[int] = Query(None, gt=0)):
+    try:
+        profile = memory_profiler.snapshot(top)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {**profile.describe(), "url": f"{router.prefix}/{profile.profile_id}"}
+
+
+@router.post("/memory/stop", summary="Stop tracing allocations")
+async def stop_memory_profiling():
+    memory_profiler.stop()
+    return memory_profiler.get_status()
+
+
+@router.get("/{profile_id}", summary="Download a profile")
+async def download_profile(profile_id: str):
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    if profile.status in (RUNNING, FAILED):
+        return OrjsonResponse(profile.describe(), status_code=202 if profile.status == RUNNING else 500)
+    return Response(
+        content=profile.content,
+        media_type=profile.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{profile.filename}"'}
+    )
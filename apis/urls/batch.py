@@ -1,17 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Awaitable, Callable, List
 import asyncio
 import logging
 from datetime import datetime
 
-from app.models.requests import BatchTranslationRequest
-from app.models.responses import BatchTranslationResponse, BatchResult
-from app.services.translation_service import TranslationService
-from app.services.cache_service import CacheService
-from app.api.deps import get_translation_service, get_cache_service, generate_request_id
+from apis.models.requests import BatchTranslationRequest
+from apis.models.responses import BatchTranslationResponse, BatchResult
+from apis.services.admission import BULK, INLINE_BATCH
+from apis.services.translation_service import TranslationService
+from apis.services.cache_service import CacheService
+from apis.urls.deps import get_translation_service, get_cache_service, get_job_queue, generate_request_id
+from apis.utils.config import Config
+from agent_architecture.dedup import group_duplicates
+from apis.utils.serialization import OrjsonResponse
+from db.job_queue import SQLiteJobQueue, COMPLETED
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(default_response_class=OrjsonResponse)
 
 
 @router.post(
@@ -23,91 +28,103 @@ router = APIRouter()
 )
 async def batch_translate(
     request: BatchTranslationRequest,
-    background_tasks: BackgroundTasks,
     translation_service: TranslationService = Depends(get_translation_service),
     cache_service: CacheService = Depends(get_cache_service),
+    job_queue: SQLiteJobQueue = Depends(get_job_queue),
     batch_id: str = Depends(generate_request_id)
 ) -> BatchTranslationResponse:
     """
     Batch translation endpoint with concurrent processing
+    The whole batch is looked up in the cache at once, the distinct misses are translated in
+    chunks sized from the backend capacity and each chunk is cached with one write.
+    Batches larger than the backends take at once are enqueued for the job worker.
     """
     try:
         logger.info(f"Batch translation request: {batch_id}, {len(request.texts)} texts")
-        
+
         # Validate batch size
-        if len(request.texts) > 50:  # Configurable limit
+        if len(request.texts) > Config.BATCH_MAX_TEXTS:
             raise HTTPException(
                 status_code=400,
-                detail="Batch size exceeds maximum limit of 50 texts"
+                detail=f"Batch size exceeds maximum limit of {Config.BATCH_MAX_TEXTS} texts"
             )
-        
-        # Check for cached results
+
+        # Check for cached results, one lookup for the whole batch
+        keys = [
+            cache_service.translation_key(text, request.source_language, request.target_language)
+            for text in request.texts
+        ]
+        cached = await cache_service.get_many(set(keys))
         cached_results = []
         texts_to_process = []
-        
-        for i, text in enumerate(request.texts):
-            cached = await cache_service.get_translation(
-                text=text,
-                source_language=request.source_language,
-                target_language=request.target_language
-            )
-            
-            if cached:
+
+        for i, (text, key) in enumerate(zip(request.texts, keys)):
+            if key in cached:
                 cached_results.append(BatchResult(
                     index=i,
                     source_text=text,
-                    translation=cached["translation"],
+                    translation=cached[key]["translation"],
                     status="completed",
-                    quality_score=cached.get("quality_metrics", {}).get("overall_score", 0.0),
+                    quality_score=cached[key].get("quality_metrics", {}).get("overall_score", 0.0),
                     processing_time=0.0,
                     cached=True
                 ))
             else:
                 texts_to_process.append((i, text))
-        
+
+        # Deduplicate uncached texts, each distinct text is translated once
+        all_texts_to_process = texts_to_process
+        texts_to_process, duplicates = group_duplicates(
+            texts_to_process, request.source_language, request.target_language
+        )
+        if all_texts_to_process:
+            logger.info(
+                f"Batch {batch_id}: {len(texts_to_process)}/{len(all_texts_to_process)} unique texts, "
+                f"dedup ratio {1 - len(texts_to_process) / len(all_texts_to_process):.1%}"
+            )
+
         # Process uncached texts
         if texts_to_process:
-            if len(texts_to_process) > 10:  # Process large batches in background
-                # Store batch status
-                await cache_service.set_batch_status(
-                    batch_id=batch_id,
-                    status="processing",
-                    total_count=len(request.texts),
-                    completed_count=len(cached_results)
-                )
-                
-                background_tasks.add_task(
-                    process_batch_async,
-                    batch_id,
-                    texts_to_process,
-                    request,
-                    translation_service,
-                    cache_service
-                )
-                
+            # more than the backends can take at once is processed by the job worker
+            if len(texts_to_process) > translation_service.capacity * Config.BATCH_INLINE_WAVES:
+                await asyncio.to_thread(job_queue.enqueue, "batch", {
+                    "texts_to_process": texts_to_process,
+                    "source_language": request.source_language,
+                    "target_language": request.target_language,
+                    "duplicates": duplicates,
+                    "keys": keys,
+                    "cached_results": [result.model_dump() for result in cached_results],
+                    "total_count": len(request.texts),
+                }, batch_id)
+
                 return BatchTranslationResponse(
                     batch_id=batch_id,
-                    status="processing",
+                    status="queued",
                     total_count=len(request.texts),
                     completed_count=len(cached_results),
                     results=cached_results,
-                    message="Large batch processing in background. Check status for updates.",
+                    message="Large batch queued for background processing. Check status for updates.",
                     timestamp=datetime.now()
                 )
-            
-            # Process small batches immediately
-            processing_results = await process_texts_concurrently(
+
+            # Process small batches immediately, ahead of queued work since the client is waiting
+            processing_results = await process_texts_in_chunks(
+                batch_id,
                 texts_to_process,
-                request,
+                request.source_language,
+                request.target_language,
                 translation_service,
-                cache_service
+                cache_service,
+                duplicates,
+                keys,
+                priority=INLINE_BATCH
             )
             cached_results.extend(processing_results)
-        
+
         # Sort results by index
         all_results = sorted(cached_results, key=lambda x: x.index)
         success_count = len([r for r in all_results if r.status == "completed"])
-        
+
         return BatchTranslationResponse(
             batch_id=batch_id,
             status="completed",
@@ -117,7 +134,7 @@ async def batch_translate(
             results=all_results,
             timestamp=datetime.now()
         )
-        
+
     except HTTPException:
         raise
     except Exception as e:
@@ -125,118 +142,124 @@ async def batch_translate(
         raise HTTPException(status_code=500, detail="Batch translation failed")
 
 
-async def process_texts_concurrently(
+async def process_texts_in_chunks(
+    batch_id: str,
     texts_to_process: List[tuple],
-    request: BatchTranslationRequest,
+    source_language: str,
+    target_language: str,
     translation_service: TranslationService,
-    cache_service: CacheService
+    cache_service: CacheService,
+    duplicates: dict,
+    keys: List[str],
+    on_progress: Callable[[int], Awaitable[None]] = None,
+    priority: str = BULK
 ) -> List[BatchResult]:
     """
-    Process multiple texts concurrently with rate limiting
+    Translate texts chunk by chunk, a chunk is a few waves of the backend capacity
+    Each chunk is cached with one set_many. on_progress is awaited after every chunk with
+    the number of results so far, for background batches. The texts are admitted as bulk
+    work unless another priority class is given.
     """
-    semaphore = asyncio.Semaphore(5)  # Limit concurrent translations
-    
-    async def process_single_text(index_text_pair):
-        index, text = index_text_pair
-        async with semaphore:
-            try:
-                start_time = datetime.now()
-                
-                result = await translation_service.translate(
-                    text=text,
-                    source_language=request.source_language,
-                    target_language=request.target_language,
-                    request_id=f"batch_{index}"
-                )
-                
-                processing_time = (datetime.now() - start_time).total_seconds()
-                
-                # Cache individual result
-                await cache_service.cache_translation(
-                    text=text,
-                    source_language=request.source_language,
-                    target_language=request.target_language,
-                    result=result
-                )
-                
-                return BatchResult(
-                    index=index,
-                    source_text=text,
-                    translation=result.translation,
-                    status="completed",
-                    quality_score=result.quality_metrics.get("overall_score", 0.0),
-                    processing_time=processing_time,
-                    cached=False
-                )
-                
-            except Exception as e:
-                logger.error(f"Failed to process text at index {index}: {e}")
-                return BatchResult(
+    chunk_size = translation_service.capacity * Config.BATCH_CHUNK_WAVES
+    processed_results = []
+
+    for start in range(0, len(texts_to_process), chunk_size):
+        chunk = texts_to_process[start:start + chunk_size]
+        chunk_start = datetime.now()
+        translated = await translation_service.translate_many(
+            chunk,
+            source_language=source_language,
+            target_language=target_language,
+            request_id=batch_id,
+            priority=priority
+        )
+
+        chunk_results = []
+        to_cache = {}
+        for (index, result), (_, text) in zip(translated, chunk):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to process text at index {index}: {result}")
+                chunk_results.append(BatchResult(
                     index=index,
                     source_text=text,
                     status="failed",
-                    error_message=str(e),
+                    error_message=str(result),
                     processing_time=0.0,
                     cached=False
-                )
-    
-    # Process all texts concurrently
-    tasks = [process_single_text(item) for item in texts_to_process]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # Handle any exceptions
-    processed_results = []
-    for i, result in enumerate(results):
-        if isinstance(result, Exception):
-            index, text = texts_to_process[i]
-            processed_results.append(BatchResult(
+                ))
+                continue
+
+            to_cache[keys[index]] = cache_service.translation_value(result)
+            chunk_results.append(BatchResult(
                 index=index,
                 source_text=text,
-                status="failed",
-                error_message=str(result),
-                processing_time=0.0,
+                translation=result.translation,
+                status="completed",
+                quality_score=result.quality_metrics.get("overall_score", 0.0),
+                processing_time=result.processing_time,
                 cached=False
             ))
-        else:
-            processed_results.append(result)
-    
+
+        # Cache the chunk in one write
+        if to_cache:
+            await cache_service.set_many(to_cache)
+        processed_results.extend(fan_out_duplicates(chunk_results, duplicates))
+        logger.info(
+            f"Batch {batch_id}: chunk of {len(chunk)} texts in "
+            f"{(datetime.now() - chunk_start).total_seconds():.2f}s"
+        )
+
+        if on_progress is not None:
+            await on_progress(len(processed_results))
+
     return processed_results
 
 
-async def process_batch_async(
-    batch_id: str,
-    texts_to_process: List[tuple],
-    request: BatchTranslationRequest,
+def fan_out_duplicates(results: List[BatchResult], duplicates: dict) -> List[BatchResult]:
+    """
+    Copy the result of each translated text to the indexes of its duplicates
+    """
+    fanned_out = list(results)
+    for result in results:
+        for index in duplicates.get(result.index, []):
+            fanned_out.append(result.model_copy(update={"index": index}))
+    return fanned_out
+
+
+async def process_batch_job(
+    job_id: str,
+    payload: dict,
     translation_service: TranslationService,
-    cache_service: CacheService
-):
+    cache_service: CacheService,
+    report_progress: Callable[[dict], None]
+) -> List[dict]:
     """
-    Background task for large batch processing
+    Run a background batch enqueued by batch_translate, called by the job worker (apis/worker.py)
+    Returns:
+        list[dict]: Every result of the batch, cached ones included, by index
     """
-    try:
-        results = await process_texts_concurrently(
-            texts_to_process,
-            request,
-            translation_service,
-            cache_service
-        )
-        
-        # Store final batch results
-        await cache_service.set_batch_results(batch_id, results)
-        await cache_service.set_batch_status(
-            batch_id=batch_id,
-            status="completed",
-            total_count=len(texts_to_process),
-            completed_count=len(results)
-        )
-        
-    except Exception as e:
-        logger.error(f"Background batch processing failed for {batch_id}: {e}")
-        await cache_service.set_batch_status(
-            batch_id=batch_id,
-            status="failed",
-            error=str(e)
-        )
+    cached_results = [BatchResult(**result) for result in payload["cached_results"]]
+    duplicates = {int(index): indexes for index, indexes in payload["duplicates"].items()}
+
+    async def on_progress(processed_count: int):
+        report_progress({
+            "total_count": payload["total_count"],
+            "completed_count": len(cached_results) + processed_count,
+        })
+
+    results = await process_texts_in_chunks(
+        job_id,
+        [tuple(item) for item in payload["texts_to_process"]],
+        payload["source_language"],
+        payload["target_language"],
+        translation_service,
+        cache_service,
+        duplicates,
+        payload["keys"],
+        on_progress
+    )
+    all_results = sorted(cached_results + results, key=lambda x: x.index)
+    return [result.model_dump() for result in all_results]
 
 
 @router.get(
@@ -246,34 +269,42 @@ async def process_batch_async(
 )
 async def get_batch_status(
     batch_id: str,
-    cache_service: CacheService = Depends(get_cache_service)
+    job_queue: SQLiteJobQueue = Depends(get_job_queue)
 ):
     """
-    Get batch translation status and progress
+    Get batch translation status and progress, with the results once the batch completed
     """
     try:
-        status_data = await cache_service.get_batch_status(batch_id)
-        
-        if not status_data:
+        job = await asyncio.to_thread(job_queue.get, batch_id)
+
+        if not job or job.kind != "batch":
             raise HTTPException(
                 status_code=404,
                 detail=f"Batch request {batch_id} not found"
             )
-        
-        return {
+
+        total_count = job.payload["total_count"]
+        if job.status == COMPLETED:
+            completed_count = total_count
+        else:
+            completed_count = (job.progress or {}).get("completed_count", len(job.payload["cached_results"]))
+
+        response = {
             "batch_id": batch_id,
-            "status": status_data.get("status"),
-            "total_count": status_data.get("total_count", 0),
-            "completed_count": status_data.get("completed_count", 0),
-            "progress_percentage": (status_data.get("completed_count", 0) / 
-                                  max(status_data.get("total_count", 1), 1)) * 100,
-            "error_message": status_data.get("error"),
+            "status": job.status,
+            "total_count": total_count,
+            "completed_count": completed_count,
+            "progress_percentage": (completed_count / max(total_count, 1)) * 100,
+            "attempts": job.attempts,
+            "error_message": job.error,
             "timestamp": datetime.now()
         }
-        
+        if job.status == COMPLETED:
+            response["results"] = job.result or []
+        return response
+
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Batch status check failed for {batch_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve batch status")
-
@@ -0,0 +1,126 @@
+"""
+WebSocket conversation channel
+
+A connection is one two-party conversation session (see apis/services/conversation_service.py):
+its translation memory, glossary and context stay resident between turns, so a turn costs
+one graph run and no context reload or reconnect.
+
+Client messages are JSON:
+- a turn: {"msg_o": "...", "from": "customer" | "agent", "name": ..., "ts": ...}
+- glossary terms: {"type": "glossary", "terms": {"customer term": "agent term"}}
+
+Every turn is answered with a "translation" message, in order; invalid messages and
+rejected turns are answered with an "error" message and the session stays open.
+The first message is the session's signed id; passing it back as session_id resumes the
+persisted conversation context, an id that wasn't issued by the server is refused.
+
+Usage:
+    ws://localhost:8000/translate/conversation?customer_language=en&agent_language=es
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from apis.models.requests import ConversationGlossaryRequest, ConversationTurnRequest
+from apis.services.admission import AdmissionRejected
+from apis.services.conversation_service import ConversationSession, issue_session_id, verify_session_id
+from apis.urls.deps import get_memory_store, get_translation_service
+from apis.utils.config import Config
+from apis.utils.serialization import dumps, loads
+from config.settings import config
+
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+async def send_message(websocket: WebSocket, message: dict):
+    await websocket.send_text(dumps(message).decode())
+
+
+async def handle_message(websocket: WebSocket, session: ConversationSession, data: dict):
+    """
+    Apply a glossary message or translate a turn, answering on the socket
+    """
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+    if data.get("type") == "glossary":
+        glossary = ConversationGlossaryRequest.model_validate(data)
+        session.add_glossary_terms(glossary.terms)
+        await send_message(websocket, {"type": "glossary", "terms": len(session.glossaries["customer"])})
+        return
+
+    turn = ConversationTurnRequest.model_validate(data)
+    message = turn.model_dump(by_alias=True, exclude_none=True)
+    try:
+        speaker, result = await session.translate_turn(get_translation_service(), message)
+    except AdmissionRejected as e:
+        await send_message(websocket, {"type": "error", "turn": session.turns, "error": str(e),
+                                       "retry_after": e.retry_after})
+        return
+
+    source_language, target_language = session.get_direction(speaker)
+    await send_message(websocket, {
+        "type": "translation",
+        "turn": session.turns,
+        "from": speaker,
+        "name": turn.name,
+        "ts": turn.ts,
+        "source_language": source_language,
+        "target_language": target_language,
+        "source_text": turn.msg_o,
+        "translated_text": result.translation,
+        "quality_score": result.quality_metrics.get("overall_score", 0.0),
+        "service_used": result.service_used,
+        "needs_human_review": result.needs_human_review,
+        "processing_time": result.processing_time,
+    })
+
+
+@router.websocket("/translate/conversation")
+async def conversation(
+    websocket: WebSocket,
+    customer_language: str = "en",
+    agent_language: str = "es",
+    domain: Optional[str] = None,
+    session_id: Optional[str] = None
+):
+    """
+    Conversational translation channel with session-resident state
+    """
+    await websocket.accept()
+    if session_id and not verify_session_id(session_id):
+        await send_message(websocket, {"type": "error", "error": "Unknown session_id"})
+        await websocket.close(code=1008, reason="Unknown session_id")
+        return
+    conversation_context = []
+    if session_id and config.MEMORY_PERSISTENCE_ENABLED:
+        # loaded once per connection, every later turn reuses the resident context
+        conversation_context = await asyncio.to_thread(
+            get_memory_store().get_conversation_context, session_id, config.CONVERSATION_CONTEXT_SIZE
+        )
+    session = ConversationSession(session_id or issue_session_id(), customer_language, agent_language,
+                                  domain, conversation_context)
+    await send_message(websocket, {"type": "session", "session_id": session.session_id,
+                                   "resumed_context": len(conversation_context)})
+    logger.info(f"Conversation {session.session_id} opened, {customer_language} <-> {agent_language}")
+
+    try:
+        while True:
+            raw = await asyncio.wait_for(websocket.receive_text(), Config.CONVERSATION_IDLE_TIMEOUT)
+            try:
+                await handle_message(websocket, session, loads(raw))
+            except (ValueError, ValidationError) as e:
+                await send_message(websocket, {"type": "error", "error": f"Invalid message: {e}"})
+            except Exception as e:
+                logger.error(f"Conversation {session.session_id}: turn {session.turns} failed: {e}")
+                await send_message(websocket, {"type": "error", "turn": session.turns,
+                                               "error": "Translation failed"})
+    except WebSocketDisconnect:
+        pass
+    except asyncio.TimeoutError:
+        await websocket.close(code=1000, reason="Idle timeout")
+    logger.info(f"Conversation {session.session_id} closed: {session.get_metrics()}")
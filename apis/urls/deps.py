@@ -0,0 +1,47 @@
+"""
+This module contains the dependencies shared by the API routes.
+The services are created once per process on first use.
+"""
+import uuid
+from functools import lru_cache
+
+from apis.services.cache_service import CacheService
+from apis.services.translation_service import TranslationService
+from config.settings import config
+from db.job_queue import SQLiteJobQueue
+from db.memory_store import SQLiteMemoryStore
+from monitoring.system_sampler import SystemSampler
+
+
+@lru_cache(maxsize=None)
+def get_translation_service() -> TranslationService:
+    return TranslationService()
+
+
+@lru_cache(maxsize=None)
+def get_cache_service() -> CacheService:
+    return CacheService()
+
+
+@lru_cache(maxsize=None)
+def get_job_queue() -> SQLiteJobQueue:
+    return SQLiteJobQueue(config.JOB_QUEUE_PATH, config.JOB_VISIBILITY_TIMEOUT, config.JOB_MAX_ATTEMPTS,
+                          config.JOB_RETENTION)
+
+
+@lru_cache(maxsize=None)
+def get_memory_store() -> SQLiteMemoryStore:
+    """Read side of the persisted memory, the write-behind queue writes it"""
+    return SQLiteMemoryStore(config.MEMORY_STORE_PATH)
+
+
+@lru_cache(maxsize=None)
+def get_system_sampler() -> SystemSampler:
+    """The sampler is started on first use, the app starts it at startup"""
+    sampler = SystemSampler(get_translation_service().get_backend_probes())
+    sampler.start()
+    return sampler
+
+
+def generate_request_id() -> str:
+    return uuid.uuid4().hex
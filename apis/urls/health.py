@@ -1,18 +1,22 @@
+import asyncio
 from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import PlainTextResponse, Response
 import logging
 from datetime import datetime
-import psutil
-import asyncio
 
-from translation_service.services import TranslationService
-from app.services.cache_service import CacheService
-from app.api.deps import get_translation_service, get_cache_service
-from app.core.config import get_settings
+from apis.services.translation_service import TranslationService
+from apis.services.cache_service import CacheService
+from apis.urls.deps import get_translation_service, get_cache_service, get_job_queue, get_system_sampler
+from config.settings import config
+from db.job_queue import SQLiteJobQueue
+from db.write_behind import get_write_behind_metrics
+from monitoring.metrics import get_workflows_in_flight, render_metrics
+from monitoring.monitoring import get_logging_metrics
+from monitoring.system_sampler import SystemSampler
+from apis.utils.serialization import OrjsonResponse
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
-settings = get_settings()
+router = APIRouter(default_response_class=OrjsonResponse)
 
 
 @router.get(
@@ -21,11 +25,12 @@ settings = get_settings()
     description="Check system health and service connectivity"
 )
 async def health_check(
-    translation_service: TranslationService = Depends(get_translation_service),
-    cache_service: CacheService = Depends(get_cache_service)
+    cache_service: CacheService = Depends(get_cache_service),
+    sampler: SystemSampler = Depends(get_system_sampler)
 ):
     """
     Comprehensive health check for all system components
+    Reads the background sampler's snapshot, nothing is measured on the request path.
     """
     health_status = {
         "status": "healthy",
@@ -37,13 +42,13 @@ async def health_check(
     
     try:
         # Check translation services
-        health_status["services"]["translation"] = await check_translation_services(translation_service)
+        health_status["services"]["translation"] = check_translation_services(sampler)
         
         # Check cache service
-        health_status["services"]["cache"] = await check_cache_service(cache_service)
+        health_status["services"]["cache"] = check_cache_service(cache_service)
         
         # System metrics
-        health_status["system"] = get_system_metrics()
+        health_status["system"] = sampler.get_system()
         
         # Overall health determination
         all_services_healthy = all(
@@ -53,7 +58,7 @@ async def health_check(
         
         if not all_services_healthy:
             health_status["status"] = "degraded"
-            return JSONResponse(
+            return OrjsonResponse(
                 status_code=200,  # Still return 200 for degraded state
                 content=health_status
             )
@@ -64,7 +69,7 @@ async def health_check(
         logger.error(f"Health check failed: {e}")
         health_status["status"] = "unhealthy"
         health_status["error"] = str(e)
-        return JSONResponse(status_code=503, content=health_status)
+        return OrjsonResponse(status_code=503, content=health_status)
 
 
 @router.get(
@@ -73,14 +78,16 @@ async def health_check(
     description="Get detailed system performance and usage statistics"
 )
 async def get_system_stats(
-    cache_service: CacheService = Depends(get_cache_service)
+    translation_service: TranslationService = Depends(get_translation_service),
+    cache_service: CacheService = Depends(get_cache_service),
+    job_queue: SQLiteJobQueue = Depends(get_job_queue),
+    sampler: SystemSampler = Depends(get_system_sampler)
 ):
     """
     Detailed system statistics and performance metrics
     """
     try:
-        # Get cached statistics
-        cached_stats = await cache_service.get_system_stats()
+        cached_stats = get_service_stats(translation_service, cache_service)
         
         stats = {
             "timestamp": datetime.now().isoformat(),
@@ -89,6 +96,7 @@ async def get_system_stats(
                 "total_translations": cached_stats.get("total_translations", 0),
                 "success_rate": cached_stats.get("success_rate", 0.0),
                 "cache_hit_rate": cached_stats.get("cache_hit_rate", 0.0),
+                "coalesced_requests": cached_stats.get("coalesced_requests", 0),
                 "quality_improvement": "49.7%"
             },
             "agents": {
@@ -96,7 +104,16 @@ async def get_system_stats(
                 "active_workflows": cached_stats.get("active_workflows", 0),
                 "avg_agent_processing_time": cached_stats.get("avg_agent_time", 0.0)
             },
-            "system": get_system_metrics(),
+            "system": sampler.get_system(),
+            "cache": cache_service.get_metrics(),
+            "admission": cached_stats.get("admission", {}),
+            "logging": get_logging_metrics(),
+            "write_behind": get_write_behind_metrics(),
+            "jobs": {
+                # "external": the queued jobs only run while python -m apis.worker does
+                "worker": "in_process" if config.JOB_WORKER_IN_PROCESS else "external",
+                "counts": await asyncio.to_thread(job_queue.get_counts),
+            },
             "services": {
                 "translation_services": cached_stats.get("available_services", []),
                 "uptime": cached_stats.get("uptime", "99.9%")
@@ -107,7 +124,7 @@ async def get_system_stats(
         
     except Exception as e:
         logger.error(f"Stats endpoint failed: {e}")
-        return JSONResponse(
+        return OrjsonResponse(
             status_code=500,
             content={"error": "Failed to retrieve system statistics"}
         )
@@ -115,182 +132,70 @@ async def get_system_stats(
 
 @router.get(
     "/metrics",
-    summary="Prometheus-style metrics",
-    description="Get system metrics in Prometheus format for monitoring"
+    summary="Prometheus metrics",
+    description="Get the latency histograms, counters and gauges in the Prometheus text format"
 )
-async def get_metrics(
-    cache_service: CacheService = Depends(get_cache_service)
-):
+async def get_metrics():
     """
-    Prometheus-style metrics endpoint
+    Prometheus metrics endpoint, aggregated over the worker processes in multiprocess mode
     """
     try:
-        stats = await cache_service.get_system_stats()
-        
-        metrics = f"""# HELP translation_total Total number of translations processed
-# TYPE translation_total counter
-translation_total {stats.get('total_translations', 0)}
-
-# HELP translation_duration_seconds Average translation processing time
-# TYPE translation_duration_seconds gauge
-translation_duration_seconds {stats.get('avg_translation_time', 0.0)}
-
-# HELP translation_success_rate Success rate of translations
-# TYPE translation_success_rate gauge  
-translation_success_rate {stats.get('success_rate', 0.0)}
-
-# HELP cache_hit_rate Cache hit rate
-# TYPE cache_hit_rate gauge
-cache_hit_rate {stats.get('cache_hit_rate', 0.0)}
-
-# HELP active_workflows Number of active translation workflows
-# TYPE active_workflows gauge
-active_workflows {stats.get('active_workflows', 0)}
-"""
-        
-        return JSONResponse(
-            content=metrics,
-            media_type="text/plain"
-        )
+        content, content_type = render_metrics()
+        return Response(content=content, media_type=content_type)
         
     except Exception as e:
         logger.error(f"Metrics endpoint failed: {e}")
-        return JSONResponse(
+        return PlainTextResponse(
             status_code=500,
             content="# Error retrieving metrics\n"
         )
 
 
-async def check_translation_services(translation_service: TranslationService) -> dict:
+def check_translation_services(sampler: SystemSampler) -> dict:
     """
-    Check health of all translation services
+    Health of the translation services from the latest background probes
     """
+    backends = sampler.get_backends()
     service_health = {
         "status": "healthy",
-        "services": {}
+        "services": backends["services"],
+        "checked_at": backends["sampled_at"],
+        "age_seconds": backends["age_seconds"],
+        "stale": backends["stale"]
     }
     
-    try:
-        # Test LibreTranslate
-        libre_status = await test_service_connectivity(
-            translation_service.libretranslate_service,
-            "Hello", "en", "es"
-        )
-        service_health["services"]["libretranslate"] = libre_status
-        
-        # Test Google Translate if available
-        if hasattr(translation_service, 'google_translate_service'):
-            google_status = await test_service_connectivity(
-                translation_service.google_translate_service,
-                "Hello", "en", "es"
-            )
-            service_health["services"]["google_translate"] = google_status
-        
-        # Test AI services
-        if hasattr(translation_service, 'anthropic_client'):
-            service_health["services"]["anthropic"] = {"status": "available"}
-        
-        # Determine overall status
-        service_statuses = [s.get("status") for s in service_health["services"].values()]
-        if any(status == "unhealthy" for status in service_statuses):
-            service_health["status"] = "degraded"
-        
-        return service_health
-        
-    except Exception as e:
-        logger.error(f"Translation service health check failed: {e}")
-        return {"status": "unhealthy", "error": str(e)}
-
-
-async def test_service_connectivity(service_func, test_text: str, source: str, target: str) -> dict:
-    """
-    Test connectivity to a specific translation service
-    """
-    try:
-        start_time = datetime.now()
-        result = await asyncio.wait_for(
-            service_func(test_text, source, target),
-            timeout=5.0
-        )
-        response_time = (datetime.now() - start_time).total_seconds()
-        
-        if result[0]:  # If translation was successful
-            return {
-                "status": "healthy",
-                "response_time": response_time,
-                "last_check": datetime.now().isoformat()
-            }
-        else:
-            return {
-                "status": "unhealthy",
-                "response_time": response_time,
-                "error": "Service returned empty result"
-            }
-            
-    except asyncio.TimeoutError:
-        return {
-            "status": "unhealthy",
-            "error": "Service timeout (>5s)",
-            "last_check": datetime.now().isoformat()
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "last_check": datetime.now().isoformat()
-        }
+    # Determine overall status
+    service_statuses = [s.get("status") for s in service_health["services"].values()]
+    if backends["stale"]:
+        service_health["status"] = "unknown"
+    elif any(status == "unhealthy" for status in service_statuses):
+        service_health["status"] = "degraded"
+    
+    return service_health
 
 
-async def check_cache_service(cache_service: CacheService) -> dict:
+def check_cache_service(cache_service: CacheService) -> dict:
     """
-    Check Redis cache connectivity and performance
+    Cache health from its counters, L2 is degraded while Redis is unreachable
     """
-    try:
-        start_time = datetime.now()
-        
-        # Test basic operations
-        test_key = "health_check_test"
-        await cache_service.set(test_key, "test_value", ttl=60)
-        result = await cache_service.get(test_key)
-        await cache_service.delete(test_key)
-        
-        response_time = (datetime.now() - start_time).total_seconds()
-        
-        if result == "test_value":
-            return {
-                "status": "healthy",
-                "response_time": response_time,
-                "last_check": datetime.now().isoformat()
-            }
-        else:
-            return {
-                "status": "unhealthy",
-                "error": "Cache read/write test failed"
-            }
-            
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "last_check": datetime.now().isoformat()
-        }
+    metrics = cache_service.get_metrics()
+    l2 = metrics["l2"]
+    return {
+        "status": "healthy" if not l2["enabled"] or l2["available"] else "degraded",
+        "l1_entries": metrics["l1"]["entries"],
+        "l2_enabled": l2["enabled"],
+        "l2_available": l2["available"],
+        "l2_errors": l2["errors"],
+        "hit_rate": metrics["hit_rate"]
+    }
 
 
-def get_system_metrics() -> dict:
+def get_service_stats(translation_service: TranslationService, cache_service: CacheService) -> dict:
     """
-    Get system resource metrics
+    Translation and cache statistics of this process
     """
-    try:
-        return {
-            "cpu_usage": psutil.cpu_percent(interval=1),
-            "memory_usage": psutil.virtual_memory().percent,
-            "disk_usage": psutil.disk_usage('/').percent,
-            "load_average": psutil.getloadavg()[0] if hasattr(psutil, 'getloadavg') else 0.0,
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Failed to get system metrics: {e}")
-        return {
-            "error": "Failed to retrieve system metrics",
-            "timestamp": datetime.now().isoformat()
-        }
\ No newline at end of file
+    return {
+        **translation_service.get_stats(),
+        "cache_hit_rate": cache_service.get_metrics()["hit_rate"],
+        "active_workflows": get_workflows_in_flight(),
+    }
@@ -0,0 +1,187 @@
+"""
+NDJSON streaming translation endpoint
+
+POST /translate/stream takes a body of newline-delimited TranslateJsonRequest records and
+answers with one NDJSON result line per record, in input order, while the upload is still
+being read. Records are parsed one line at a time and at most capacity x
+STREAM_IN_FLIGHT_WAVES of them are in flight; when the window is full the body is not read
+further, so TCP backpressure slows the client down and neither side holds the batch in
+memory. When the client disconnects the translations in flight are cancelled, the one
+being awaited included, so they give their admission slots back.
+
+Usage:
+    curl -N -H "Content-Type: application/x-ndjson" --data-binary @messages.ndjson \
+        "http://localhost:8000/translate/stream?target_language=es"
+"""
+import asyncio
+import logging
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+
+from apis.models.requests import TranslateJsonRequest
+from apis.services.admission import BULK
+from apis.services.cache_service import CacheService
+from apis.services.translation_service import TranslationService
+from apis.urls.deps import get_cache_service, get_translation_service, generate_request_id
+from apis.utils.config import Config
+from apis.utils.serialization import dumps, loads
+
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    Streaming response whose body iterator still reads the request body
+    Starlette's disconnect listener would consume the request body messages, so it is not
+    started; a disconnect surfaces through request.stream() or the failing send instead.
+    """
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[bytes]:
+    """
+    Split a byte stream into lines without buffering more than one line
+    Raises:
+        ValueError: A line is longer than max_line_bytes
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+        if len(buffer) > max_line_bytes:
+            raise ValueError(f"NDJSON line longer than {max_line_bytes} bytes")
+    if buffer.strip():
+        yield buffer
+
+
+async def translate_record(index: int, line: bytes, target_language: str, request_id: str,
+                           translation_service: TranslationService, cache_service: CacheService) -> bytes:
+    """
+    Translate one NDJSON record into its NDJSON result line
+    """
+    try:
+        record = TranslateJsonRequest.model_validate(loads(line))
+    except (ValueError, ValidationError) as e:
+        return dumps({"index": index, "success": False, "error": f"Invalid record: {e}"}) + b"\n"
+
+    source_language = record.source_lang or "auto"
+    result = {
+        "index": index,
+        "name": record.name,
+        "from": record.from_,
+        "ts": record.ts,
+        "source_lang": source_language,
+        "target_language": target_language,
+    }
+    try:
+        cached = await cache_service.get_or_translate(
+            record.msg_o, source_language, target_language,
+            lambda: translation_service.translate(
+                record.msg_o, source_language, target_language, f"{request_id}_{index}", priority=BULK
+            )
+        )
+        result.update({
+            "success": True,
+            "translated_text": cached["translation"],
+            "quality_score": cached.get("quality_metrics", {}).get("overall_score", 0.0),
+            "service_used": cached.get("service_used"),
+            "needs_human_review": cached.get("needs_human_review", False),
+        })
+    except Exception as e:
+        logger.error(f"Stream {request_id}: record {index} failed: {e}")
+        result.update({"success": False, "error": str(e)})
+    return dumps(result) + b"\n"
+
+
+async def stream_translations(request: Request, target_language: str, request_id: str,
+                              translation_service: TranslationService,
+                              cache_service: CacheService) -> AsyncIterator[bytes]:
+    """
+    Translate the records of the request body as they arrive, yielding results in input order
+    A reader task starts one translation per record into a bounded queue; when the queue is
+    full the reader stops reading the body until the oldest result was sent.
+    """
+    in_flight = asyncio.Queue(maxsize=translation_service.capacity * Config.STREAM_IN_FLIGHT_WAVES)
+    disconnected = asyncio.get_running_loop().create_future()
+    count = 0
+
+    async def read_records():
+        nonlocal count
+        try:
+            try:
+                async for line in iter_lines(request.stream(), Config.STREAM_MAX_LINE_BYTES):
+                    await in_flight.put(asyncio.create_task(translate_record(
+                        count, line, target_language, request_id, translation_service, cache_service
+                    )))
+                    count += 1
+            except ValueError as e:
+                await in_flight.put(dumps({"index": count, "success": False, "error": str(e)}) + b"\n")
+            finally:
+                await in_flight.put(None)
+            # the body is read, the next message is the disconnect (or the end of the response)
+            while (await request.receive())["type"] != "http.disconnect":
+                pass
+        except ClientDisconnect:
+            pass
+        if not disconnected.done():
+            disconnected.set_result(None)
+
+    reader = asyncio.create_task(read_records())
+    current = None
+    try:
+        while (item := await in_flight.get()) is not None:
+            if isinstance(item, bytes):
+                yield item
+                continue
+            current = item
+            await asyncio.wait((current, disconnected), return_when=asyncio.FIRST_COMPLETED)
+            if not current.done():
+                logger.info(f"Stream {request_id}: client disconnected after {count} records")
+                break
+            current = None
+            yield item.result()
+    finally:
+        reader.cancel()
+        if current is not None:
+            current.cancel()
+        while not in_flight.empty():
+            item = in_flight.get_nowait()
+            if isinstance(item, asyncio.Task):
+                item.cancel()
+        logger.info(f"Stream {request_id}: {count} records")
+
+
+@router.post(
+    "/translate/stream",
+    summary="Stream translate NDJSON records",
+    description="Translate newline-delimited TranslateJsonRequest records, results are streamed back as NDJSON"
+)
+async def stream_translate(
+    request: Request,
+    target_language: str = "es",
+    translation_service: TranslationService = Depends(get_translation_service),
+    cache_service: CacheService = Depends(get_cache_service),
+    request_id: str = Depends(generate_request_id)
+):
+    """
+    Streaming NDJSON translation endpoint
+    """
+    return DuplexStreamingResponse(
+        stream_translations(request, target_language, request_id, translation_service, cache_service),
+        media_type=NDJSON_MEDIA_TYPE
+    )
@@ -1,21 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException
 from typing import Optional
+import asyncio
 import logging
 from datetime import datetime
 
-from apis.models.requests import TranslateTextRequest, TranslateJsonRequest, TranslateMultipleTextRequest
-from apis.models.responses import TranslationResponse, ErrorResponse
-from translation_service.services import TranslationService
-from translation_service.services import CacheService
-from apis.urls.deps import get_translation_service, get_cache_service, generate_request_id
+from apis.models.requests import TranslateTextRequest
+from apis.models.responses import TranslationResponse
+from apis.services.admission import DOCUMENT, INTERACTIVE, AdmissionRejected
+from apis.services.translation_service import TranslationService
+from apis.services.cache_service import CacheService
+from apis.urls.deps import get_translation_service, get_cache_service, get_job_queue, generate_request_id
+from apis.utils.serialization import OrjsonResponse
+from db.job_queue import SQLiteJobQueue, COMPLETED
 
 
 # assign logger
 logger = logging.getLogger(__name__)
 
 # assign router
-router = APIRouter()
+router = APIRouter(default_response_class=OrjsonResponse)
 
 
 @router.post(
@@ -26,21 +29,23 @@ router = APIRouter()
     description="Translates text with 49.7% better quality through specialized agent collaboration"
 )
 async def translate_text(
-    request: TranslationRequest,
-    background_tasks: BackgroundTasks,
+    request: TranslateTextRequest,
+    debug: bool = False,
     translation_service: TranslationService = Depends(get_translation_service),
     cache_service: CacheService = Depends(get_cache_service),
+    job_queue: SQLiteJobQueue = Depends(get_job_queue),
     request_id: str = Depends(generate_request_id)
 ) -> TranslationResponse:
     """
     Main translation endpoint with intelligent agent routing
+    With debug=true the agents' processing messages are returned in agent_history and the cache is bypassed.
     """
     try:
         logger.info(f"Translation request received: {request_id}")
         
-        # Check cache first
-        cached_result = await cache_service.get_translation(
-            text=request.text,
+        # Check cache first, cached entries don't keep the agent history
+        cached_result = None if debug else await cache_service.get_translation(
+            text=request.source_text,
             source_language=request.source_language,
             target_language=request.target_language
         )
@@ -50,40 +55,25 @@ async def translate_text(
             return TranslationResponse(
                 request_id=request_id,
                 status="completed",
-                source_text=request.text,
+                source_text=request.source_text,
                 source_language=request.source_language,
                 target_language=request.target_language,
                 translation=cached_result["translation"],
                 complexity=cached_result.get("complexity", "simple"),
                 quality_metrics=cached_result.get("quality_metrics"),
-                agent_history=cached_result.get("agent_history", []),
                 processing_time=0.0,
                 cached=True,
                 timestamp=datetime.now()
             )
         
-        # For long-running translations, process in background
-        if len(request.text) > 1000 or request.complexity == "technical":
-            # Store initial status
-            await cache_service.set_translation_status(
-                request_id=request_id,
-                status="processing",
-                metadata={"started_at": datetime.now().isoformat()}
-            )
-            
-            # Process in background
-            background_tasks.add_task(
-                process_translation_async,
-                request_id,
-                request,
-                translation_service,
-                cache_service
-            )
+        # For long-running translations, queue a job for the job worker
+        if len(request.source_text) > 1000:
+            await asyncio.to_thread(job_queue.enqueue, "translation", request.model_dump(), request_id)
             
             return TranslationResponse(
                 request_id=request_id,
-                status="processing",
-                source_text=request.text,
+                status="queued",
+                source_text=request.source_text,
                 source_language=request.source_language,
                 target_language=request.target_language,
                 message="Translation in progress. Check status endpoint for updates.",
@@ -92,15 +82,17 @@ async def translate_text(
         
         # Process immediately for simple/short translations
         result = await translation_service.translate(
-            text=request.text,
+            text=request.source_text,
             source_language=request.source_language,
             target_language=request.target_language,
-            request_id=request_id
+            request_id=request_id,
+            priority=INTERACTIVE,
+            include_messages=debug
         )
         
         # Cache the result
         await cache_service.cache_translation(
-            text=request.text,
+            text=request.source_text,
             source_language=request.source_language,
             target_language=request.target_language,
             result=result
@@ -109,7 +101,7 @@ async def translate_text(
         return TranslationResponse(
             request_id=request_id,
             status="completed",
-            source_text=request.text,
+            source_text=request.source_text,
             source_language=request.source_language,
             target_language=request.target_language,
             translation=result.translation,
@@ -121,6 +113,9 @@ async def translate_text(
             timestamp=datetime.now()
         )
         
+    except AdmissionRejected:
+        raise
+    
     except ValueError as e:
         logger.error(f"Validation error for request {request_id}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -141,29 +136,33 @@ async def translate_text(
 )
 async def get_translation_status(
     request_id: str,
-    cache_service: CacheService = Depends(get_cache_service)
+    job_queue: SQLiteJobQueue = Depends(get_job_queue)
 ):
     """
-    Get translation status and progress
+    Get translation status and progress, with the result once the job completed
     """
     try:
-        status_data = await cache_service.get_translation_status(request_id)
+        job = await asyncio.to_thread(job_queue.get, request_id)
         
-        if not status_data:
+        if not job or job.kind != "translation":
             raise HTTPException(
                 status_code=404,
                 detail=f"Translation request {request_id} not found"
             )
         
-        return {
+        progress = job.progress or {}
+        response = {
             "request_id": request_id,
-            "status": status_data.get("status"),
-            "current_agent": status_data.get("current_agent"),
-            "progress_percentage": status_data.get("progress", 0),
-            "estimated_completion": status_data.get("estimated_completion"),
-            "error_message": status_data.get("error"),
+            "status": job.status,
+            "current_agent": progress.get("current_agent"),
+            "progress_percentage": 100 if job.status == COMPLETED else progress.get("progress", 0),
+            "attempts": job.attempts,
+            "error_message": job.error,
             "timestamp": datetime.now()
         }
+        if job.status == COMPLETED:
+            response["result"] = job.result
+        return response
         
     except HTTPException:
         raise
@@ -172,44 +171,31 @@ async def get_translation_status(
         raise HTTPException(status_code=500, detail="Failed to retrieve status")
 
 
-async def process_translation_async(
-    request_id: str,
-    request: TranslationRequest,
+async def process_translation_job(
+    job_id: str,
+    payload: dict,
     translation_service: TranslationService,
-    cache_service: CacheService
-):
+    cache_service: CacheService,
+    report_progress
+) -> dict:
     """
-    Background task for processing long translations
+    Run a background translation enqueued by translate_text, called by the job worker (apis/worker.py)
     """
-    try:
-        # Update status
-        await cache_service.set_translation_status(
-            request_id, "translating", {"current_agent": "intelligence_router"}
-        )
-        
-        # Process translation
-        result = await translation_service.translate(
-            text=request.text,
-            source_language=request.source_language,
-            target_language=request.target_language,
-            request_id=request_id
-        )
-        
-        # Cache result
-        await cache_service.cache_translation(
-            text=request.text,
-            source_language=request.source_language,
-            target_language=request.target_language,
-            result=result
-        )
-        
-        # Update final status
-        await cache_service.set_translation_status(
-            request_id, "completed", {"completed_at": datetime.now().isoformat()}
-        )
-        
-    except Exception as e:
-        logger.error(f"Background translation failed for {request_id}: {e}")
-        await cache_service.set_translation_status(
-            request_id, "failed", {"error": str(e)}
-        )
+    request = TranslateTextRequest(**payload)
+    report_progress({"current_agent": "intelligence_router", "progress": 0})
+    result = await translation_service.translate(
+        text=request.source_text,
+        source_language=request.source_language,
+        target_language=request.target_language,
+        request_id=job_id,
+        priority=DOCUMENT
+    )
+    
+    # Cache result
+    await cache_service.cache_translation(
+        text=request.source_text,
+        source_language=request.source_language,
+        target_language=request.target_language,
+        result=result
+    )
+    return result.to_dict()
@@ -1,4 +1,5 @@
 import os
+import secrets
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -16,13 +17,52 @@ class Config:
     FASTAPI_PORT = int(os.getenv("FASTAPI_PORT", 8000))
     API_VERSION = os.getenv("API_VERSION", "v1")
 
+    # Admin settings, the profiling endpoints are disabled while no token is set
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
     # rate limit settings
     RATE_LIMIT_WINDOW = int(os.getenv("RATE_LIMIT_WINDOW", 60))
     RATE_LIMIT_MAX_REQUESTS = int(os.getenv("RATE_LIMIT_MAX_REQUESTS", 100))
     
-    # Redis settings
+    # Batch settings, sizes are in multiples of the backend capacity (config.BACKEND_CAPACITY)
+    BATCH_MAX_TEXTS = int(os.getenv("BATCH_MAX_TEXTS", 10000))
+    BATCH_CHUNK_WAVES = int(os.getenv("BATCH_CHUNK_WAVES", 4))  # texts per chunk = capacity x waves
+    BATCH_INLINE_WAVES = int(os.getenv("BATCH_INLINE_WAVES", 1))  # larger batches run in the background
+
+    # Admission control, backend capacity is shared by weight and a request waits at most its class's time
+    PRIORITY_WEIGHTS = {
+        "interactive": int(os.getenv("PRIORITY_WEIGHT_INTERACTIVE", 8)),
+        "inline_batch": int(os.getenv("PRIORITY_WEIGHT_INLINE_BATCH", 4)),
+        "document": int(os.getenv("PRIORITY_WEIGHT_DOCUMENT", 3)),
+        "bulk": int(os.getenv("PRIORITY_WEIGHT_BULK", 1)),
+    }
+    PRIORITY_MAX_QUEUE_TIME = {
+        "interactive": float(os.getenv("PRIORITY_MAX_QUEUE_TIME_INTERACTIVE", 2)),
+        "inline_batch": float(os.getenv("PRIORITY_MAX_QUEUE_TIME_INLINE_BATCH", 30)),
+        "document": float(os.getenv("PRIORITY_MAX_QUEUE_TIME_DOCUMENT", 60)),
+        "bulk": float(os.getenv("PRIORITY_MAX_QUEUE_TIME_BULK", 900)),
+    }
+    ADMISSION_INITIAL_SERVICE_TIME = float(os.getenv("ADMISSION_INITIAL_SERVICE_TIME", 1.0))
+
+    # NDJSON streaming settings
+    STREAM_IN_FLIGHT_WAVES = int(os.getenv("STREAM_IN_FLIGHT_WAVES", 2))  # records in flight = capacity x waves
+    STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", 1024 * 1024))
+
+    # Conversation channel settings
+    CONVERSATION_IDLE_TIMEOUT = float(os.getenv("CONVERSATION_IDLE_TIMEOUT", 900))  # seconds without a message
+    # signs the issued session ids, set it so sessions can be resumed across restarts and processes
+    SESSION_SECRET = os.getenv("SESSION_SECRET") or secrets.token_hex(32)
+
+    # Cache settings, the in-process L1 in front of Redis
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 100000))
+    CACHE_TTL = int(os.getenv("CACHE_TTL", 600))
+    CACHE_TTL_JITTER = float(os.getenv("CACHE_TTL_JITTER", 0.1))  # fraction added at random to TTLs
+
+    # Redis settings, an empty REDIS_URL disables L2 and memory:// uses an in-memory fake
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
     REDIS_TTL = int(os.getenv("REDIS_TTL", 3600))
+    REDIS_TIMEOUT = float(os.getenv("REDIS_TIMEOUT", 0.5))
+    REDIS_RETRY_INTERVAL = int(os.getenv("REDIS_RETRY_INTERVAL", 30))
     
     # Paths
     PROJECT_ROOT = Path(__file__).parent.parent
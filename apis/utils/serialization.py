@@ -0,0 +1,52 @@
+"""
+This module contains the orjson serialization used by every API response.
+
+orjson serializes dicts, lists, datetimes, dataclasses and UUIDs natively in C, so routes
+return pre-shaped dicts (see db.read_file.serialize_translation_result) and the response
+class encodes them in one pass, without the jsonable_encoder walk of the default
+JSONResponse. Pydantic models are dumped to dicts on the way.
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def default_serializer(value: Any) -> Any:
+    """
+    Serialize the types orjson doesn't support natively
+    """
+    if hasattr(value, "model_dump"):  # pydantic models
+        return value.model_dump(mode="json")
+    if hasattr(value, "content"):  # LangChain messages
+        return value.content
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize content to JSON bytes with orjson
+    """
+    return orjson.dumps(content, default=default_serializer, option=ORJSON_OPTIONS)
+
+
+def loads(content) -> Any:
+    """
+    Parse JSON bytes or str with orjson
+    """
+    return orjson.loads(content)
+
+
+class OrjsonResponse(JSONResponse):
+    """
+    JSON response rendered with orjson, used as the default response class of the app and routers
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,205 @@
+"""
+Job worker for background translations
+
+Runs the jobs the API enqueues in the job queue (see db/job_queue.py), outside of the API
+process: long translations ("translation") and large batches ("batch"). Each worker
+process owns a TranslationService sized from the worker's share of the backend capacity
+(config.WORKER_CAPACITY_SHARE, split over --processes) and claims up to that many jobs at once;
+results are written to the cache and the job row, where the status endpoints read them.
+
+While a job runs its visibility timeout is extended and its progress recorded. A job
+whose worker dies becomes visible again after the timeout and is retried by another worker.
+
+Run at least one worker next to the API, queued jobs wait until a worker claims them. For
+development, JOB_WORKER_IN_PROCESS=true makes the API process run its own JobWorker instead
+(see config.JOB_WORKER_IN_PROCESS), the API then takes the whole backend capacity.
+
+Usage:
+    python -m apis.worker
+    python -m apis.worker --processes 4 --concurrency 8
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import socket
+import sys
+import uuid
+from typing import Dict, Optional
+
+from apis.services.cache_service import CacheService
+from apis.services.translation_service import WORKER, TranslationService, get_backend_capacity
+from apis.urls.batch import process_batch_job
+from apis.urls.translation import process_translation_job
+from config.settings import config
+from db.job_queue import Job, SQLiteJobQueue
+from monitoring.metrics import mark_process_dead
+from monitoring.monitoring import setup_logging
+
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {
+    "translation": process_translation_job,
+    "batch": process_batch_job,
+}
+MAX_HEARTBEAT_INTERVAL = 5.0  # seconds between progress writes of a running job
+
+
+class JobWorker:
+    """
+    Claims jobs from the queue and runs them on the translation service
+    Args:
+        job_queue (SQLiteJobQueue): The queue shared with the API
+        translation_service (TranslationService): Runs the graph
+        cache_service (CacheService): Receives the translations
+        concurrency (int): Jobs run at once, defaults to the translation service capacity
+    """
+    def __init__(self, job_queue: SQLiteJobQueue, translation_service: TranslationService,
+                 cache_service: CacheService, concurrency: int = None):
+        self.job_queue = job_queue
+        self.translation_service = translation_service
+        self.cache_service = cache_service
+        self.concurrency = concurrency or translation_service.capacity
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.heartbeat_interval = min(job_queue.visibility_timeout / 3, MAX_HEARTBEAT_INTERVAL)
+        self.stopping = asyncio.Event()
+
+    def stop(self):
+        self.stopping.set()
+
+    async def run(self):
+        """Claim and run jobs until stopped, then wait for the running jobs"""
+        logger.info(f"Worker {self.worker_id} started, {self.concurrency} concurrent jobs")
+        running = set()
+        while not self.stopping.is_set():
+            job = None
+            if len(running) < self.concurrency:
+                job = await asyncio.to_thread(self.job_queue.claim, self.worker_id)
+            if job is not None:
+                running.add(asyncio.create_task(self.run_job(job)))
+                continue
+
+            # idle or full: wait for a job to finish, new jobs or the stop signal
+            waiters = set(running) | {asyncio.create_task(self.stopping.wait())}
+            done, _ = await asyncio.wait(waiters, timeout=config.JOB_POLL_INTERVAL,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            running -= done
+            for waiter in waiters - running:
+                waiter.cancel()
+
+        if running:
+            logger.info(f"Worker {self.worker_id} stopping, waiting for {len(running)} jobs")
+            await asyncio.gather(*running, return_exceptions=True)
+
+    async def run_job(self, job: Job):
+        logger.info(f"Running {job.kind} job {job.id}, attempt {job.attempts}/{job.max_attempts}")
+        progress: Dict[str, Optional[dict]] = {"latest": None}
+        progress_changed = asyncio.Event()
+
+        def report_progress(update: dict):
+            progress["latest"] = update
+            progress_changed.set()
+
+        finished = asyncio.Event()
+        heartbeat = asyncio.create_task(self.heartbeat(job, progress, progress_changed, finished))
+        try:
+            handler = JOB_HANDLERS[job.kind]
+            result = await handler(job.id, job.payload, self.translation_service, self.cache_service,
+                                   report_progress)
+        except Exception as e:
+            logger.error(f"{job.kind} job {job.id} failed: {e}")
+            await self.stop_heartbeat(heartbeat, finished)
+            await asyncio.to_thread(self.job_queue.fail, job.id, self.worker_id, str(e), config.JOB_RETRY_DELAY)
+            return
+        await self.stop_heartbeat(heartbeat, finished)
+        if not await asyncio.to_thread(self.job_queue.complete, job.id, self.worker_id, result):
+            logger.warning(f"{job.kind} job {job.id} was reclaimed by another worker, result dropped")
+
+    async def heartbeat(self, job: Job, progress: dict, progress_changed: asyncio.Event,
+                        finished: asyncio.Event):
+        """Extend the visibility timeout of a running job and record its progress"""
+        while True:
+            try:
+                await asyncio.wait_for(progress_changed.wait(), self.heartbeat_interval)
+            except asyncio.TimeoutError:
+                pass
+            if finished.is_set():
+                return
+            progress_changed.clear()
+            owned = await asyncio.to_thread(
+                self.job_queue.heartbeat, job.id, self.worker_id, progress["latest"]
+            )
+            if not owned:
+                logger.warning(f"Lost {job.kind} job {job.id} to another worker")
+                return
+
+
+    @staticmethod
+    async def stop_heartbeat(heartbeat: asyncio.Task, finished: asyncio.Event):
+        # wait_for can swallow a cancellation that races with its wake up, so the loop also checks the flag
+        finished.set()
+        heartbeat.cancel()
+        await asyncio.gather(heartbeat, return_exceptions=True)
+
+
+async def run_worker(concurrency: int = None, processes: int = 1):
+    job_queue = SQLiteJobQueue(config.JOB_QUEUE_PATH, config.JOB_VISIBILITY_TIMEOUT, config.JOB_MAX_ATTEMPTS,
+                               config.JOB_RETENTION)
+    translation_service = TranslationService(get_backend_capacity(WORKER, processes))
+    cache_service = CacheService()
+    worker = JobWorker(job_queue, translation_service, cache_service, concurrency)
+
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_number, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        translation_service.close()
+        await cache_service.close()
+        job_queue.close()
+
+
+def worker_process(concurrency: int = None, processes: int = 1):
+    setup_logging()
+    asyncio.run(run_worker(concurrency, processes))
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run background translation jobs")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes")
+    parser.add_argument("--concurrency", type=int, help="Jobs per process, defaults to the backend capacity")
+    args = parser.parse_args(argv)
+
+    if args.processes == 1:
+        worker_process(args.concurrency)
+        return 0
+
+    processes = [
+        multiprocessing.Process(target=worker_process, args=(args.concurrency, args.processes),
+                                name=f"job-worker-{index}")
+        for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    running = {process.sentinel: process for process in processes}
+    while running:
+        try:
+            exited = multiprocessing.connection.wait(list(running))
+        except KeyboardInterrupt:
+            # the workers got the signal too and finish their running jobs
+            continue
+        for sentinel in exited:
+            process = running.pop(sentinel)
+            process.join()
+            # drop the exited worker's live gauges (workflows in flight) in multiprocess mode
+            mark_process_dead(process.pid)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
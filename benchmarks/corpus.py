@@ -0,0 +1,65 @@
+"""
+This module contains the corpus sampling shared by the benchmarks.
+
+Messages are streamed from the corpus (config.CORPUS_PATH, see db/read_file.py) and
+reservoir sampled per size class of the source text, with a fixed seed so every run
+measures the same inputs:
+- short: up to 100 characters, chat turns
+- medium: up to 500 characters
+- long: more than 500 characters, support tickets with device details
+"""
+import random
+from typing import Dict, List
+
+from config.settings import config
+from db.read_file import iter_json_records
+
+
+SIZE_CLASSES = {
+    "short": (1, 100),
+    "medium": (101, 500),
+    "long": (501, float("inf")),
+}
+DEFAULT_SEED = 1234
+
+
+def pseudo_translate(text: str) -> str:
+    """A stand-in translation of similar length that shares the numbers and names of the source"""
+    return " ".join(word if not word.isalpha() else word[::-1] for word in text.split())
+
+
+def get_size_class(text: str) -> str:
+    length = len(text)
+    return next((name for name, (low, high) in SIZE_CLASSES.items() if low <= length <= high), None)
+
+
+def sample_corpus(file_path: str = None, samples_per_size: int = 50, seed: int = DEFAULT_SEED) -> Dict[str, List[dict]]:
+    """
+    Reservoir sample the corpus messages per size class
+    Args:
+        file_path (str): The JSON corpus, defaults to config.CORPUS_PATH
+        samples_per_size (int): Messages kept per size class
+        seed (int): Seed of the sampling
+
+    Returns:
+        dict: size class -> messages, each one is {"record": ..., "message": ..., "text": ...}
+    """
+    rng = random.Random(seed)
+    samples = {name: [] for name in SIZE_CLASSES}
+    seen = dict.fromkeys(SIZE_CLASSES, 0)
+
+    for record in iter_json_records(file_path or config.CORPUS_PATH):
+        for message in record.get("messages") or []:
+            text = message.get("msg_o") or message.get("msg") or ""
+            size_class = get_size_class(text)
+            if size_class is None:
+                continue
+            seen[size_class] += 1
+            sample = {"record": {**record, "messages": [message]}, "message": message, "text": text}
+            if len(samples[size_class]) < samples_per_size:
+                samples[size_class].append(sample)
+            else:
+                index = rng.randrange(seen[size_class])
+                if index < samples_per_size:
+                    samples[size_class][index] = sample
+    return samples
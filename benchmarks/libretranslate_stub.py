@@ -0,0 +1,81 @@
+"""
+Local LibreTranslate stand-in for load tests
+
+Answers POST /translate like LibreTranslate (translatedText, and detectedLanguage when the
+source is "auto") with a pseudo translation after a configurable latency, so the API can
+be load tested end to end without a translation server. At most --concurrency requests
+are served at once, the rest queue like on a LibreTranslate with that many threads, and
+--error-rate of the requests fail with 500.
+
+Usage:
+    python -m benchmarks.libretranslate_stub --port 5001 --latency 0.05 --concurrency 8
+    LIBRETRANSLATE_URL=http://127.0.0.1:5001 uvicorn apis.main:app --port 8000
+"""
+import argparse
+import asyncio
+import random
+import sys
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+
+from benchmarks.corpus import pseudo_translate
+
+
+def create_stub_app(latency: float = 0.05, jitter: float = 0.5, concurrency: int = 8,
+                    error_rate: float = 0.0, confidence: int = 90) -> FastAPI:
+    """
+    Args:
+        latency (float): Mean seconds per translation
+        jitter (float): The latency varies uniformly by this share of the mean
+        concurrency (int): Translations served at once
+        error_rate (float): Share of requests answered with 500
+        confidence (int): Confidence of the detected language, 0 to 100
+    """
+    app = FastAPI(title="LibreTranslate stand-in")
+    slots = asyncio.Semaphore(concurrency)
+    app.state.stats = {"requests": 0, "errors": 0}
+
+    @app.post("/translate")
+    async def translate(request: Request):
+        payload = await request.json()
+        app.state.stats["requests"] += 1
+        async with slots:
+            await asyncio.sleep(max(0.0, latency * (1 + random.uniform(-jitter, jitter))))
+        if random.random() < error_rate:
+            app.state.stats["errors"] += 1
+            raise HTTPException(status_code=500, detail="Stand-in error")
+
+        response = {"translatedText": pseudo_translate(payload.get("q", ""))}
+        if payload.get("source", "auto") == "auto":
+            response["detectedLanguage"] = {"confidence": confidence, "language": "en"}
+        return response
+
+    @app.get("/languages")
+    async def languages():
+        return [{"code": code, "name": code, "targets": ["de", "en", "es", "fr"]} for code in ("de", "en", "es", "fr")]
+
+    @app.get("/stats")
+    async def stats():
+        return app.state.stats
+
+    return app
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run a local LibreTranslate stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean seconds per translation")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Latency variation as a share of the mean")
+    parser.add_argument("--concurrency", type=int, default=8, help="Translations served at once")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests that fail")
+    args = parser.parse_args(argv)
+
+    app = create_stub_app(args.latency, args.jitter, args.concurrency, args.error_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,434 @@
+"""
+Load-test harness for the API
+
+Replays recorded traffic or synthetic traffic derived from the corpus against a running
+API and reports per endpoint: throughput, p50/p95/p99/p999 latency, error rate, status
+codes and cache hit rate (from the responses' "cached" flags).
+
+Traffic:
+- --traffic FILE: JSONL, one request per line:
+      {"method": "POST", "path": "/api/v1/translate", "json": {...}, "params": {...}, "offset": 0.25}
+  "offset" (seconds from the start) is only used with --replay-timing, otherwise the
+  requests are sent in order, cycling, at the load shape's pace
+- otherwise synthetic: corpus messages (see benchmarks/corpus.py) sent to the endpoints of
+  --mix, e.g. "translate=6,api_translate=3,batch=1"
+
+Load shape, --stages "LEVELxSECONDS,...":
+- open loop (--mode open, default): LEVEL is the arrival rate in requests per second.
+  Arrivals are Poisson and independent of the responses; latency is measured from the
+  scheduled arrival, so a slow server can't hide its queueing (coordinated omission).
+  Past --max-in-flight arrivals are dropped and counted.
+- closed loop (--mode closed): LEVEL is the number of concurrent clients
+With --ramp each stage rises linearly from the previous stage's level.
+
+--local starts a LibreTranslate stand-in (benchmarks/libretranslate_stub.py) and the API
+pointed at it through LIBRETRANSLATE_URL, runs the test and stops both.
+
+Usage:
+    python -m benchmarks.load_test --local --stages 10x30,50x30 --ramp
+    python -m benchmarks.load_test --url http://localhost:8000 --mode closed --stages 1x10,8x10,32x10
+    python -m benchmarks.load_test --traffic recorded.jsonl --replay-timing --output report.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.corpus import DEFAULT_SEED, sample_corpus
+from config.settings import config
+
+
+PERCENTILES = (50, 95, 99, 99.9)
+BATCH_SIZE = 8  # texts per synthetic batch request
+
+
+@dataclass
+class TrafficRequest:
+    method: str
+    path: str
+    json: Optional[dict] = None
+    params: Optional[dict] = None
+    offset: Optional[float] = None
+
+    @property
+    def endpoint(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+    cache_hits: int = 0
+    cache_lookups: int = 0
+
+    def record(self, latency: float, status: Optional[int], error: Optional[str], hits: int, lookups: int):
+        self.latencies.append(latency)
+        self.statuses[str(status) if status is not None else "none"] += 1
+        if error:
+            self.errors[error] += 1
+        self.cache_hits += hits
+        self.cache_lookups += lookups
+
+    def summary(self, duration: float) -> dict:
+        latencies = sorted(self.latencies)
+        requests = len(latencies)
+        errors = sum(self.errors.values())
+        return {
+            "requests": requests,
+            "throughput": requests / duration if duration else 0.0,
+            "error_rate": errors / requests if requests else 0.0,
+            "latency": {f"p{p:g}": percentile(latencies, p) for p in PERCENTILES} | {
+                "mean": sum(latencies) / requests if requests else 0.0,
+                "max": latencies[-1] if latencies else 0.0,
+            },
+            "statuses": dict(self.statuses),
+            "errors": dict(self.errors),
+            "cache_hit_rate": self.cache_hits / self.cache_lookups if self.cache_lookups else None,
+        }
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def parse_stages(stages: str) -> List[Tuple[float, float]]:
+    """ "10x30,50x60" -> [(10.0, 30.0), (50.0, 60.0)], level x seconds"""
+    parsed = []
+    for stage in stages.split(","):
+        level, seconds = stage.lower().split("x")
+        parsed.append((float(level), float(seconds)))
+    return parsed
+
+
+def get_level(stages: List[Tuple[float, float]], elapsed: float, ramp: bool) -> Optional[float]:
+    """The load level at a time of the run, None once every stage is over"""
+    previous_level = 0.0
+    stage_start = 0.0
+    for level, seconds in stages:
+        if elapsed < stage_start + seconds:
+            if not ramp:
+                return level
+            return previous_level + (level - previous_level) * (elapsed - stage_start) / seconds
+        previous_level = level
+        stage_start += seconds
+    return None
+
+
+def load_traffic(file_path: str) -> List[TrafficRequest]:
+    requests = []
+    with open(file_path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                requests.append(TrafficRequest(
+                    record.get("method", "POST").upper(), record["path"], record.get("json"),
+                    record.get("params"), record.get("offset")
+                ))
+    return requests
+
+
+def synthetic_traffic(mix: Dict[str, float], samples_per_size: int, seed: int,
+                      target_language: str = "es") -> Iterator[TrafficRequest]:
+    """
+    Endless requests built from corpus messages, endpoints drawn by the mix weights
+    """
+    rng = random.Random(seed)
+    samples = [sample for size_samples in sample_corpus(None, samples_per_size, seed).values()
+               for sample in size_samples]
+    endpoints = list(mix)
+    weights = [mix[endpoint] for endpoint in endpoints]
+
+    def text_request(sample: dict) -> dict:
+        return {
+            "source_text": sample["text"],
+            "source_language": sample["message"].get("source_lang") or "auto",
+            "target_language": target_language,
+        }
+
+    while True:
+        endpoint = rng.choices(endpoints, weights)[0]
+        if endpoint == "translate":
+            yield TrafficRequest("POST", "/translate", text_request(rng.choice(samples)))
+        elif endpoint == "api_translate":
+            yield TrafficRequest("POST", "/api/v1/translate", text_request(rng.choice(samples)))
+        elif endpoint == "batch":
+            yield TrafficRequest("POST", "/translate/batch", {
+                "texts": [sample["text"] for sample in rng.sample(samples, min(BATCH_SIZE, len(samples)))],
+                "source_language": "auto",
+                "target_language": target_language,
+            })
+        else:
+            raise ValueError(f"Unknown endpoint in the mix: {endpoint}")
+
+
+def count_cache_hits(body) -> Tuple[int, int]:
+    """(hits, lookups) from a response body, translate responses and batch results carry "cached" """
+    if not isinstance(body, dict):
+        return 0, 0
+    if "results" in body and isinstance(body["results"], list):
+        results = [result for result in body["results"] if isinstance(result, dict) and "cached" in result]
+        return sum(bool(result["cached"]) for result in results), len(results)
+    if "cached" in body:
+        return int(bool(body["cached"])), 1
+    return 0, 0
+
+
+class LoadTest:
+    """
+    Sends the traffic at the load shape and collects the per endpoint statistics
+    """
+    def __init__(self, client: httpx.AsyncClient, traffic: Iterator[TrafficRequest], stages: List[Tuple[float, float]],
+                 ramp: bool = False, max_in_flight: int = 1000, seed: int = DEFAULT_SEED):
+        self.client = client
+        self.traffic = traffic
+        self.stages = stages
+        self.ramp = ramp
+        self.max_in_flight = max_in_flight
+        self.rng = random.Random(seed)
+        self.stats: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+        self.in_flight = 0
+        self.max_seen_in_flight = 0
+        self.dropped = 0
+        self.start_time = 0.0
+
+    async def send(self, request: TrafficRequest, scheduled_at: float):
+        self.in_flight += 1
+        self.max_seen_in_flight = max(self.max_seen_in_flight, self.in_flight)
+        status, error, hits, lookups = None, None, 0, 0
+        try:
+            response = await self.client.request(request.method, request.path, json=request.json,
+                                                 params=request.params)
+            status = response.status_code
+            if status >= 400:
+                error = f"HTTP {status}"
+            elif response.headers.get("content-type", "").startswith("application/json"):
+                hits, lookups = count_cache_hits(response.json())
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        finally:
+            self.in_flight -= 1
+        self.stats[request.endpoint].record(time.perf_counter() - scheduled_at, status, error, hits, lookups)
+
+    async def run_open_loop(self):
+        tasks = set()
+        next_arrival = self.start_time = time.perf_counter()
+        while True:
+            now = time.perf_counter()
+            if next_arrival > now:
+                await asyncio.sleep(next_arrival - now)
+            rate = get_level(self.stages, next_arrival - self.start_time, self.ramp)
+            if rate is None:
+                break
+            if rate > 0:
+                request = next(self.traffic, None)
+                if request is None:
+                    break
+                if self.in_flight >= self.max_in_flight:
+                    self.dropped += 1
+                else:
+                    task = asyncio.create_task(self.send(request, next_arrival))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                next_arrival += self.rng.expovariate(rate)
+            else:
+                next_arrival += 0.05  # idle stage, check again shortly
+        await asyncio.gather(*tasks)
+
+    async def run_replay(self, speed: float = 1.0):
+        """Send recorded requests at their recorded offsets"""
+        tasks = []
+        self.start_time = time.perf_counter()
+        for request in self.traffic:
+            scheduled_at = self.start_time + (request.offset or 0.0) / speed
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self.send(request, scheduled_at)))
+        await asyncio.gather(*tasks)
+
+    async def run_closed_loop(self):
+        self.start_time = time.perf_counter()
+        clients: List[asyncio.Task] = []
+
+        async def client_loop(client_index: int):
+            # a client stops once the level drops below its index or the run is over
+            while True:
+                level = get_level(self.stages, time.perf_counter() - self.start_time, self.ramp)
+                if level is None or client_index >= level:
+                    return
+                request = next(self.traffic, None)
+                if request is None:
+                    return
+                await self.send(request, time.perf_counter())
+
+        while (level := get_level(self.stages, time.perf_counter() - self.start_time, self.ramp)) is not None:
+            clients = [client for client in clients if not client.done()]
+            running = {client.get_name() for client in clients}
+            for client_index in range(math.ceil(level)):
+                if str(client_index) not in running:
+                    clients.append(asyncio.create_task(client_loop(client_index), name=str(client_index)))
+            await asyncio.sleep(0.05)
+        await asyncio.gather(*clients)
+
+    def report(self) -> dict:
+        duration = time.perf_counter() - self.start_time
+        total = EndpointStats()
+        for stats in self.stats.values():
+            total.latencies.extend(stats.latencies)
+            total.statuses.update(stats.statuses)
+            total.errors.update(stats.errors)
+            total.cache_hits += stats.cache_hits
+            total.cache_lookups += stats.cache_lookups
+        return {
+            "duration": duration,
+            "dropped": self.dropped,
+            "max_in_flight": self.max_seen_in_flight,
+            "total": total.summary(duration),
+            "endpoints": {endpoint: stats.summary(duration) for endpoint, stats in sorted(self.stats.items())},
+        }
+
+
+def print_report(report: dict):
+    print(f"duration {report['duration']:.1f}s, dropped {report['dropped']}, max in flight {report['max_in_flight']}")
+    header = f"{'endpoint':<28} {'requests':>8} {'req/s':>8} {'errors':>7} {'cache':>6} " + \
+        " ".join(f"{f'p{p:g}':>8}" for p in PERCENTILES)
+    print(header)
+    for endpoint, summary in [*report["endpoints"].items(), ("total", report["total"])]:
+        cache = summary["cache_hit_rate"]
+        print(
+            f"{endpoint:<28} {summary['requests']:>8} {summary['throughput']:>8.1f} "
+            f"{summary['error_rate']:>7.1%} {'-' if cache is None else f'{cache:.0%}':>6} "
+            + " ".join(f"{summary['latency'][f'p{p:g}'] * 1000:>6.0f}ms" for p in PERCENTILES)
+        )
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url, timeout=1.0)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not start within {timeout:.0f}s")
+
+
+async def start_local_stack(stub_args: List[str]) -> Tuple[str, List[subprocess.Popen]]:
+    """
+    Start the LibreTranslate stand-in and the API pointed at it
+    Returns:
+        tuple: The API url and the processes to stop
+    """
+    stub_port, api_port = get_free_port(), get_free_port()
+    # the servers log every request, keep them off the report
+    stub = subprocess.Popen([sys.executable, "-m", "benchmarks.libretranslate_stub", "--port", str(stub_port),
+                             *stub_args], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    environment = {**os.environ, "LIBRETRANSLATE_URL": f"http://127.0.0.1:{stub_port}"}
+    api = subprocess.Popen([sys.executable, "-m", "uvicorn", "apis.main:app", "--port", str(api_port),
+                            "--log-level", "warning"], env=environment,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    api_url = f"http://127.0.0.1:{api_port}"
+    await wait_until_ready(f"http://127.0.0.1:{stub_port}/languages")
+    await wait_until_ready(api_url + "/")
+    return api_url, [api, stub]
+
+
+async def run(args) -> dict:
+    processes = []
+    url = args.url
+    if args.local:
+        url, processes = await start_local_stack(
+            ["--latency", str(args.stub_latency), "--concurrency", str(args.stub_concurrency),
+             "--error-rate", str(args.stub_error_rate)]
+        )
+    try:
+        if args.traffic:
+            recorded = load_traffic(args.traffic)
+            traffic = iter(recorded) if args.replay_timing else itertools.cycle(recorded)
+        else:
+            mix = {name: float(weight) for name, weight in (item.split("=") for item in args.mix.split(","))}
+            traffic = synthetic_traffic(mix, args.samples, args.seed, args.target_language)
+
+        limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+        async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+            load_test = LoadTest(client, traffic, parse_stages(args.stages), args.ramp, args.max_in_flight, args.seed)
+            if args.replay_timing:
+                await load_test.run_replay(args.speed)
+            elif args.mode == "closed":
+                await load_test.run_closed_loop()
+            else:
+                await load_test.run_open_loop()
+        report = load_test.report()
+        report["config"] = {
+            "url": url, "mode": "replay" if args.replay_timing else args.mode, "stages": args.stages,
+            "ramp": args.ramp, "traffic": args.traffic or f"synthetic {args.mix}",
+            "local": args.local,
+        }
+        return report
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the translation API")
+    parser.add_argument("--url", default=f"http://localhost:{os.getenv('FASTAPI_PORT', 8000)}")
+    parser.add_argument("--local", action="store_true",
+                        help="Start the API against a local LibreTranslate stand-in for the run")
+    parser.add_argument("--traffic", help="JSONL file of recorded requests, synthetic corpus traffic otherwise")
+    parser.add_argument("--replay-timing", action="store_true", help="Send recorded requests at their offsets")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed-up of the recorded offsets")
+    parser.add_argument("--mix", default="translate=6,api_translate=3,batch=1",
+                        help="Synthetic endpoint weights: translate, api_translate, batch")
+    parser.add_argument("--samples", type=int, default=200, help="Corpus messages sampled per size class")
+    parser.add_argument("--target-language", default="es")
+    parser.add_argument("--mode", choices=["open", "closed"], default="open")
+    parser.add_argument("--stages", default="10x30", help="LEVELxSECONDS,... rate (open) or clients (closed)")
+    parser.add_argument("--ramp", action="store_true", help="Rise linearly into each stage's level")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds per request")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--stub-latency", type=float, default=0.05, help="--local: stand-in seconds per translation")
+    parser.add_argument("--stub-concurrency", type=int, default=config.BACKEND_CAPACITY["libretranslate"])
+    parser.add_argument("--stub-error-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
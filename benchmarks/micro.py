@@ -0,0 +1,249 @@
+"""
+Micro-benchmarks of the agents and their helpers
+
+Every benchmark runs on messages sampled from the corpus per size class (see
+benchmarks/corpus.py), so "qa_agent[long]" is the QA agent on support-ticket sized texts.
+A benchmark calls its function over all sampled inputs in a loop calibrated to run at
+least --min-time seconds, repeated --repeat times; the per-call times are reported.
+
+Results are written as JSON: the run's metadata (Python, platform, sampling) and per
+benchmark the min, median, mean and standard deviation in nanoseconds per call. A saved
+run is the baseline of later runs: --compare flags every benchmark whose median got
+slower than the tolerance and exits with 1.
+
+Usage:
+    python -m benchmarks.micro --output benchmarks/baseline.json
+    python -m benchmarks.micro --compare benchmarks/baseline.json --tolerance 0.2
+    python -m benchmarks.micro --filter qa_agent --samples 20
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+from langchain_core.messages import AIMessage
+
+from agent_architecture.Agents.orchestrator_agent import orchestrator_agent
+from agent_architecture.Agents.qa_agent import qa_agent
+from agent_architecture.Agents.router_agent import get_complexity
+from agent_architecture.Agents.translation_agent import apply_terminology_consistency
+from agent_architecture.States.conversation_state import get_initial_conversation_state, get_repeated_phrases
+from agent_architecture.States.translation_memory import BoundedTranslationMemory
+from agent_architecture.States.translation_state import get_initial_translation_state, get_relevant_context
+from benchmarks.corpus import DEFAULT_SEED, pseudo_translate, sample_corpus
+from config.settings import config
+from db.read_file import map_json_to_translation_state, serialize_translation_result
+
+
+Benchmark = Tuple[Callable, List[tuple]]  # the function and the argument tuples of its calls
+
+
+def get_context_entries(samples: List[dict]) -> List[str]:
+    return [f"Source: {sample['text']} → Target: {pseudo_translate(sample['text'])}" for sample in samples]
+
+
+def build_benchmarks(samples: Dict[str, List[dict]]) -> Dict[str, Benchmark]:
+    """
+    The benchmarks per size class, their inputs are built once from the sampled messages
+    """
+    all_samples = [sample for size_samples in samples.values() for sample in size_samples]
+    context_entries = get_context_entries(all_samples[-config.CONVERSATION_CONTEXT_SIZE:])
+
+    # a memory holding every sampled sentence, so lookups hit
+    translation_memory = BoundedTranslationMemory()
+    for sample in all_samples:
+        for sentence in sample["text"].split("."):
+            if sentence.strip():
+                translation_memory.put(sentence.strip(), "es", pseudo_translate(sentence.strip()))
+    conversation_state = get_initial_conversation_state()
+    conversation_state["translation_memory"] = translation_memory
+
+    benchmarks = {}
+    for size_class, size_samples in samples.items():
+        if not size_samples:
+            continue
+        texts = [sample["text"] for sample in size_samples]
+        translations = [pseudo_translate(text) for text in texts]
+        states = []
+        for sample, translation in zip(size_samples, translations):
+            state = get_initial_translation_state({
+                "source_text": sample["text"],
+                "source_language": sample["message"].get("source_lang") or "auto",
+                "target_language": "es",
+            })
+            state.update({
+                "conversation_context": context_entries,
+                "translated_text": translation,
+                "confidence_score": 0.8,
+                "quality_score": 0.8,
+                "quality_issues": [],
+                "translation_attempts": 1,
+                "translation_memory": BoundedTranslationMemory(),
+                "session_id": "benchmark",
+            })
+            states.append(state)
+        final_states = [{
+            **state,
+            "service_used": "libretranslate",
+            "translation_summary": {"translation": state["translated_text"], "status": "completed"},
+            "messages": [AIMessage(content=f"Agent {index}: done") for index in range(5)],
+        } for state in states]
+        repeated_phrases = [get_repeated_phrases(conversation_state, text, "es") for text in texts]
+
+        benchmarks.update({
+            f"get_complexity[{size_class}]": (get_complexity, [(text,) for text in texts]),
+            f"get_relevant_context[{size_class}]": (get_relevant_context, [(state,) for state in states]),
+            f"get_repeated_phrases[{size_class}]": (
+                get_repeated_phrases, [(conversation_state, text, "es") for text in texts]
+            ),
+            f"qa_agent[{size_class}]": (qa_agent, [(state,) for state in states]),
+            f"apply_terminology_consistency[{size_class}]": (
+                lambda translation, phrases: apply_terminology_consistency(
+                    translation, phrases, domain="medical", source_language="en", target_language="es"
+                ),
+                list(zip(translations, repeated_phrases))
+            ),
+            f"orchestrator_agent[{size_class}]": (orchestrator_agent, [(state,) for state in states]),
+            f"map_json_to_translation_state[{size_class}]": (
+                map_json_to_translation_state, [(sample["record"],) for sample in size_samples]
+            ),
+            f"serialize_translation_result[{size_class}]": (
+                lambda result: serialize_translation_result(result, include_messages=True),
+                [(state,) for state in final_states]
+            ),
+        })
+    return benchmarks
+
+
+def run_benchmark(func: Callable, calls: List[tuple], repeat: int = 5, min_time: float = 0.05) -> dict:
+    """
+    Time func over its calls, the loop count is calibrated to take at least min_time
+    Returns:
+        dict: Per-call nanoseconds (min, median, mean, stdev) and the loop counts
+    """
+    def run_loops(loops: int) -> int:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            for args in calls:
+                func(*args)
+        return time.perf_counter_ns() - start
+
+    loops = 1
+    while run_loops(loops) < min_time * 1e9:
+        loops *= 2
+
+    per_call = [run_loops(loops) / (loops * len(calls)) for _ in range(repeat)]
+    return {
+        "min_ns": min(per_call),
+        "median_ns": statistics.median(per_call),
+        "mean_ns": statistics.fmean(per_call),
+        "stdev_ns": statistics.stdev(per_call) if repeat > 1 else 0.0,
+        "calls": len(calls),
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+
+def run_benchmarks(benchmarks: Dict[str, Benchmark], repeat: int, min_time: float, name_filter: str = None) -> dict:
+    results = {}
+    for name, (func, calls) in benchmarks.items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = run_benchmark(func, calls, repeat, min_time)
+        print(f"{name:<48} {format_ns(results[name]['median_ns']):>12} per call", file=sys.stderr)
+    return results
+
+
+def format_ns(nanoseconds: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if nanoseconds >= scale:
+            return f"{nanoseconds / scale:.2f} {unit}"
+    return f"{nanoseconds:.0f} ns"
+
+
+def find_regressions(report: dict, baseline: dict, tolerance: float = 0.2) -> List[str]:
+    """
+    Compare a run against a baseline run and list the benchmarks that got slower
+    Args:
+        report (dict): The current run
+        baseline (dict): A previously saved run
+        tolerance (float): Allowed slowdown of the median, 0.2 is 20%
+
+    Returns:
+        list[str]: Human readable regressions, empty when there are none
+    """
+    regressions = []
+    for name, result in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        change = result["median_ns"] / previous["median_ns"] - 1
+        if change > tolerance:
+            regressions.append(
+                f"{name}: {format_ns(previous['median_ns'])} -> {format_ns(result['median_ns'])} ({change:+.1%})"
+            )
+    return regressions
+
+
+def print_comparison(report: dict, baseline: dict):
+    for name, result in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous:
+            change = f"{result['median_ns'] / previous['median_ns'] - 1:+.1%}"
+        else:
+            change = "new"
+        print(f"{name:<48} {format_ns(result['median_ns']):>12} {change:>8}")
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark the agents and helpers on corpus samples")
+    parser.add_argument("--corpus", default=config.CORPUS_PATH, help="JSON corpus to sample")
+    parser.add_argument("--samples", type=int, default=50, help="Messages sampled per size class")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per repetition")
+    parser.add_argument("--filter", help="Only run the benchmarks whose name contains this")
+    parser.add_argument("--output", help="Write the results to this JSON file, e.g. a new baseline")
+    parser.add_argument("--compare", help="Baseline results to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown of the median")
+    args = parser.parse_args(argv)
+
+    # the orchestrator would persist every benchmark call through the write-behind queue
+    config.MEMORY_PERSISTENCE_ENABLED = False
+
+    samples = sample_corpus(args.corpus, args.samples, args.seed)
+    report = {
+        "metadata": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "corpus": args.corpus,
+            "samples": {size_class: len(size_samples) for size_class, size_samples in samples.items()},
+            "seed": args.seed,
+        },
+        "results": run_benchmarks(build_benchmarks(samples), args.repeat, args.min_time, args.filter),
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    if not args.compare:
+        return 0
+    with open(args.compare, "r", encoding="utf-8") as file:
+        baseline = json.load(file)
+    print_comparison(report, baseline)
+    regressions = find_regressions(report, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,15 +14,83 @@ class Config:
     
     # Translation services
     GOOGLE_TRANSLATE_API_KEY = os.getenv("GOOGLE_TRANSLATE_API_KEY")
+    LIBRETRANSLATE_URL = os.getenv("LIBRETRANSLATE_URL", "https://libretranslate.com/")
+    LIBRETRANSLATE_API_KEY = os.getenv("LIBRETRANSLATE_API_KEY")
+    LIBRETRANSLATE_CONFIDENCE = float(os.getenv("LIBRETRANSLATE_CONFIDENCE", 0.8))
+    # Concurrent requests each backend can take, sizes the API worker pools
+    BACKEND_CAPACITY = {
+        "libretranslate": int(os.getenv("LIBRETRANSLATE_CONCURRENCY", 8)),
+    }
+    # The capacity is split between the API processes (WEB_CONCURRENCY, as read by uvicorn) and the
+    # job worker processes, so together they never send the backends more than BACKEND_CAPACITY.
+    # With JOB_WORKER_IN_PROCESS the API runs the jobs and takes the whole capacity.
+    WORKER_CAPACITY_SHARE = float(os.getenv("WORKER_CAPACITY_SHARE", 0.25))
+    API_PROCESSES = int(os.getenv("WEB_CONCURRENCY", 1))
+    MAX_TRANSLATION_ATTEMPTS = int(os.getenv("MAX_TRANSLATION_ATTEMPTS", 2))
     
     # Quality settings
     MIN_CONFIDENCE_SCORE = float(os.getenv("MIN_CONFIDENCE_SCORE", 0.7))
     QUALITY_THRESHOLD = float(os.getenv("QUALITY_THRESHOLD", 0.8))
     
+    # Translation memory settings
+    TRANSLATION_MEMORY_MAX_ENTRIES = int(os.getenv("TRANSLATION_MEMORY_MAX_ENTRIES", 1000))
+    TRANSLATION_MEMORY_MAX_BYTES = int(os.getenv("TRANSLATION_MEMORY_MAX_BYTES", 1024 * 1024))
+    TRANSLATION_MEMORY_POLICY = os.getenv("TRANSLATION_MEMORY_POLICY", "lru")  # lru or lfu
+    CONVERSATION_CONTEXT_SIZE = int(os.getenv("CONVERSATION_CONTEXT_SIZE", 10))
+
+    # Translation state settings
+    # full: every agent message is kept, memory structures are copied into the state
+    # lean: messages are kept in a ring of STATE_MESSAGE_RING_SIZE (0 drops them), memory is passed by handle
+    STATE_PROFILE = os.getenv("STATE_PROFILE", "lean" if ENVIRONMENT == "production" else "full")
+    STATE_MESSAGE_RING_SIZE = int(os.getenv("STATE_MESSAGE_RING_SIZE", 0))
+    STATE_SIZE_SAMPLE_EVERY = int(os.getenv("STATE_SIZE_SAMPLE_EVERY", 100))  # state sizes measured every Nth run, 0 never
+    
     # Paths
     PROJECT_ROOT = Path(__file__).parent.parent
     DATA_DIR = PROJECT_ROOT / "data"
     LOGS_DIR = PROJECT_ROOT / "logs"
+    GLOSSARY_DIR = os.getenv("GLOSSARY_DIR", str(DATA_DIR / "glossaries"))
+    GLOSSARY_RECHECK_INTERVAL = float(os.getenv("GLOSSARY_RECHECK_INTERVAL", 30))  # seconds before a missing glossary is looked up again
+    CORPUS_PATH = os.getenv("CORPUS_PATH", str(PROJECT_ROOT / "Data" / "messages_train.json"))
+    CORPUS_PARQUET_PATH = os.getenv("CORPUS_PARQUET_PATH", str(DATA_DIR / "messages_train.parquet"))
+
+    # Memory persistence settings (write-behind to the memory store)
+    MEMORY_PERSISTENCE_ENABLED = os.getenv("MEMORY_PERSISTENCE_ENABLED", "True").lower() == "true"
+    MEMORY_STORE_PATH = os.getenv("MEMORY_STORE_PATH", str(DATA_DIR / "memory.sqlite3"))
+    WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", 100))
+    WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", 1.0))
+    WRITE_BEHIND_MAX_QUEUE = int(os.getenv("WRITE_BEHIND_MAX_QUEUE", 10000))
+    WRITE_BEHIND_PUT_TIMEOUT = float(os.getenv("WRITE_BEHIND_PUT_TIMEOUT", 0.05))
+
+    # Job queue settings (background translations run by the job worker)
+    JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", str(DATA_DIR / "jobs.sqlite3"))
+    JOB_VISIBILITY_TIMEOUT = float(os.getenv("JOB_VISIBILITY_TIMEOUT", 60))  # seconds a claimed job stays hidden
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+    JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", 5))
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 0.5))
+    JOB_RETENTION = float(os.getenv("JOB_RETENTION", 86400))  # seconds finished jobs and their results are kept
+    # the queued jobs are run by dedicated workers (python -m apis.worker), true runs them in the
+    # API process instead, for development without a separate worker
+    JOB_WORKER_IN_PROCESS = os.getenv("JOB_WORKER_IN_PROCESS", "False").lower() == "true"
+
+    # Logging settings, records are queued and written by a listener thread
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json or console
+    LOG_FILE = os.getenv("LOG_FILE", str(LOGS_DIR / "translation_system.log"))
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", 0.1))  # share of debug records kept
+
+    # Profiling settings (admin profiling endpoints)
+    PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", 20))  # profiles kept for download
+    PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", 0.005))
+    PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", 120))
+    TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", 10))
+    TRACEMALLOC_TOP = int(os.getenv("TRACEMALLOC_TOP", 50))
+
+    # System sampler settings (snapshot read by the health endpoints)
+    SYSTEM_SAMPLE_INTERVAL = float(os.getenv("SYSTEM_SAMPLE_INTERVAL", 5))
+    BACKEND_PROBE_INTERVAL = float(os.getenv("BACKEND_PROBE_INTERVAL", 30))
+    SAMPLE_STALE_AFTER = float(os.getenv("SAMPLE_STALE_AFTER", 3))  # missed intervals before a sample is stale
     
     def __init__(self):
         # Create necessary directories
@@ -0,0 +1,236 @@
+"""
+This module contains the durable job queue for background translations.
+
+Jobs live in a SQLite file shared by the API and the job workers (see
+apis/worker.py). The API enqueues and reads job status, the workers
+claim, run and complete jobs, so background work survives restarts and scales apart
+from the API.
+
+Claiming a job hides it for a visibility timeout. A worker extends the timeout while it
+works (heartbeat); a job whose worker died becomes visible again and is claimed by another
+worker, until it has used its attempts.
+
+Job statuses: queued -> running -> completed | failed
+
+Finished jobs keep their result for the retention time so the status endpoints can serve
+it, then they are deleted by a sweep that runs with the claims at most every
+PRUNE_INTERVAL seconds.
+"""
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import orjson
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    visible_at REAL NOT NULL,
+    worker_id TEXT,
+    progress BLOB,
+    result BLOB,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_claimable ON jobs (status, visible_at);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (status, updated_at);
+"""
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+PRUNE_INTERVAL = 60.0  # seconds between retention sweeps
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    payload: Any
+    status: str
+    attempts: int
+    max_attempts: int
+    worker_id: Optional[str]
+    progress: Optional[dict]
+    result: Any
+    error: Optional[str]
+    created_at: float
+    updated_at: float
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        return cls(
+            id=row["id"],
+            kind=row["kind"],
+            payload=orjson.loads(row["payload"]),
+            status=row["status"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            worker_id=row["worker_id"],
+            progress=orjson.loads(row["progress"]) if row["progress"] else None,
+            result=orjson.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+
+
+class SQLiteJobQueue:
+    """
+    SQLite backed job queue with visibility timeouts
+    Args:
+        path (str): The SQLite file, shared by every process using the queue
+        visibility_timeout (float): Seconds a claimed job stays hidden from other workers
+        max_attempts (int): Claims of a job before it fails for good
+        retention (float): Seconds a completed or failed job is kept, 0 keeps them forever
+    """
+    def __init__(self, path: str, visibility_timeout: float = 60, max_attempts: int = 3,
+                 retention: float = 86400):
+        self.path = str(path)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retention = retention
+        self.next_prune = 0.0
+        self.pruned = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False, timeout=30,
+                                          isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def enqueue(self, kind: str, payload: Any, job_id: str = None) -> str:
+        """
+        Add a job
+        Args:
+            kind (str): The job type the worker dispatches on e.g. "translation"
+            payload: JSON serializable job input
+            job_id (str): The job id, e.g. the request id the status is read with
+
+        Returns:
+            str: The job id
+        """
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                "INSERT INTO jobs (id, kind, payload, status, max_attempts, visible_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, orjson.dumps(payload, option=JSON_OPTIONS), QUEUED, self.max_attempts, now, now, now)
+            )
+        return job_id
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        """
+        Claim the oldest visible job, a queued one or a running one whose worker stopped heartbeating
+        Returns:
+            Job: The claimed job, None when there is nothing to do
+        """
+        now = time.time()
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._fail_exhausted(now)
+                if self.retention and now >= self.next_prune:
+                    self._prune(now)
+                row = self.connection.execute(
+                    "SELECT id FROM jobs WHERE status IN (?, ?) AND visible_at <= ? "
+                    "ORDER BY created_at LIMIT 1",
+                    (QUEUED, RUNNING, now)
+                ).fetchone()
+                if row is None:
+                    self.connection.execute("COMMIT")
+                    return None
+                self.connection.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, visible_at = ?, worker_id = ?, "
+                    "updated_at = ? WHERE id = ?",
+                    (RUNNING, now + self.visibility_timeout, worker_id, now, row["id"])
+                )
+                job = self.connection.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+                self.connection.execute("COMMIT")
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+        return Job.from_row(job)
+
+    def _fail_exhausted(self, now: float):
+        """Fail the expired running jobs that have no attempts left"""
+        self.connection.execute(
+            "UPDATE jobs SET status = ?, error = COALESCE(error, 'visibility timeout expired'), updated_at = ? "
+            "WHERE status = ? AND visible_at <= ? AND attempts >= max_attempts",
+            (FAILED, now, RUNNING, now)
+        )
+
+    def _prune(self, now: float):
+        """Delete the finished jobs older than the retention time"""
+        cursor = self.connection.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at <= ?",
+            (COMPLETED, FAILED, now - self.retention)
+        )
+        self.pruned += cursor.rowcount
+        self.next_prune = now + PRUNE_INTERVAL
+
+    def _update_owned(self, job_id: str, worker_id: str, assignments: str, values: tuple) -> bool:
+        """Update a job only while the worker still owns it"""
+        with self.lock:
+            cursor = self.connection.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE id = ? AND worker_id = ? AND status = ?",
+                (*values, time.time(), job_id, worker_id, RUNNING)
+            )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, job_id: str, worker_id: str, progress: dict = None) -> bool:
+        """
+        Extend the visibility timeout of a claimed job, optionally recording its progress
+        Returns:
+            bool: False when the job was reclaimed by another worker and this one should stop
+        """
+        visible_at = time.time() + self.visibility_timeout
+        if progress is None:
+            return self._update_owned(job_id, worker_id, "visible_at = ?", (visible_at,))
+        return self._update_owned(job_id, worker_id, "visible_at = ?, progress = ?",
+                                  (visible_at, orjson.dumps(progress, option=JSON_OPTIONS)))
+
+    def complete(self, job_id: str, worker_id: str, result: Any = None) -> bool:
+        return self._update_owned(job_id, worker_id, "status = ?, result = ?",
+                                  (COMPLETED, orjson.dumps(result, option=JSON_OPTIONS)))
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry_delay: float = 0.0) -> bool:
+        """
+        Record a failed attempt, the job is queued again after retry_delay until its attempts are used up
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is not None and row["attempts"] < row["max_attempts"]:
+            return self._update_owned(job_id, worker_id, "status = ?, visible_at = ?, error = ?",
+                                      (QUEUED, time.time() + retry_delay, error))
+        return self._update_owned(job_id, worker_id, "status = ?, error = ?", (FAILED, error))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self.lock:
+            row = self.connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row else None
+
+    def get_counts(self) -> dict:
+        """Number of jobs per status"""
+        with self.lock:
+            rows = self.connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
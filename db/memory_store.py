@@ -0,0 +1,104 @@
+"""
+This module contains the persistent store for translation memory and conversation context.
+
+The store is a single SQLite file. It is written in batches by the write-behind queue
+(see db/write_behind.py), never directly from the request path. Only the latest
+context_size entries of a session are kept, older ones are deleted as new ones are written.
+"""
+import sqlite3
+import threading
+import time
+from typing import Iterable
+
+from config.settings import config
+
+
+TRANSLATION_MEMORY = "translation_memory"
+CONVERSATION_CONTEXT = "conversation_context"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS translation_memory (
+    source_text TEXT NOT NULL,
+    target_language TEXT NOT NULL,
+    translated_text TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (source_text, target_language)
+);
+CREATE TABLE IF NOT EXISTS conversation_context (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    entry TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS conversation_context_session ON conversation_context (session_id, id);
+"""
+
+
+class SQLiteMemoryStore:
+    """
+    SQLite backed store for memory updates
+    Records are tuples of:
+    - ("translation_memory", source_text, target_language, translated_text)
+    - ("conversation_context", session_id, entry)
+    Args:
+        path (str): The SQLite file
+        context_size (int): Context entries kept per session, defaults to config.CONVERSATION_CONTEXT_SIZE
+    """
+    def __init__(self, path: str, context_size: int = None):
+        self.path = str(path)
+        self.context_size = context_size or config.CONVERSATION_CONTEXT_SIZE
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def write_batch(self, records: Iterable[tuple]):
+        """Write a batch of records in a single transaction"""
+        now = time.time()
+        translation_memory_rows = []
+        conversation_context_rows = []
+        for record in records:
+            if record[0] == TRANSLATION_MEMORY:
+                translation_memory_rows.append((*record[1:], now))
+            elif record[0] == CONVERSATION_CONTEXT:
+                conversation_context_rows.append((*record[1:], now))
+
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO translation_memory (source_text, target_language, translated_text, updated_at) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT (source_text, target_language) "
+                "DO UPDATE SET translated_text = excluded.translated_text, updated_at = excluded.updated_at",
+                translation_memory_rows
+            )
+            self.connection.executemany(
+                "INSERT INTO conversation_context (session_id, entry, created_at) VALUES (?, ?, ?)",
+                conversation_context_rows
+            )
+            # trim the sessions written to their latest context_size entries
+            self.connection.executemany(
+                "DELETE FROM conversation_context WHERE session_id = ? AND id <= ("
+                "SELECT id FROM conversation_context WHERE session_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                [(session_id, session_id, self.context_size) for session_id in {row[0] for row in conversation_context_rows}]
+            )
+
+    def get_translation(self, source_text: str, target_language: str):
+        """Read a persisted translation, None if missing"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT translated_text FROM translation_memory WHERE source_text = ? AND target_language = ?",
+                (source_text, target_language)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_conversation_context(self, session_id: str, limit: int = 10) -> list[str]:
+        """Read the latest conversation context entries of a session, oldest first"""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT entry FROM conversation_context WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                (session_id, limit)
+            ).fetchall()
+        return [row[0] for row in reversed(rows)]
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,207 @@
+"""
+This module contains the columnar Parquet cache of the message corpus.
+
+The JSON corpus is streamed once (see read_file.iter_json_records) and its messages are
+flattened into a Parquet file with the columns:
+    id, msg_o, from, name, ts, source_lang
+
+The source file's mtime, size and xxhash are stored in the Parquet metadata. The cache is
+rebuilt only when the content changed; a touched but identical file is matched by its hash,
+and its new mtime is recorded in a sidecar next to the cache so later loads skip the hash.
+Loads read only the requested columns and push filters such as one source language down to
+the row groups, so analysis and bulk jobs start without parsing any JSON.
+"""
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xxhash
+
+from config.settings import config
+from db.read_file import iter_json_records
+
+
+CORPUS_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("msg_o", pa.string()),
+    ("from", pa.string()),
+    ("name", pa.string()),
+    ("ts", pa.timestamp("ms", tz="UTC")),
+    ("source_lang", pa.string()),
+])
+ROW_GROUP_SIZE = 10000
+HASH_CHUNK_SIZE = 1024 * 1024
+METADATA_KEYS = (b"source_mtime", b"source_size", b"source_hash")
+SOURCE_STAT_SUFFIX = ".source.json"
+
+
+def hash_file(file_path: str) -> str:
+    """
+    Hash a file in chunks with xxhash
+    """
+    hasher = xxhash.xxh3_64()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def read_source_stat(parquet_path: str) -> dict:
+    """
+    Read the sidecar with the corpus mtime last matched by hash, empty when missing
+    """
+    try:
+        with open(str(parquet_path) + SOURCE_STAT_SUFFIX, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_source_stat(parquet_path: str, source_stat: os.stat_result, source_hash: str):
+    """
+    Record the mtime of a corpus whose content still matches the cache
+    The Parquet metadata can't be updated without rewriting the file, so it goes to a sidecar.
+    """
+    sidecar_path = str(parquet_path) + SOURCE_STAT_SUFFIX
+    temporary_path = sidecar_path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump({
+            "source_mtime": str(source_stat.st_mtime_ns),
+            "source_size": str(source_stat.st_size),
+            "source_hash": source_hash,
+        }, file)
+    os.replace(temporary_path, sidecar_path)
+
+
+def flatten_record(record: dict) -> Iterator[dict]:
+    """
+    Flatten the messages of a corpus record into rows
+    """
+    record_id = str((record.get("_id") or {}).get("$oid", ""))
+    for message in record.get("messages") or []:
+        timestamp = (message.get("ts") or {}).get("$date")
+        yield {
+            "id": record_id,
+            "msg_o": message.get("msg_o", message.get("msg", "")),
+            "from": message.get("from"),
+            "name": message.get("name"),
+            "ts": datetime.fromisoformat(timestamp.replace("Z", "+00:00")) if timestamp else None,
+            "source_lang": message.get("source_lang"),
+        }
+
+
+def build_parquet_cache(json_path: str, parquet_path: str, source_hash: str = None) -> Path:
+    """
+    Convert the JSON corpus into a Parquet file, streaming one row group at a time
+    Args:
+        json_path (str): The JSON corpus
+        parquet_path (str): The Parquet file to write
+        source_hash (str): The corpus hash if already computed
+
+    Returns:
+        Path: The Parquet file
+    """
+    source_stat = os.stat(json_path)
+    metadata = {
+        b"source_mtime": str(source_stat.st_mtime_ns).encode(),
+        b"source_size": str(source_stat.st_size).encode(),
+        b"source_hash": (source_hash or hash_file(json_path)).encode(),
+    }
+    parquet_path = Path(parquet_path)
+    parquet_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = parquet_path.with_suffix(".parquet.tmp")
+
+    schema = CORPUS_SCHEMA.with_metadata(metadata)
+    with pq.ParquetWriter(str(temporary_path), schema, compression="zstd") as writer:
+        rows = []
+        for record in iter_json_records(json_path):
+            rows.extend(flatten_record(record))
+            if len(rows) >= ROW_GROUP_SIZE:
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                rows = []
+        if rows:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+
+    os.replace(temporary_path, parquet_path)
+    try:
+        os.remove(str(parquet_path) + SOURCE_STAT_SUFFIX)
+    except FileNotFoundError:
+        pass
+    return parquet_path
+
+
+def is_cache_fresh(json_path: str, parquet_path: str) -> bool:
+    """
+    Check whether the Parquet cache still matches the JSON corpus
+    The mtime and size are checked first, the content hash only when they differ.
+    A hash match records the new mtime in the sidecar, so the file is hashed once per touch.
+    """
+    if not os.path.exists(parquet_path):
+        return False
+    metadata = pq.read_schema(parquet_path).metadata or {}
+    if not all(key in metadata for key in METADATA_KEYS):
+        return False
+
+    source_stat = os.stat(json_path)
+    if metadata[b"source_size"] != str(source_stat.st_size).encode():
+        return False
+    if metadata[b"source_mtime"] == str(source_stat.st_mtime_ns).encode():
+        return True
+    source_hash = metadata[b"source_hash"].decode()
+    if read_source_stat(parquet_path) == {
+        "source_mtime": str(source_stat.st_mtime_ns),
+        "source_size": str(source_stat.st_size),
+        "source_hash": source_hash,
+    }:
+        return True
+    if hash_file(json_path) != source_hash:
+        return False
+    write_source_stat(parquet_path, source_stat, source_hash)
+    return True
+
+
+def ensure_parquet_cache(json_path: str = None, parquet_path: str = None) -> Path:
+    """
+    Get the Parquet cache of the corpus, rebuilding it when the corpus changed
+    """
+    json_path = str(json_path or config.CORPUS_PATH)
+    parquet_path = str(parquet_path or config.CORPUS_PARQUET_PATH)
+    if not is_cache_fresh(json_path, parquet_path):
+        build_parquet_cache(json_path, parquet_path)
+    return Path(parquet_path)
+
+
+def read_corpus_table(columns: Optional[List[str]] = None, source_lang: str = None, filters: list = None,
+                      json_path: str = None, parquet_path: str = None) -> pa.Table:
+    """
+    Read the corpus from the Parquet cache
+    Args:
+        columns (list[str]): Only read these columns, all when None
+        source_lang (str): Only read the messages in this source language
+        filters (list): Extra pyarrow filters e.g. [("from", "=", "customer")]
+        json_path (str): The JSON corpus, defaults to CORPUS_PATH
+        parquet_path (str): The Parquet cache, defaults to CORPUS_PARQUET_PATH
+
+    Returns:
+        pa.Table: The selected columns and rows
+    """
+    filters = list(filters or [])
+    if source_lang:
+        filters.append(("source_lang", "=", source_lang))
+    return pq.read_table(
+        str(ensure_parquet_cache(json_path, parquet_path)),
+        columns=columns,
+        filters=filters or None
+    )
+
+
+def load_corpus(columns: Optional[List[str]] = None, source_lang: str = None, filters: list = None,
+                json_path: str = None, parquet_path: str = None):
+    """
+    Read the corpus from the Parquet cache as a pandas DataFrame, see read_corpus_table
+    """
+    return read_corpus_table(columns, source_lang, filters, json_path, parquet_path).to_pandas()
@@ -1,6 +1,14 @@
+import codecs
 import json
 import pandas as pd
 import os
+import re
+from typing import Iterator
+
+STREAM_CHUNK_SIZE = 64 * 1024
+# what has to arrive before an incomplete record can be decoded, by its first character
+RECORD_END = {"{": re.compile(r"}"), "[": re.compile(r"]"), '"': re.compile(r'"')}
+SCALAR_END = re.compile(r"[\s,\]]")  # numbers and literals end at whitespace, a separator or the array end
 
 def read_json_file(file_path:str):
     """
@@ -27,6 +35,98 @@ def read_json_file(file_path:str):
             print(df.head())
             return df
         
+def decode_chunk(decoder: codecs.IncrementalDecoder, chunk: bytes, final: bool = False) -> str:
+    """
+    Decode a chunk as UTF-8, falling back to latin-1 for that chunk only
+    Bytes of a multi-byte character split across chunks are carried over by the incremental decoder,
+    pass final=True with the last chunk to flush them.
+    """
+    pending_bytes = decoder.getstate()[0]
+    try:
+        return decoder.decode(chunk, final)
+    except UnicodeDecodeError:
+        decoder.reset()
+        return (pending_bytes + chunk).decode("latin-1")
+
+
+def iter_json_records(file_path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Stream the records of a top-level JSON array one at a time.
+    Only the current chunk and the record being parsed are kept in memory,
+    so peak memory stays flat regardless of the file size.
+
+    Args:
+        file_path (str): Path to the JSON file to be read
+        chunk_size (int): Number of bytes read at a time
+
+    Yields:
+        dict: One record of the array
+    """
+    json_decoder = json.JSONDecoder()
+    utf8_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    position = 0
+    array_started = False
+    # text read since the last decode failed, kept aside until the closing token of the record arrives
+    pending = []
+    record_end = None
+
+    with open(file_path, "rb") as file:
+        while True:
+            chunk = file.read(chunk_size)
+            end_of_file = not chunk
+            text = decode_chunk(utf8_decoder, chunk, final=end_of_file)
+            pending.append(text)
+            if record_end and not end_of_file and not record_end.search(text):
+                continue  # re-parsing the record before it can be complete is quadratic in its size
+            buffer = buffer[position:] + "".join(pending)
+            pending = []
+            position = 0
+            record_end = None
+
+            while True:
+                # skip whitespace, the opening bracket and the separators between records
+                while position < len(buffer) and (buffer[position].isspace() or buffer[position] == ","):
+                    position += 1
+                if position == len(buffer):
+                    break
+                if not array_started:
+                    if buffer[position] != "[":
+                        raise ValueError(f"{file_path} does not contain a JSON array")
+                    array_started = True
+                    position += 1
+                    continue
+                if buffer[position] == "]":
+                    return
+
+                try:
+                    record, end = json_decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if end_of_file:
+                        raise
+                    record_end = RECORD_END.get(buffer[position], SCALAR_END)
+                    break  # the record continues in the next chunk
+                if end == len(buffer) and not end_of_file and buffer[position] not in RECORD_END:
+                    # a number or literal cut at the chunk boundary decodes as a shorter one
+                    record_end = SCALAR_END
+                    break
+                position = end
+                yield record
+
+            if end_of_file:
+                if array_started:
+                    raise ValueError(f"{file_path} ended before the JSON array was closed")
+                return
+
+
+def iter_translation_states(file_path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Stream the corpus as TranslationState-ready records, see map_json_to_translation_state
+    """
+    for record in iter_json_records(file_path, chunk_size):
+        yield map_json_to_translation_state(record)
+
+
 def get_data_to_app():
     """
     This function is used to get the data to the app.
@@ -58,29 +158,32 @@ def map_json_to_translation_state(message_data: dict) -> dict:
     }
 
 
-def serialize_translation_result(result: dict) -> dict:
-    """Convert LangGraph result to JSON-serializable format"""
-    
-    # Convert messages to simple strings
-    messages = result.get("messages", [])
-    serialized_messages = []
-    
-    for msg in messages:
-        if hasattr(msg, 'content'):
-            serialized_messages.append(msg.content)
-        elif isinstance(msg, str):
-            serialized_messages.append(msg)
-        else:
-            serialized_messages.append(str(msg))
-    
-    return {
+def serialize_translation_result(result: dict, include_messages: bool = False) -> dict:
+    """
+    Convert LangGraph result to JSON-serializable format
+    The output is shaped once here and encoded by orjson as is (see apis/utils/serialization.py).
+    The LangChain messages are only walked when the caller asks for the debug output.
+
+    Args:
+        result (dict): The final state of the translation graph
+        include_messages (bool): Add the agents' processing_messages for debugging
+
+    Returns:
+        dict: The result ready to be encoded
+    """
+    serialized = {
         "success": True,
-        "translation_summary": result.get("translation_summary", {}),
+        "translation_summary": result.get("translation_summary") or {},
         "translated_text": result.get("translated_text", ""),
         "quality_score": result.get("quality_score", 0.0),
         "service_used": result.get("service_used", "unknown"),
         "needs_human_review": result.get("needs_human_review", False),
-        "processing_messages": serialized_messages,
         "source_text": result.get("source_text", ""),
         "target_language": result.get("target_language", "")
-    }
\ No newline at end of file
+    }
+    if include_messages:
+        serialized["processing_messages"] = [
+            getattr(message, "content", message) if not isinstance(message, str) else message
+            for message in result.get("messages", [])
+        ]
+    return serialized
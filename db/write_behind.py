@@ -0,0 +1,187 @@
+"""
+This module contains the write-behind queue for memory updates.
+
+The orchestrator only enqueues updates, a background flusher thread batches them to the
+persistent store when either trigger fires:
+- size: WRITE_BEHIND_BATCH_SIZE records are waiting
+- time: WRITE_BEHIND_FLUSH_INTERVAL seconds passed since the first waiting record
+
+Backpressure: the queue is bounded, a full queue blocks the producer for at most
+WRITE_BEHIND_PUT_TIMEOUT seconds and then drops the update (counted in the metrics),
+so a slow store can never stall translations indefinitely.
+The queue is flushed on shutdown through atexit, and in multiprocessing children (which
+leave through os._exit) through a multiprocessing Finalize. A forked child starts its own
+queue, the parent's flusher thread isn't copied.
+"""
+import atexit
+import logging
+import multiprocessing.util
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config.settings import config
+from db.memory_store import CONVERSATION_CONTEXT, TRANSLATION_MEMORY, SQLiteMemoryStore
+
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()  # sentinel that wakes the flusher up on shutdown
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue with a background flusher that batches records to a store
+    """
+    def __init__(self, store, batch_size: int = None, flush_interval: float = None,
+                 max_queue_size: int = None, put_timeout: float = None):
+        self.store = store
+        self.batch_size = batch_size or config.WRITE_BEHIND_BATCH_SIZE
+        self.flush_interval = flush_interval or config.WRITE_BEHIND_FLUSH_INTERVAL
+        self.put_timeout = put_timeout if put_timeout is not None else config.WRITE_BEHIND_PUT_TIMEOUT
+        self.queue = queue.Queue(maxsize=max_queue_size or config.WRITE_BEHIND_MAX_QUEUE)
+        self.thread: Optional[threading.Thread] = None
+        self.closed = False
+
+        # metrics
+        self.enqueued = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.total_flush_latency = 0.0
+
+    def start(self):
+        """Start the background flusher"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="write-behind-flusher", daemon=True)
+            self.thread.start()
+
+    def enqueue(self, record: tuple) -> bool:
+        """
+        Enqueue a record for persistence
+        Returns:
+            bool: False when the queue stayed full for put_timeout and the record was dropped
+        """
+        if self.closed:
+            return False
+        try:
+            self.queue.put(record, timeout=self.put_timeout)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Write-behind queue full, dropped memory update")
+            return False
+        self.enqueued += 1
+        return True
+
+    def enqueue_translation_memory(self, source_text: str, target_language: str, translated_text: str) -> bool:
+        return self.enqueue((TRANSLATION_MEMORY, source_text, target_language, translated_text))
+
+    def enqueue_conversation_context(self, session_id: str, entry: str) -> bool:
+        return self.enqueue((CONVERSATION_CONTEXT, session_id, entry))
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                record = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                record = None
+
+            if record is _STOP:
+                self._flush(batch)
+                return
+            if record is not None:
+                batch.append(record)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+                deadline = None
+
+    def _flush(self, batch: list):
+        if not batch:
+            return
+        start_time = time.perf_counter()
+        try:
+            self.store.write_batch(batch)
+            self.flushed += len(batch)
+        except Exception as e:
+            self.flush_errors += 1
+            logger.error(f"Write-behind flush of {len(batch)} records failed: {e}")
+        latency = time.perf_counter() - start_time
+        self.flushes += 1
+        self.last_flush_latency = latency
+        self.max_flush_latency = max(self.max_flush_latency, latency)
+        self.total_flush_latency += latency
+
+    def close(self, timeout: float = 10.0):
+        """Stop accepting records and flush everything still queued"""
+        if self.closed:
+            return
+        self.closed = True
+        if self.thread is not None:
+            self.queue.put(_STOP)
+            self.thread.join(timeout)
+            self.thread = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth and flush latency metrics for monitoring"""
+        return {
+            "queue_depth": self.queue.qsize(),
+            "max_queue_size": self.queue.maxsize,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "last_flush_latency": self.last_flush_latency,
+            "max_flush_latency": self.max_flush_latency,
+            "avg_flush_latency": self.total_flush_latency / self.flushes if self.flushes else 0.0,
+        }
+
+
+_write_behind_queue: Optional[WriteBehindQueue] = None
+_write_behind_lock = threading.Lock()
+
+
+def get_write_behind_queue() -> WriteBehindQueue:
+    """
+    Get the process-wide write-behind queue, starting it on first use
+    """
+    global _write_behind_queue
+    if _write_behind_queue is None:
+        with _write_behind_lock:
+            if _write_behind_queue is None:
+                write_behind_queue = WriteBehindQueue(SQLiteMemoryStore(config.MEMORY_STORE_PATH))
+                write_behind_queue.start()
+                atexit.register(write_behind_queue.close)
+                # multiprocessing children skip atexit, flush before logging stops (exitpriority 0)
+                multiprocessing.util.Finalize(write_behind_queue, write_behind_queue.close, exitpriority=10)
+                _write_behind_queue = write_behind_queue
+    return _write_behind_queue
+
+
+def get_write_behind_metrics() -> Optional[Dict[str, Any]]:
+    """
+    Metrics of the process-wide queue, None while it isn't started
+    """
+    write_behind_queue = _write_behind_queue
+    return write_behind_queue.get_metrics() if write_behind_queue is not None else None
+
+
+def _reset_after_fork():
+    global _write_behind_queue, _write_behind_lock
+    _write_behind_queue = None
+    _write_behind_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
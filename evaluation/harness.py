@@ -0,0 +1,124 @@
+"""
+Offline evaluation harness
+
+Streams (source, hypothesis, reference) triples from a JSONL file and accumulates corpus
+BLEU and chrF overall, per language pair and per router complexity. Segments are never
+held in memory, so the harness scales to any corpus size.
+
+Input format, one JSON object per line:
+    {"source": "...", "hypothesis": "...", "reference": "...",
+     "source_language": "de", "target_language": "en", "complexity": "standard"}
+"complexity" is optional, it is computed with the router's get_complexity when missing.
+
+Usage:
+    python -m evaluation.harness triples.jsonl
+    python -m evaluation.harness triples.jsonl --output report.json
+    python -m evaluation.harness triples.jsonl --baseline report.json --tolerance 1.0
+"""
+import argparse
+import json
+import sys
+from collections import defaultdict
+from typing import Iterable, Iterator
+
+from agent_architecture.Agents.router_agent import get_complexity
+from evaluation.metrics import CorpusMetrics
+
+
+def iter_triples(file_path: str) -> Iterator[dict]:
+    """
+    Stream the evaluation triples from a JSONL file one line at a time
+    """
+    with open(file_path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def evaluate(triples: Iterable[dict]) -> dict:
+    """
+    Accumulate the corpus metrics over a stream of triples
+    Args:
+        triples (Iterable[dict]): The (source, hypothesis, reference) records
+
+    Returns:
+        dict: The overall, per language pair and per complexity scores
+    """
+    overall = CorpusMetrics()
+    by_language_pair = defaultdict(CorpusMetrics)
+    by_complexity = defaultdict(CorpusMetrics)
+
+    for triple in triples:
+        hypothesis = triple.get("hypothesis") or ""
+        reference = triple.get("reference") or ""
+        language_pair = f"{triple.get('source_language', 'auto')}-{triple.get('target_language', 'es')}"
+        complexity = triple.get("complexity") or get_complexity(triple.get("source", ""))[0]
+
+        overall.add(hypothesis, reference)
+        by_language_pair[language_pair].add(hypothesis, reference)
+        by_complexity[complexity].add(hypothesis, reference)
+
+    return {
+        "overall": overall.to_dict(),
+        "by_language_pair": {key: metrics.to_dict() for key, metrics in sorted(by_language_pair.items())},
+        "by_complexity": {key: metrics.to_dict() for key, metrics in sorted(by_complexity.items())},
+    }
+
+
+def find_regressions(report: dict, baseline: dict, tolerance: float = 1.0) -> list[str]:
+    """
+    Compare a report against a baseline report and list the metrics that dropped
+    Args:
+        report (dict): The current evaluation report
+        baseline (dict): A previously saved evaluation report
+        tolerance (float): Allowed drop in points before a metric counts as regressed
+
+    Returns:
+        list[str]: Human readable regressions, empty when there are none
+    """
+    regressions = []
+    groups = [("overall", {"all": report["overall"]}, {"all": baseline.get("overall", {})})]
+    for breakdown in ("by_language_pair", "by_complexity"):
+        groups.append((breakdown, report.get(breakdown, {}), baseline.get(breakdown, {})))
+
+    for breakdown, current_groups, baseline_groups in groups:
+        for key, current in current_groups.items():
+            previous = baseline_groups.get(key)
+            if not previous:
+                continue
+            for metric in ("bleu", "chrf"):
+                drop = previous.get(metric, 0.0) - current.get(metric, 0.0)
+                if drop > tolerance:
+                    regressions.append(
+                        f"{breakdown}[{key}] {metric}: {previous[metric]:.2f} -> {current[metric]:.2f}"
+                    )
+    return regressions
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluate translations against references")
+    parser.add_argument("input", help="JSONL file with source/hypothesis/reference triples")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    parser.add_argument("--baseline", help="Baseline report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=1.0, help="Allowed drop in points")
+    args = parser.parse_args(argv)
+
+    report = evaluate(iter_triples(args.input))
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            regressions = find_regressions(report, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
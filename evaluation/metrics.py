@@ -0,0 +1,132 @@
+"""
+This module contains the incremental corpus-level quality metrics.
+
+Both metrics only keep fixed-size sufficient statistics, so memory is O(1) per metric
+no matter how many segments are streamed through them:
+- BLEU: clipped n-gram matches and totals for n=1..4 plus hypothesis/reference lengths
+- chrF: character n-gram matches, hypothesis and reference counts for n=1..6
+
+Corpus scores are computed from the summed statistics (not averaged sentence scores),
+which matches how sacreBLEU reports corpus BLEU and chrF.
+"""
+import math
+import re
+from collections import Counter
+
+
+BLEU_MAX_ORDER = 4
+CHRF_CHAR_ORDER = 6
+CHRF_BETA = 2
+WORD_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def get_ngrams(items, order: int) -> Counter:
+    """
+    Count the n-grams of a given order in a sequence
+    """
+    return Counter(tuple(items[i:i + order]) for i in range(len(items) - order + 1))
+
+
+class BleuAccumulator:
+    """
+    Corpus BLEU accumulated one segment at a time
+    """
+    def __init__(self, max_order: int = BLEU_MAX_ORDER):
+        self.max_order = max_order
+        self.matches = [0] * max_order
+        self.totals = [0] * max_order
+        self.hypothesis_length = 0
+        self.reference_length = 0
+        self.segments = 0
+
+    def add(self, hypothesis: str, reference: str):
+        """Add the n-gram statistics of one segment"""
+        hypothesis_tokens = WORD_PATTERN.findall(hypothesis.lower())
+        reference_tokens = WORD_PATTERN.findall(reference.lower())
+        self.hypothesis_length += len(hypothesis_tokens)
+        self.reference_length += len(reference_tokens)
+        self.segments += 1
+
+        for order in range(1, self.max_order + 1):
+            hypothesis_ngrams = get_ngrams(hypothesis_tokens, order)
+            reference_ngrams = get_ngrams(reference_tokens, order)
+            self.matches[order - 1] += sum((hypothesis_ngrams & reference_ngrams).values())
+            self.totals[order - 1] += max(len(hypothesis_tokens) - order + 1, 0)
+
+    def score(self) -> float:
+        """Corpus BLEU on a 0-100 scale"""
+        if not self.hypothesis_length or not all(self.matches):
+            return 0.0
+        log_precision = sum(
+            math.log(match / total) for match, total in zip(self.matches, self.totals)
+        ) / self.max_order
+        if self.hypothesis_length < self.reference_length:
+            brevity_penalty = math.exp(1 - self.reference_length / self.hypothesis_length)
+        else:
+            brevity_penalty = 1.0
+        return 100 * brevity_penalty * math.exp(log_precision)
+
+
+class ChrfAccumulator:
+    """
+    Corpus chrF accumulated one segment at a time
+    """
+    def __init__(self, char_order: int = CHRF_CHAR_ORDER, beta: int = CHRF_BETA):
+        self.char_order = char_order
+        self.beta = beta
+        self.matches = [0] * char_order
+        self.hypothesis_counts = [0] * char_order
+        self.reference_counts = [0] * char_order
+        self.segments = 0
+
+    def add(self, hypothesis: str, reference: str):
+        """Add the character n-gram statistics of one segment"""
+        # chrF ignores whitespace
+        hypothesis_chars = "".join(hypothesis.split())
+        reference_chars = "".join(reference.split())
+        self.segments += 1
+
+        for order in range(1, self.char_order + 1):
+            hypothesis_ngrams = get_ngrams(hypothesis_chars, order)
+            reference_ngrams = get_ngrams(reference_chars, order)
+            self.matches[order - 1] += sum((hypothesis_ngrams & reference_ngrams).values())
+            self.hypothesis_counts[order - 1] += sum(hypothesis_ngrams.values())
+            self.reference_counts[order - 1] += sum(reference_ngrams.values())
+
+    def score(self) -> float:
+        """Corpus chrF on a 0-100 scale"""
+        precisions, recalls = [], []
+        for match, hypothesis_count, reference_count in zip(
+                self.matches, self.hypothesis_counts, self.reference_counts):
+            if hypothesis_count and reference_count:
+                precisions.append(match / hypothesis_count)
+                recalls.append(match / reference_count)
+        if not precisions:
+            return 0.0
+
+        precision = sum(precisions) / len(precisions)
+        recall = sum(recalls) / len(recalls)
+        if not precision and not recall:
+            return 0.0
+        beta_squared = self.beta ** 2
+        return 100 * (1 + beta_squared) * precision * recall / (beta_squared * precision + recall)
+
+
+class CorpusMetrics:
+    """
+    All corpus metrics for one group of segments (a language pair, a complexity...)
+    """
+    def __init__(self):
+        self.bleu = BleuAccumulator()
+        self.chrf = ChrfAccumulator()
+
+    def add(self, hypothesis: str, reference: str):
+        self.bleu.add(hypothesis, reference)
+        self.chrf.add(hypothesis, reference)
+
+    def to_dict(self) -> dict:
+        return {
+            "segments": self.bleu.segments,
+            "bleu": round(self.bleu.score(), 2),
+            "chrf": round(self.chrf.score(), 2),
+        }
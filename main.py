@@ -2,6 +2,9 @@
 import logging
 from typing import Dict, Any, List, Union
 
+# Third-party imports
+import uvicorn
+
 
 
 # Local imports
@@ -40,7 +43,7 @@ translation_system = create_translation_system()
 
 def app_run():
     app = create_app()
-    app.run(debug=True, port=5000)
+    uvicorn.run(app, port=5000)
 
 if __name__ == "__main__":
     app_run()
@@ -0,0 +1,176 @@
+"""
+This module contains the Prometheus instrumentation of the translation system.
+
+- Histograms: latency per graph node, per translation backend and per whole workflow
+- Counters: cache hits/misses per tier, coalesced requests, QA outcomes, retries, fast-path routing,
+  admission decisions per priority class (plus a histogram of the admission wait)
+- Gauge: workflows in flight
+- State size: approximate bytes of each node's state update and of a run's final state, per
+  state profile (see config.STATE_PROFILE), sampled every config.STATE_SIZE_SAMPLE_EVERY runs
+
+Multiprocess mode: with several uvicorn/gunicorn workers, set PROMETHEUS_MULTIPROC_DIR to an
+empty directory before the processes start. Every process then writes its samples there and
+/metrics aggregates them with a MultiProcessCollector. Call mark_process_dead from the
+process manager when a worker exits (e.g. gunicorn's child_exit hook).
+"""
+import itertools
+import os
+import sys
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+
+from config.settings import config
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+NODE_LATENCY = Histogram(
+    "translation_node_duration_seconds", "Time spent in a graph node", ["node"], buckets=LATENCY_BUCKETS
+)
+BACKEND_LATENCY = Histogram(
+    "translation_backend_duration_seconds", "Time spent in a translation backend call",
+    ["backend", "outcome"], buckets=LATENCY_BUCKETS
+)
+WORKFLOW_LATENCY = Histogram(
+    "translation_workflow_duration_seconds", "Time of a whole graph run", buckets=LATENCY_BUCKETS
+)
+CACHE_REQUESTS = Counter(
+    "translation_cache_requests_total", "Cache lookups per tier and result", ["tier", "result"]
+)
+COALESCED_REQUESTS = Counter(
+    "translation_coalesced_requests_total", "Requests that shared an identical in-flight graph run"
+)
+QA_OUTCOMES = Counter(
+    "translation_qa_outcomes_total", "Quality check decisions", ["next_action"]
+)
+RETRIES = Counter(
+    "translation_retries_total", "Translations retried after a failed quality check"
+)
+FAST_PATH = Counter(
+    "translation_fast_path_total", "Requests routed straight to direct translation"
+)
+ADMISSIONS = Counter(
+    "translation_admissions_total", "Admission decisions per priority class", ["priority", "outcome"]
+)
+ADMISSION_WAIT = Histogram(
+    "translation_admission_wait_seconds", "Time waited for backend capacity", ["priority"],
+    buckets=LATENCY_BUCKETS
+)
+STATE_UPDATE_SIZE = Histogram(
+    "translation_state_update_bytes", "Approximate size of the state update a node returns",
+    ["node", "profile"], buckets=SIZE_BUCKETS
+)
+STATE_SIZE = Histogram(
+    "translation_state_bytes", "Approximate size of a graph run's final state", ["profile"], buckets=SIZE_BUCKETS
+)
+WORKFLOWS_IN_FLIGHT = Gauge(
+    "translation_workflows_in_flight", "Graph runs in progress", multiprocess_mode="livesum"
+)
+
+
+def get_state_size(value: Any) -> int:
+    """
+    Approximate bytes held by a state value
+    Containers are walked, objects reporting size_bytes (the translation memory) count that
+    and LangChain messages count their content.
+    """
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(get_state_size(key) + get_state_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(get_state_size(item) for item in value)
+    size_bytes = getattr(value, "size_bytes", None)
+    if isinstance(size_bytes, int):
+        return size_bytes
+    content = getattr(value, "content", None)
+    if isinstance(content, str):
+        return sys.getsizeof(value) + sys.getsizeof(content)
+    return sys.getsizeof(value)
+
+
+def instrument_node(name: str, node: Callable, final: bool = False) -> Callable:
+    """
+    Wrap a graph node to record its latency and, every config.STATE_SIZE_SAMPLE_EVERY calls,
+    the size of its state update, the node's signature is kept for LangGraph
+    Args:
+        name (str): The node's name in the graph
+        node (Callable): The node function, the state is its first argument
+        final (bool): The node ends every run, its state plus its update is the run's final state
+    """
+    calls = itertools.count(1)
+
+    @wraps(node)
+    def instrumented_node(*args, **kwargs):
+        with NODE_LATENCY.labels(name).time():
+            update = node(*args, **kwargs)
+        # walking the state isn't free, only every Nth call of a node is measured
+        sample_every = config.STATE_SIZE_SAMPLE_EVERY
+        if sample_every and next(calls) % sample_every == 0:
+            update_size = get_state_size(update)
+            STATE_UPDATE_SIZE.labels(name, config.STATE_PROFILE).observe(update_size)
+            if final:
+                STATE_SIZE.labels(config.STATE_PROFILE).observe(get_state_size(args[0]) + update_size)
+        return update
+    return instrumented_node
+
+
+@contextmanager
+def observe_backend(backend: str):
+    """
+    Time a backend call, the outcome is "error" when it raises
+    Usage:
+        with observe_backend("libretranslate") as call:
+            text = translate()
+            call["outcome"] = "success" if text else "empty"
+    """
+    call = {"outcome": "success"}
+    start_time = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        call["outcome"] = "error"
+        raise
+    finally:
+        BACKEND_LATENCY.labels(backend, call["outcome"]).observe(time.perf_counter() - start_time)
+
+
+@contextmanager
+def track_workflow():
+    """Count a graph run as in flight and record its latency"""
+    with WORKFLOWS_IN_FLIGHT.track_inprogress(), WORKFLOW_LATENCY.time():
+        yield
+
+
+def get_workflows_in_flight() -> int:
+    """Graph runs in progress in this process, as counted by track_workflow"""
+    return int(WORKFLOWS_IN_FLIGHT.collect()[0].samples[0].value)
+
+
+def is_multiprocess() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render the metrics in the Prometheus text format, aggregated over processes in multiprocess mode
+    Returns:
+        tuple[bytes, str]: The body and its content type
+    """
+    if is_multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """Drop the live gauges of an exited worker process in multiprocess mode"""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(pid)
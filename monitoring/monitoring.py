@@ -1,36 +1,200 @@
+"""
+This module contains the logging of the translation system.
+
+Logging is configured once per process by setup_logging. Loggers only put records on an
+in-memory queue; a QueueListener thread renders them as structured JSON (structlog) and
+does the file and console I/O, so logging from the request path costs one enqueue.
+
+- stdlib loggers (logging.getLogger) and structlog loggers (get_logger) share the pipeline
+- debug records are sampled before they are queued (LOG_DEBUG_SAMPLE_RATE)
+- when the queue is full records are dropped and counted instead of blocking the caller
+- a forked process (worker pools) starts its own listener, the parent's thread isn't copied
+"""
 # Standard library imports
+import atexit
 import logging
-from datetime import datetime
-from typing import Dict, Any
-
-def setup_logging():
-    """Setup comprehensive logging for the translation system"""
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('translation_system.log'),
-            logging.StreamHandler()
-        ]
+import multiprocessing.util
+import os
+import queue
+import random
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, Optional
+
+# Third-party imports
+import structlog
+
+# Local imports
+from config.settings import config
+
+
+SHARED_PROCESSORS = [
+    structlog.contextvars.merge_contextvars,
+    structlog.stdlib.add_logger_name,
+    structlog.stdlib.add_log_level,
+    structlog.processors.TimeStamper(fmt="iso", utc=True),
+]
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+_setup_lock = threading.Lock()
+
+
+class DebugSampler(logging.Filter):
+    """Keep a share of the debug records, every other level passes"""
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno != logging.DEBUG or random.random() < self.rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Queue handler that never blocks the caller
+    Records are queued as they are, the listener thread formats them.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # merge %-style args now, they could change before the listener formats the record
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def get_formatter(renderer) -> structlog.stdlib.ProcessorFormatter:
+    return structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=SHARED_PROCESSORS,
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.format_exc_info,
+            renderer,
+        ],
     )
-    
-    return logging.getLogger(__name__)
+
+
+def setup_logging(name: str = __name__) -> logging.Logger:
+    """
+    Setup comprehensive logging for the translation system, once per process
+    Later calls only return the logger.
+    Args:
+        name (str): The logger to return
+
+    Returns:
+        logging.Logger: The named logger
+    """
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is None:
+            json_formatter = get_formatter(structlog.processors.JSONRenderer())
+            file_handler = logging.FileHandler(config.LOG_FILE, encoding="utf-8")
+            file_handler.setFormatter(json_formatter)
+            stream_handler = logging.StreamHandler(sys.stderr)
+            stream_handler.setFormatter(
+                json_formatter if config.LOG_FORMAT == "json"
+                else get_formatter(structlog.dev.ConsoleRenderer(colors=False))
+            )
+
+            log_queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+            _queue_handler = DroppingQueueHandler(log_queue)
+            _queue_handler.addFilter(DebugSampler(config.LOG_DEBUG_SAMPLE_RATE))
+
+            root_logger = logging.getLogger()
+            for handler in list(root_logger.handlers):
+                root_logger.removeHandler(handler)
+            root_logger.addHandler(_queue_handler)
+            root_logger.setLevel(config.LOG_LEVEL)
+
+            structlog.configure(
+                processors=[structlog.stdlib.filter_by_level, *SHARED_PROCESSORS,
+                            structlog.stdlib.ProcessorFormatter.wrap_for_formatter],
+                logger_factory=structlog.stdlib.LoggerFactory(),
+                wrapper_class=structlog.stdlib.BoundLogger,
+                cache_logger_on_first_use=True,
+            )
+
+            _listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+            _listener.start()
+            atexit.register(stop_logging)
+
+    return logging.getLogger(name)
+
+
+def stop_logging():
+    """Write the queued records and stop the listener thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+
+def _reinit_after_fork():
+    global _listener, _queue_handler, _setup_lock
+    _setup_lock = threading.Lock()  # it may have been held by another thread of the parent
+    if _listener is not None:
+        _listener = None
+        _queue_handler = None
+        setup_logging()
+
+
+def _stop_logging_at_process_exit(_):
+    # multiprocessing children leave through os._exit, which skips atexit
+    multiprocessing.util.Finalize(None, stop_logging, exitpriority=0)
+
+
+class _ProcessExitHook:
+    pass
+
+
+os.register_at_fork(after_in_child=_reinit_after_fork)
+_process_exit_hook = _ProcessExitHook()
+multiprocessing.util.register_after_fork(_process_exit_hook, _stop_logging_at_process_exit)
+
+
+def get_logger(name: str = __name__):
+    """A structlog logger, events are keyword fields rendered as JSON"""
+    return structlog.get_logger(name)
+
+
+def get_logging_metrics() -> Dict[str, Any]:
+    """Queue depth and dropped records for monitoring"""
+    if _queue_handler is None:
+        return {"configured": False}
+    return {
+        "configured": _listener is not None,
+        "queue_depth": _queue_handler.queue.qsize(),
+        "max_queue_size": _queue_handler.queue.maxsize,
+        "dropped": _queue_handler.dropped,
+    }
+
+
+request_logger = get_logger("translation.requests")
+
 
 def log_translation_request(data: Dict[str, Any], result: Dict[str, Any]):
     """Log translation requests for analysis"""
-    
-    logger = setup_logging()
-    
-    log_entry = {
-        "timestamp": datetime.now().isoformat(),
-        "source_text_length": len(data.get("source_text", "")),
-        "source_language": data.get("source_language"),
-        "target_language": data.get("target_language"), 
-        "translation_success": result.get("success", False),
-        "quality_score": result.get("quality_score", 0.0),
-        "service_used": result.get("service_used"),
-        "needs_human_review": result.get("needs_human_review", False)
-    }
-    
-    logger.info(f"Translation request: {log_entry}")
\ No newline at end of file
+    request_logger.info(
+        "translation_request",
+        source_text_length=len(data.get("source_text", "")),
+        source_language=data.get("source_language"),
+        target_language=data.get("target_language"),
+        translation_success=result.get("success", False),
+        quality_score=result.get("quality_score", 0.0),
+        service_used=result.get("service_used"),
+        needs_human_review=result.get("needs_human_review", False),
+    )
@@ -0,0 +1,234 @@
+"""
+This module contains the on-demand profilers of the translation system.
+
+- run_profiled: cProfile of one call, e.g. the graph run of a request with ?profile=1,
+  saved as a pstats file (python -m pstats, snakeviz)
+- SamplingProfiler: time-boxed whole-process sampling of every thread's stack through
+  sys._current_frames(), saved as collapsed stacks (flamegraph.pl, speedscope)
+- MemoryProfiler: tracemalloc snapshots, each one diffed against the previous one
+
+Nothing is hooked in while no profile is requested: cProfile is enabled for the one call,
+the sampler thread only lives for its duration and tracemalloc only traces between start
+and stop. Finished profiles are kept in a bounded ProfileStore for download.
+"""
+import cProfile
+import itertools
+import marshal
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.settings import config
+
+
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+PSTATS_MEDIA_TYPE = "application/octet-stream"
+TEXT_MEDIA_TYPE = "text/plain; charset=utf-8"
+
+
+@dataclass
+class Profile:
+    profile_id: str
+    kind: str  # "cprofile", "sampling" or "tracemalloc"
+    filename: str
+    media_type: str
+    status: str = RUNNING
+    content: bytes = b""
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+
+    def describe(self) -> dict:
+        return {
+            "profile_id": self.profile_id,
+            "kind": self.kind,
+            "filename": self.filename,
+            "status": self.status,
+            "size_bytes": len(self.content),
+            "error": self.error,
+            "created_at": self.created_at,
+        }
+
+
+class ProfileStore:
+    """
+    The latest profiles by id, the oldest one is dropped past max_profiles
+    """
+    def __init__(self, max_profiles: int = None):
+        self.max_profiles = max_profiles or config.PROFILE_STORE_SIZE
+        self.profiles: "OrderedDict[str, Profile]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def start(self, kind: str, extension: str, media_type: str) -> Profile:
+        profile_id = uuid.uuid4().hex[:12]
+        profile = Profile(profile_id, kind, f"{kind}-{profile_id}.{extension}", media_type)
+        with self.lock:
+            self.profiles[profile_id] = profile
+            while len(self.profiles) > self.max_profiles:
+                self.profiles.popitem(last=False)
+        return profile
+
+    def add(self, kind: str, extension: str, media_type: str, content: bytes) -> Profile:
+        profile = self.start(kind, extension, media_type)
+        profile.content = content
+        profile.status = COMPLETED
+        return profile
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        with self.lock:
+            return self.profiles.get(profile_id)
+
+    def list(self) -> List[dict]:
+        with self.lock:
+            return [profile.describe() for profile in reversed(self.profiles.values())]
+
+
+def dump_pstats(profiler: cProfile.Profile) -> bytes:
+    """The profile in the pstats file format, what Profile.dump_stats writes"""
+    profiler.create_stats()
+    return marshal.dumps(profiler.stats)
+
+
+def run_profiled(func: Callable, *args, **kwargs) -> Tuple[Any, bytes]:
+    """
+    Call func under cProfile, in the calling thread
+    Returns:
+        tuple: The result and the pstats file content
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+    return result, dump_pstats(profiler)
+
+
+def get_frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all threads at an interval for a fixed duration
+    Only one sampling profile runs at a time.
+    Args:
+        store (ProfileStore): Receives the collapsed stacks
+        interval (float): Seconds between samples
+    """
+    def __init__(self, store: ProfileStore, interval: float = None):
+        self.store = store
+        self.interval = interval or config.PROFILE_SAMPLE_INTERVAL
+        self.running = threading.Lock()
+
+    def start(self, seconds: float) -> Profile:
+        """
+        Sample for the given seconds in a background thread
+        Raises:
+            RuntimeError: A sampling profile is already running
+        """
+        if not self.running.acquire(blocking=False):
+            raise RuntimeError("A sampling profile is already running")
+        seconds = min(seconds, config.PROFILE_MAX_SECONDS)
+        profile = self.store.start("sampling", "collapsed", TEXT_MEDIA_TYPE)
+        threading.Thread(target=self._run, args=(profile, seconds), name="sampling-profiler",
+                         daemon=True).start()
+        return profile
+
+    def _run(self, profile: Profile, seconds: float):
+        try:
+            profile.content = self.sample(seconds)
+            profile.status = COMPLETED
+        except Exception as e:
+            profile.error = str(e)
+            profile.status = FAILED
+        finally:
+            self.running.release()
+
+    def sample(self, seconds: float) -> bytes:
+        """Collapsed stacks of the other threads, one "frame;frame;frame count" line per stack"""
+        own_thread = threading.get_ident()
+        thread_names = {}
+        stacks = Counter()
+        deadline = time.monotonic() + seconds
+        for sample in itertools.count():
+            if time.monotonic() >= deadline:
+                break
+            if sample % 100 == 0:
+                thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(get_frame_name(frame))
+                    frame = frame.f_back
+                stack.append(thread_names.get(thread_id, str(thread_id)))
+                stacks[";".join(reversed(stack))] += 1
+            time.sleep(self.interval)
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common()).encode("utf-8")
+
+
+class MemoryProfiler:
+    """
+    tracemalloc snapshots, every snapshot is diffed against the previous one
+    Args:
+        store (ProfileStore): Receives the snapshot statistics
+    """
+    def __init__(self, store: ProfileStore):
+        self.store = store
+        self.previous: Optional[tracemalloc.Snapshot] = None
+        self.lock = threading.Lock()
+
+    def start(self, frames: int = None):
+        with self.lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames or config.TRACEMALLOC_FRAMES)
+            self.previous = None
+
+    def snapshot(self, top: int = None) -> Profile:
+        """
+        Take a snapshot, the statistics by line are diffed against the previous snapshot
+        Raises:
+            RuntimeError: tracemalloc was not started
+        """
+        with self.lock:
+            if not tracemalloc.is_tracing():
+                raise RuntimeError("Memory profiling is not started")
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ))
+            current, peak = tracemalloc.get_traced_memory()
+            if self.previous is None:
+                header = "Top allocations by line"
+                statistics = snapshot.statistics("lineno")
+            else:
+                header = "Allocation changes by line since the previous snapshot"
+                statistics = snapshot.compare_to(self.previous, "lineno")
+            self.previous = snapshot
+
+        lines = [f"# {header}", f"# traced: {current} bytes, peak: {peak} bytes"]
+        lines.extend(str(statistic) for statistic in statistics[:top or config.TRACEMALLOC_TOP])
+        return self.store.add("tracemalloc", "txt", TEXT_MEDIA_TYPE, ("\n".join(lines) + "\n").encode("utf-8"))
+
+    def stop(self):
+        with self.lock:
+            tracemalloc.stop()
+            self.previous = None
+
+    def get_status(self) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            return {"tracing": False}
+        current, peak = tracemalloc.get_traced_memory()
+        return {"tracing": True, "traced_bytes": current, "peak_bytes": peak}
+
+
+profile_store = ProfileStore()
+sampling_profiler = SamplingProfiler(profile_store)
+memory_profiler = MemoryProfiler(profile_store)
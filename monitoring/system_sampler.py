@@ -0,0 +1,119 @@
+"""
+This module contains the background sampler of system metrics and backend health.
+
+Two daemon threads refresh a shared snapshot on a schedule:
+- system: CPU, memory, disk and load every SYSTEM_SAMPLE_INTERVAL seconds
+- backends: a probe call per translation backend every BACKEND_PROBE_INTERVAL seconds
+
+The health endpoints read the snapshot instead of measuring on the request path, which
+used to block for a second on cpu_percent(interval=1) and translate on every probe.
+Every section carries its age; a section older than SAMPLE_STALE_AFTER intervals (or
+never sampled) is flagged stale so callers can tell a hung sampler from a healthy system.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import psutil
+
+from config.settings import config
+
+
+logger = logging.getLogger(__name__)
+
+
+class SystemSampler:
+    """
+    Samples system metrics and probes backends in the background
+    Args:
+        probes (dict): backend name -> callable that raises or returns a falsy value when the backend is down
+        sample_interval (float): Seconds between system samples
+        probe_interval (float): Seconds between backend probes
+    """
+    def __init__(self, probes: Dict[str, Callable[[], Any]] = None, sample_interval: float = None,
+                 probe_interval: float = None):
+        self.probes = probes or {}
+        self.sample_interval = sample_interval or config.SYSTEM_SAMPLE_INTERVAL
+        self.probe_interval = probe_interval or config.BACKEND_PROBE_INTERVAL
+        # replaced as a whole by the sampler threads, so readers never see a partial update
+        self.system: Dict[str, Any] = {}
+        self.system_sampled_at: Optional[float] = None
+        self.backends: Dict[str, Dict[str, Any]] = {}
+        self.backends_probed_at: Optional[float] = None
+        self.stopping = threading.Event()
+        self.threads: list[threading.Thread] = []
+
+    def start(self):
+        """Start the sampler threads, the first samples are taken right away"""
+        if self.threads:
+            return
+        psutil.cpu_percent(interval=None)  # the first call only sets the baseline
+        self.threads = [
+            threading.Thread(target=self._loop, args=(self.sample_system, self.sample_interval),
+                             name="system-sampler", daemon=True),
+            threading.Thread(target=self._loop, args=(self.probe_backends, self.probe_interval),
+                             name="backend-prober", daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.stopping.set()
+
+    def _loop(self, sample: Callable[[], None], interval: float):
+        while not self.stopping.is_set():
+            try:
+                sample()
+            except Exception as e:
+                logger.error(f"Sampling failed: {e}")
+            self.stopping.wait(interval)
+
+    def sample_system(self):
+        """Take a non-blocking system sample, CPU usage is measured since the previous sample"""
+        self.system = {
+            "cpu_usage": psutil.cpu_percent(interval=None),
+            "memory_usage": psutil.virtual_memory().percent,
+            "disk_usage": psutil.disk_usage("/").percent,
+            "load_average": os.getloadavg()[0] if hasattr(os, "getloadavg") else 0.0,
+        }
+        self.system_sampled_at = time.time()
+
+    def probe_backends(self):
+        """Call every backend probe and record its status and response time"""
+        backends = {}
+        for name, probe in self.probes.items():
+            start_time = time.perf_counter()
+            try:
+                healthy = bool(probe())
+                error = None if healthy else "Service returned empty result"
+            except Exception as e:
+                healthy = False
+                error = str(e)
+            backends[name] = {
+                "status": "healthy" if healthy else "unhealthy",
+                "response_time": time.perf_counter() - start_time,
+                "error": error,
+            }
+        self.backends = backends
+        self.backends_probed_at = time.time()
+
+    def _section(self, data: dict, sampled_at: Optional[float], interval: float) -> dict:
+        age = time.time() - sampled_at if sampled_at is not None else None
+        return {
+            **data,
+            "sampled_at": sampled_at,
+            "age_seconds": age,
+            "stale": age is None or age > interval * config.SAMPLE_STALE_AFTER,
+        }
+
+    def get_system(self) -> dict:
+        return self._section(self.system, self.system_sampled_at, self.sample_interval)
+
+    def get_backends(self) -> dict:
+        return self._section({"services": self.backends}, self.backends_probed_at, self.probe_interval)
+
+    def get_snapshot(self) -> dict:
+        """The latest samples with their age and staleness"""
+        return {"system": self.get_system(), "backends": self.get_backends()}
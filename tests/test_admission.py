@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from apis.services.admission import BULK, INTERACTIVE, AdmissionController, AdmissionRejected
+from apis.services.translation_service import API, WORKER, get_backend_capacity
+from config.settings import config
+
+
+WEIGHTS = {INTERACTIVE: 8, BULK: 1}
+
+
+def make_controller(capacity: int = 1, max_queue_time: float = 60.0) -> AdmissionController:
+    controller = AdmissionController(capacity, WEIGHTS, dict.fromkeys(WEIGHTS, max_queue_time))
+    controller.service_time = 0.001
+    return controller
+
+
+def test_interactive_waiters_go_ahead_of_a_bulk_flood():
+    async def scenario():
+        controller = make_controller()
+        await controller.acquire(BULK)  # the slot is busy
+        order = []
+
+        async def waiter(priority: str):
+            await controller.acquire(priority)
+            order.append(priority)
+            controller.release()
+
+        tasks = [asyncio.create_task(waiter(BULK)) for _ in range(8)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(waiter(INTERACTIVE)) for _ in range(8)]
+        await asyncio.sleep(0)
+        controller.release()
+        await asyncio.gather(*tasks)
+        return order, controller
+
+    order, controller = asyncio.run(scenario())
+    # weights 8:1, the whole interactive burst fits before the second bulk waiter
+    assert order[:9].count(INTERACTIVE) == 8
+    assert controller.in_use == 0 and controller.queued == 0
+
+
+def test_queued_request_expires_at_its_deadline():
+    async def scenario():
+        controller = make_controller(max_queue_time=0.05)
+        await controller.acquire(BULK)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire(INTERACTIVE)
+        return rejected.value, controller
+
+    rejected, controller = asyncio.run(scenario())
+    assert rejected.reason == "deadline"
+    assert controller.queued == 0
+    assert controller.get_metrics()[INTERACTIVE]["expired"] == 1
+
+
+def test_predicted_wait_past_the_queue_time_is_rejected_up_front():
+    async def scenario():
+        controller = make_controller(max_queue_time=0.5)
+        controller.service_time = 1.0
+        await controller.acquire(BULK)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire(INTERACTIVE)
+        return rejected.value, controller
+
+    rejected, controller = asyncio.run(scenario())
+    assert rejected.reason == "predicted_wait"
+    assert controller.queued == 0
+
+
+def test_slot_granted_to_a_cancelled_waiter_is_released():
+    async def scenario():
+        controller = make_controller()
+        await controller.acquire(BULK)
+        waiter = asyncio.create_task(controller.acquire(INTERACTIVE))
+        await asyncio.sleep(0)
+        controller.release()  # grants the slot to the waiter
+        waiter.cancel()  # before the waiter resumes
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        in_use = controller.in_use
+        await asyncio.wait_for(controller.acquire(INTERACTIVE), 0.1)
+        return in_use
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_capacity_is_split_between_api_and_worker(monkeypatch):
+    monkeypatch.setattr(config, "BACKEND_CAPACITY", {"libretranslate": 8})
+    monkeypatch.setattr(config, "WORKER_CAPACITY_SHARE", 0.25)
+    monkeypatch.setattr(config, "JOB_WORKER_IN_PROCESS", False)
+    assert get_backend_capacity(API, 1) == 6
+    assert get_backend_capacity(WORKER, 1) == 2
+    assert 2 * get_backend_capacity(API, 2) + get_backend_capacity(WORKER, 1) == 8
+    # the API runs the jobs itself, nothing is reserved
+    monkeypatch.setattr(config, "JOB_WORKER_IN_PROCESS", True)
+    assert get_backend_capacity(API, 1) == 8
@@ -0,0 +1,36 @@
+from fastapi.testclient import TestClient
+
+from apis.main import app
+from apis.services.cache_service import CacheService
+from apis.services.translation_service import TranslationService
+from apis.urls import deps
+from monitoring.metrics import get_workflows_in_flight, track_workflow
+
+
+class FakeGraph:
+    def invoke(self, state, config=None):
+        return {**state, "translated_text": state["source_text"].upper(), "quality_score": 0.9, "service_used": "test"}
+
+
+def test_inline_batch_is_admitted_ahead_of_bulk_work():
+    translation_service = TranslationService(4, FakeGraph())
+    app.dependency_overrides[deps.get_translation_service] = lambda: translation_service
+    app.dependency_overrides[deps.get_cache_service] = lambda: CacheService(redis_client=None)
+    try:
+        response = TestClient(app).post("/translate/batch", json={"texts": ["uno", "dos", "uno"]})
+    finally:
+        app.dependency_overrides.clear()
+        translation_service.close()
+
+    assert response.status_code == 200
+    assert [result["translation"] for result in response.json()["results"]] == ["UNO", "DOS", "UNO"]
+    admission = translation_service.admission.get_metrics()
+    assert admission["inline_batch"]["admitted"] == 2
+    assert admission["bulk"]["admitted"] == 0
+
+
+def test_workflows_in_flight_follow_track_workflow():
+    before = get_workflows_in_flight()
+    with track_workflow():
+        assert get_workflows_in_flight() == before + 1
+    assert get_workflows_in_flight() == before
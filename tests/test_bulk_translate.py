@@ -0,0 +1,67 @@
+import json
+
+from agent_architecture import bulk_translate
+from agent_architecture.bulk_translate import read_checkpoint, run_bulk_translation
+
+
+class FlakyGraph:
+    """Fails on the texts listed in failing, translates the others"""
+    failing = set()
+
+    def invoke(self, state):
+        if state["source_text"] in self.failing:
+            raise RuntimeError("backend down")
+        return {**state, "translated_text": state["source_text"].upper(), "quality_score": 0.9,
+                "service_used": "test", "translation_summary": {}}
+
+
+def read_output(output_path):
+    lines = {}
+    with open(output_path, "r", encoding="utf-8") as file:
+        for line in file:
+            result = json.loads(line)
+            lines[result["index"]] = result  # the last line of an index wins
+    return lines
+
+
+def test_failed_records_are_retried_on_resume(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_translate, "create_translation_system", FlakyGraph)
+    input_path, output_path = tmp_path / "jobs.jsonl", tmp_path / "results.jsonl"
+    input_path.write_text("".join(json.dumps({"source_text": text}) + "\n" for text in ("uno", "dos", "tres")))
+
+    FlakyGraph.failing = {"dos"}
+    assert run_bulk_translation(str(input_path), str(output_path), workers=1, executor="thread") == 3
+    assert read_checkpoint(f"{output_path}.checkpoint")["failed"] == [1]
+    assert read_output(output_path)[1]["success"] is False
+
+    FlakyGraph.failing = set()
+    assert run_bulk_translation(str(input_path), str(output_path), workers=1, executor="thread") == 3
+    results = read_output(output_path)
+    assert [results[index]["translated_text"] for index in range(3)] == ["UNO", "DOS", "TRES"]
+    assert read_checkpoint(f"{output_path}.checkpoint")["failed"] == []
+
+
+def test_failed_segment_is_retried_by_a_later_window(tmp_path, monkeypatch):
+    calls = []
+
+    class FailsOnce(FlakyGraph):
+        def invoke(self, state):
+            calls.append(state["source_text"])
+            if state["source_text"] == "hola" and calls.count("hola") == 1:
+                raise RuntimeError("backend down")
+            return super().invoke(state)
+
+    monkeypatch.setattr(bulk_translate, "create_translation_system", FailsOnce)
+    FlakyGraph.failing = set()
+    input_path, output_path = tmp_path / "jobs.jsonl", tmp_path / "results.jsonl"
+    # one worker translates windows of WINDOW_RECORDS_PER_WORKER records, the second "hola" is in the next one
+    texts = ["hola"] + [f"texto {index}" for index in range(bulk_translate.WINDOW_RECORDS_PER_WORKER)] + ["hola"]
+    input_path.write_text("".join(json.dumps({"source_text": text}) + "\n" for text in texts))
+
+    run_bulk_translation(str(input_path), str(output_path), workers=1, executor="thread")
+
+    results = read_output(output_path)
+    assert results[0]["success"] is False
+    assert results[len(texts) - 1]["success"] is True
+    assert results[len(texts) - 1]["translated_text"] == "HOLA"
+    assert calls.count("hola") == 2
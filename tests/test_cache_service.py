@@ -0,0 +1,105 @@
+import asyncio
+
+from apis.services.cache_service import MISSING, CacheService, LocalCache
+from apis.services.fake_redis import FakeRedis
+from apis.services.translation_service import TranslationResult
+
+
+def test_texts_differing_in_line_structure_have_their_own_entries():
+    key = CacheService.translation_key
+    assert key("Hello\nWorld", "en", "es") != key("Hello World", "en", "es")
+    assert key("Hello\nWorld", "en", "es") != key("Hello\n\nWorld", "en", "es")
+    assert key("Hello", "en", "es") != key("Hello", "en", "fr")
+    assert key("Hello", "en", "es") == key("Hello", "en", "es")
+
+
+def test_concurrent_misses_translate_once():
+    cache_service = CacheService(redis_client=None)
+    calls = []
+
+    async def translate():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return TranslationResult(translation="Hola", agent_history=["debug"])
+
+    async def main():
+        return await asyncio.gather(*(
+            cache_service.get_or_translate("Hello", "en", "es", translate) for _ in range(5)
+        ))
+
+    values = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(value["translation"] == "Hola" and "agent_history" not in value for value in values)
+    assert asyncio.run(cache_service.get_translation("Hello", "en", "es"))["translation"] == "Hola"
+
+
+class BrokenRedis:
+    calls = 0
+
+    async def mget(self, keys):
+        BrokenRedis.calls += 1
+        raise ConnectionError("redis down")
+
+    def pipeline(self, transaction=True):
+        raise ConnectionError("redis down")
+
+
+def test_local_cache_evicts_the_least_recently_used_and_expires_entries():
+    cache = LocalCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+    cache.set("expired", 4, ttl=-1)
+    assert cache.get("expired") is MISSING
+
+
+def test_l2_hits_fill_l1():
+    redis = FakeRedis()
+    writer, reader = CacheService(redis_client=redis), CacheService(redis_client=redis)
+
+    async def scenario():
+        await writer.set_many({"a": {"translation": "A"}, "b": {"translation": "B"}})
+        first = await reader.get_many(["a", "b", "c"])
+        second = await reader.get_many(["a", "b"])
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second == {"a": {"translation": "A"}, "b": {"translation": "B"}}
+    metrics = reader.get_metrics()
+    assert (metrics["l1"]["hits"], metrics["l1"]["misses"]) == (2, 3)
+    assert (metrics["l2"]["hits"], metrics["l2"]["misses"]) == (2, 1)
+
+
+def test_cache_runs_on_l1_alone_without_redis():
+    cache_service = CacheService(redis_client=None)
+
+    async def scenario():
+        await cache_service.set("a", {"translation": "A"})
+        return await cache_service.get("a"), await cache_service.get("b")
+
+    assert asyncio.run(scenario()) == ({"translation": "A"}, None)
+    assert cache_service.get_metrics()["l2"]["enabled"] is False
+
+
+def test_unreachable_redis_falls_back_to_l1_and_is_retried_later():
+    cache_service = CacheService(redis_client=BrokenRedis())
+    BrokenRedis.calls = 0
+
+    async def scenario():
+        await cache_service.set("a", {"translation": "A"})
+        values = [await cache_service.get("a"), await cache_service.get("b"), await cache_service.get("c")]
+        return values
+
+    assert asyncio.run(scenario()) == [{"translation": "A"}, None, None]
+    metrics = cache_service.get_metrics()
+    # the failed write skipped L2, so the misses didn't try it again during the retry interval
+    assert BrokenRedis.calls == 0
+    assert metrics["l2"]["errors"] == 1 and metrics["l2"]["available"] is False
+
+    cache_service.l2_retry_at = 0.0
+    assert asyncio.run(cache_service.get("b")) is None
+    assert BrokenRedis.calls == 1
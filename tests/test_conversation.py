@@ -0,0 +1,32 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from apis.services.conversation_service import issue_session_id, sign_session_id, verify_session_id
+from apis.urls.conversation import router
+
+
+def test_issued_session_id_verifies():
+    assert verify_session_id(issue_session_id())
+
+
+def test_tampered_session_id_is_rejected():
+    session_id, signature = issue_session_id().split(".")
+    assert not verify_session_id(f"{session_id[:-1]}x.{signature}")
+    flipped = "1" if signature[-1] == "0" else "0"
+    assert not verify_session_id(f"{session_id}.{signature[:-1]}{flipped}")
+    assert not verify_session_id(session_id)
+    assert not verify_session_id(f".{sign_session_id('')}")
+
+
+def test_conversation_rejects_tampered_session_id():
+    app = FastAPI()
+    app.include_router(router)
+    session_id = issue_session_id()
+    forged = "0" * 32 + session_id[32:]
+    with TestClient(app).websocket_connect(f"/translate/conversation?session_id={forged}") as websocket:
+        assert websocket.receive_json() == {"type": "error", "error": "Unknown session_id"}
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+    assert closed.value.code == 1008
@@ -0,0 +1,25 @@
+from agent_architecture.dedup import SegmentDeduplicator
+
+
+def test_identical_segments_are_translated_once():
+    deduplicator = SegmentDeduplicator()
+    plans = [deduplicator.plan(text, "en", "es") for text in ("Hello\nBye", "Hello\n  Thanks")]
+    pending = deduplicator.take_pending()
+    assert sorted(segment for segment, _, _ in pending.values()) == ["Bye", "Hello", "Thanks"]
+    for key, (segment, _, _) in pending.items():
+        deduplicator.set_result(key, segment.upper())
+    assert [deduplicator.assemble(plan) for plan in plans] == ["HELLO\nBYE", "HELLO\n  THANKS"]
+
+
+def test_uncached_failure_is_translated_again_in_the_next_window():
+    deduplicator = SegmentDeduplicator()
+    plan = deduplicator.plan("Hello", "en", "es")
+    (key, _), = deduplicator.take_pending().items()
+    deduplicator.set_result(key, "Hello", cache=False)
+    assert deduplicator.assemble(plan) == "Hello"
+    deduplicator.release()
+
+    plan = deduplicator.plan("Hello", "en", "es")
+    assert list(deduplicator.take_pending()) == [key]
+    deduplicator.set_result(key, "Hola")
+    assert deduplicator.assemble(plan) == "Hola"
@@ -0,0 +1,51 @@
+import math
+
+from evaluation.harness import evaluate, find_regressions
+from evaluation.metrics import BleuAccumulator, ChrfAccumulator
+
+
+def test_bleu_of_a_known_segment():
+    bleu = BleuAccumulator()
+    bleu.add("the cat sat on the mat", "the cat sat on a mat")
+    # clipped n-gram precisions 5/6, 3/5, 2/4, 1/3 and no brevity penalty
+    expected = 100 * math.exp((math.log(5 / 6) + math.log(3 / 5) + math.log(2 / 4) + math.log(1 / 3)) / 4)
+    assert math.isclose(bleu.score(), expected)
+
+
+def test_corpus_scores_sum_statistics_instead_of_averaging_segments():
+    bleu, chrf = BleuAccumulator(), ChrfAccumulator()
+    bleu.add("the cat sat on the mat", "the cat sat on the mat")
+    chrf.add("the cat sat on the mat", "the cat sat on the mat")
+    assert bleu.score() == 100.0
+    assert chrf.score() == 100.0
+
+    # the second segment has no 4-gram, its sentence BLEU is 0 but its matches still count
+    bleu.add("thanks", "thanks a lot")
+    assert bleu.matches == [7, 5, 4, 3]
+    assert bleu.totals == [7, 5, 4, 3]
+    assert math.isclose(bleu.score(), 100 * math.exp(1 - 9 / 7))
+
+
+def test_report_breaks_down_by_language_pair_and_complexity():
+    triples = [
+        {"hypothesis": "hola mundo", "reference": "hola mundo", "source_language": "en",
+         "target_language": "es", "complexity": "standard"},
+        {"hypothesis": "bonjour", "reference": "salut", "source_language": "en",
+         "target_language": "fr", "complexity": "formal"},
+    ]
+    report = evaluate(iter(triples))
+
+    assert report["overall"]["segments"] == 2
+    assert report["by_language_pair"]["en-es"]["chrf"] == 100.0
+    assert report["by_language_pair"]["en-fr"]["bleu"] == 0.0
+    assert set(report["by_complexity"]) == {"standard", "formal"}
+
+
+def test_regressions_beyond_the_tolerance_are_reported():
+    baseline = {"overall": {"bleu": 40.0, "chrf": 60.0}, "by_language_pair": {"en-es": {"bleu": 40.0, "chrf": 60.0}}}
+    report = {"overall": {"bleu": 39.5, "chrf": 55.0}, "by_language_pair": {"en-es": {"bleu": 30.0, "chrf": 60.0}},
+              "by_complexity": {}}
+    assert find_regressions(report, baseline, tolerance=1.0) == [
+        "overall[all] chrf: 60.00 -> 55.00",
+        "by_language_pair[en-es] bleu: 40.00 -> 30.00",
+    ]
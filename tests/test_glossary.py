@@ -0,0 +1,47 @@
+from Terminology.glossary import CombinedGlossary, GlossaryTrie, enforce_terminology
+
+
+def test_longest_match_wins():
+    glossary = GlossaryTrie([("cancer", "cáncer"), ("cancerous", "canceroso"),
+                             ("cancerous tumor", "tumor canceroso")])
+    text, enforced = enforce_terminology("A cancerous tumor and a cancer.", glossary)
+    assert text == "A tumor canceroso and a cáncer."
+    assert [term["source_term"] for term in enforced] == ["cancerous tumor", "cancer"]
+
+
+def test_terms_only_match_on_word_boundaries():
+    glossary = GlossaryTrie([("cancer", "cáncer")])
+    assert enforce_terminology("cancers and precancer", glossary) == ("cancers and precancer", [])
+    assert enforce_terminology("cancer_x cancer-free", glossary)[0] == "cancer_x cáncer-free"
+
+
+def test_replacement_follows_the_case_of_the_match():
+    glossary = GlossaryTrie([("blood pressure", "presión arterial")])
+    text, enforced = enforce_terminology("Blood pressure, BLOOD PRESSURE and blood pressure", glossary)
+    assert text == "Presión arterial, PRESIÓN ARTERIAL and presión arterial"
+    assert len(enforced) == 3
+
+
+def test_later_duplicates_override_earlier_translations():
+    glossary = GlossaryTrie([("fever", "calentura"), ("Fever", "fiebre")])
+    assert len(glossary) == 1
+    assert enforce_terminology("fever", glossary)[0] == "fiebre"
+
+
+def test_combined_glossaries_prefer_the_longest_then_the_first():
+    session = GlossaryTrie([("tumor", "bulto")])
+    domain = GlossaryTrie([("tumor", "tumor"), ("brain tumor", "tumor cerebral")])
+    glossary = CombinedGlossary(session, domain, None)
+    assert enforce_terminology("brain tumor, tumor", glossary)[0] == "tumor cerebral, bulto"
+
+
+def test_session_phrases_take_precedence_over_the_domain_glossary():
+    from agent_architecture.Agents.translation_agent import apply_terminology_consistency
+    from Terminology import medical
+
+    source_term, target_term = next(iter(medical.english_to_spanish.items()))
+    text, enforced = apply_terminology_consistency(
+        f"{source_term} and session term", [("session term", "es", "término de sesión")], domain="medical"
+    )
+    assert text == f"{target_term} and término de sesión"
+    assert {term["source_term"].lower() for term in enforced} == {source_term.lower(), "session term"}
@@ -0,0 +1,59 @@
+import json
+
+from config.settings import config
+from Terminology import glossary_store
+from Terminology.glossary import enforce_terminology
+from Terminology.glossary_store import GlossaryStore, build_glossary, get_glossary_store, open_glossary_store
+
+
+def write_terms(tmp_path):
+    csv_path = tmp_path / "terms.csv"
+    csv_path.write_text("en,es\ncancer,cáncer\ncancerous tumor,tumor canceroso\nfever,calentura\nFever,fiebre\n",
+                        encoding="utf-8")
+    return csv_path
+
+
+def test_build_from_csv_json_and_tbx(tmp_path):
+    store = GlossaryStore(build_glossary(str(write_terms(tmp_path)), "medical", "en", "es", tmp_path / "csv.marisa"))
+    assert len(store) == 3  # the later "Fever" overrides "fever"
+    assert store.lookup("FEVER") == "fiebre"
+    assert store.lookup("unknown") is None
+
+    json_path = tmp_path / "terms.json"
+    json_path.write_text(json.dumps([{"en": "nurse", "es": "enfermera"}]), encoding="utf-8")
+    assert GlossaryStore(build_glossary(str(json_path), "medical", "en", "es", tmp_path / "json.marisa")).lookup(
+        "nurse") == "enfermera"
+
+    tbx_path = tmp_path / "terms.tbx"
+    tbx_path.write_text(
+        '<martif><text><body><termEntry>'
+        '<langSet xml:lang="en"><tig><term>vaccine</term></tig></langSet>'
+        '<langSet xml:lang="es"><tig><term>vacuna</term></tig></langSet>'
+        '</termEntry></body></text></martif>', encoding="utf-8"
+    )
+    assert GlossaryStore(build_glossary(str(tbx_path), "medical", "en", "es", tmp_path / "tbx.marisa")).lookup(
+        "vaccine") == "vacuna"
+
+
+def test_prefix_lookup_and_longest_match(tmp_path):
+    store = GlossaryStore(build_glossary(str(write_terms(tmp_path)), "medical", "en", "es", tmp_path / "g.marisa"))
+    assert sorted(source for source, _ in store.terms_with_prefix("canc")) == ["cancer", "cancerous tumor"]
+    text, enforced = enforce_terminology("A Cancerous tumor, not cancers.", store)
+    assert text == "A Tumor canceroso, not cancers."
+    assert [term["source_term"] for term in enforced] == ["cancerous tumor"]
+
+
+def test_glossary_built_while_running_is_picked_up(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "GLOSSARY_DIR", str(tmp_path / "glossaries"))
+    monkeypatch.setattr(config, "GLOSSARY_RECHECK_INTERVAL", 0)
+    monkeypatch.setattr(glossary_store, "_missing_glossaries", {})
+    open_glossary_store.cache_clear()
+    try:
+        assert get_glossary_store("cardiology", "en", "es") is None
+        build_glossary(str(write_terms(tmp_path)), "cardiology", "en", "es")
+        store = get_glossary_store("cardiology", "en", "es")
+        assert store is not None and store.lookup("cancer") == "cáncer"
+        # an "auto" source language uses any built source language for the target
+        assert get_glossary_store("cardiology", "auto", "es").lookup("cancer") == "cáncer"
+    finally:
+        open_glossary_store.cache_clear()
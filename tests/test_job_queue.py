@@ -0,0 +1,30 @@
+from db.job_queue import COMPLETED, FAILED, SQLiteJobQueue
+
+
+def test_finished_jobs_are_pruned_after_the_retention_time(tmp_path):
+    job_queue = SQLiteJobQueue(tmp_path / "jobs.sqlite3", retention=60)
+    for job_id in ("old-completed", "old-failed", "recent", "queued"):
+        job_queue.enqueue("translation", {"text": job_id}, job_id)
+    for job_id, status, age in (("old-completed", COMPLETED, 120), ("old-failed", FAILED, 120), ("recent", COMPLETED, 10)):
+        job_queue.connection.execute(
+            "UPDATE jobs SET status = ?, updated_at = updated_at - ? WHERE id = ?", (status, age, job_id)
+        )
+
+    job = job_queue.claim("worker")
+
+    assert job.id == "queued"
+    assert job_queue.get("old-completed") is None
+    assert job_queue.get("old-failed") is None
+    assert job_queue.get("recent").status == COMPLETED
+    assert job_queue.pruned == 2
+    job_queue.close()
+
+
+def test_retention_zero_keeps_finished_jobs(tmp_path):
+    job_queue = SQLiteJobQueue(tmp_path / "jobs.sqlite3", retention=0)
+    job_queue.enqueue("translation", {}, "done")
+    job_queue.connection.execute("UPDATE jobs SET status = ?, updated_at = 0 WHERE id = 'done'", (COMPLETED,))
+    assert job_queue.claim("worker") is None
+    assert job_queue.get("done").status == COMPLETED
+    assert job_queue.get_counts() == {COMPLETED: 1}
+    job_queue.close()
@@ -0,0 +1,58 @@
+import json
+import os
+
+from db import parquet_cache
+from db.parquet_cache import ensure_parquet_cache, is_cache_fresh
+
+
+def write_corpus(path, text):
+    path.write_text(json.dumps([{"_id": {"$oid": "1"}, "messages": [{"msg": text, "from": "customer"}]}]))
+
+
+def test_touched_corpus_is_hashed_once(tmp_path, monkeypatch):
+    json_path, parquet_path = tmp_path / "corpus.json", tmp_path / "corpus.parquet"
+    write_corpus(json_path, "hola")
+    ensure_parquet_cache(json_path, parquet_path)
+
+    hashes = []
+    hash_file = parquet_cache.hash_file
+    monkeypatch.setattr(parquet_cache, "hash_file", lambda path: hashes.append(path) or hash_file(path))
+    source_stat = os.stat(json_path)
+    os.utime(json_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns + 10**9))
+
+    assert is_cache_fresh(str(json_path), str(parquet_path))
+    assert is_cache_fresh(str(json_path), str(parquet_path))
+    assert len(hashes) == 1
+
+
+def test_changed_corpus_of_the_same_size_is_rebuilt(tmp_path):
+    json_path, parquet_path = tmp_path / "corpus.json", tmp_path / "corpus.parquet"
+    write_corpus(json_path, "hola")
+    ensure_parquet_cache(json_path, parquet_path)
+    source_stat = os.stat(json_path)
+    os.utime(json_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns + 10**9))
+    assert is_cache_fresh(str(json_path), str(parquet_path))
+
+    write_corpus(json_path, "adis")
+    os.utime(json_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns + 2 * 10**9))
+    assert not is_cache_fresh(str(json_path), str(parquet_path))
+    ensure_parquet_cache(json_path, parquet_path)
+    assert parquet_cache.pq.read_table(str(parquet_path)).column("msg_o").to_pylist() == ["adis"]
+    assert not os.path.exists(str(parquet_path) + parquet_cache.SOURCE_STAT_SUFFIX)
+
+
+def test_unchanged_corpus_is_not_hashed_and_a_resized_one_is_rebuilt(tmp_path, monkeypatch):
+    json_path, parquet_path = tmp_path / "corpus.json", tmp_path / "corpus.parquet"
+    write_corpus(json_path, "hola")
+    ensure_parquet_cache(json_path, parquet_path)
+
+    hashes = []
+    hash_file = parquet_cache.hash_file
+    monkeypatch.setattr(parquet_cache, "hash_file", lambda path: hashes.append(path) or hash_file(path))
+    assert is_cache_fresh(str(json_path), str(parquet_path))
+
+    write_corpus(json_path, "hola, buenos días")
+    assert not is_cache_fresh(str(json_path), str(parquet_path))
+    assert hashes == []  # a size change alone invalidates the cache
+    ensure_parquet_cache(json_path, parquet_path)
+    assert parquet_cache.pq.read_table(str(parquet_path)).column("msg_o").to_pylist() == ["hola, buenos días"]
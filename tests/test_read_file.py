@@ -0,0 +1,39 @@
+import json
+
+from db import read_file
+from db.read_file import iter_json_records
+
+
+def test_records_spanning_many_chunks_are_decoded_once_complete(tmp_path, monkeypatch):
+    records = [{"id": 1, "text": "é" * 5}, {"id": 2, "text": "a" * 10_000}, {"id": 3, "text": "ü}"}]
+    file_path = tmp_path / "corpus.json"
+    file_path.write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
+
+    attempts = []
+
+    class CountingDecoder(json.JSONDecoder):
+        def raw_decode(self, s, idx=0):
+            attempts.append(idx)
+            return super().raw_decode(s, idx)
+
+    monkeypatch.setattr(read_file.json, "JSONDecoder", CountingDecoder)
+
+    assert list(iter_json_records(str(file_path), chunk_size=16)) == records
+    # the big record is retried only when a closing brace arrives, not on each of its ~600 chunks
+    assert len(attempts) < 20
+
+
+def test_truncated_character_at_the_end_of_the_file_is_flushed(tmp_path):
+    file_path = tmp_path / "corpus.json"
+    file_path.write_bytes(b'[{"text": "x"}]\xc3')
+    assert list(iter_json_records(str(file_path))) == [{"text": "x"}]
+
+
+def test_records_cut_at_every_chunk_boundary(tmp_path):
+    records = [123456, 7, "a string", True, None, -1.5e10, [1, [2]], {"nested": {"a": [1, 2]}}, "}", 42]
+    file_path = tmp_path / "corpus.json"
+    file_path.write_text(json.dumps(records), encoding="utf-8")
+    for chunk_size in range(1, 8):
+        assert list(iter_json_records(str(file_path), chunk_size=chunk_size)) == records
+    file_path.write_text("[123456, 7]", encoding="utf-8")
+    assert list(iter_json_records(str(file_path), chunk_size=4)) == [123456, 7]
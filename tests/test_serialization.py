@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+
+from langchain_core.messages import AIMessage
+from pydantic import BaseModel
+
+from apis.utils.serialization import OrjsonResponse, dumps, loads
+from db.read_file import serialize_translation_result
+
+
+class Point(BaseModel):
+    x: int
+
+
+def graph_result():
+    return {"translated_text": "hola", "quality_score": 0.9, "service_used": "libretranslate",
+            "source_text": "hello", "target_language": "es", "translation_summary": {"status": "completed"},
+            "messages": [AIMessage(content="Router: direct_translation"), "QA: done"]}
+
+
+def test_processing_messages_are_only_serialized_for_debug():
+    serialized = serialize_translation_result(graph_result())
+    assert "processing_messages" not in serialized
+    assert serialized["translated_text"] == "hola" and serialized["success"] is True
+
+    debug = serialize_translation_result(graph_result(), include_messages=True)
+    assert debug["processing_messages"] == ["Router: direct_translation", "QA: done"]
+
+
+def test_dumps_handles_the_types_the_routes_return():
+    content = {
+        "when": datetime(2024, 1, 1, tzinfo=timezone.utc),
+        "model": Point(x=1),
+        "tags": ("a", "b"),
+        1: "non string key",
+    }
+    assert loads(dumps(content)) == {
+        "when": "2024-01-01T00:00:00+00:00", "model": {"x": 1}, "tags": ["a", "b"],
+        "1": "non string key",
+    }
+
+
+def test_orjson_response_renders_with_orjson():
+    response = OrjsonResponse({"translated_text": "hola", "score": 0.5})
+    assert response.media_type == "application/json"
+    assert loads(response.body) == {"translated_text": "hola", "score": 0.5}
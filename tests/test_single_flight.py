@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from apis.services.single_flight import SingleFlight
+
+
+def test_identical_calls_share_one_run():
+    async def scenario():
+        flights = SingleFlight()
+        runs = []
+
+        async def call():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(flights.do("key", call) for _ in range(5)))
+        return flights, runs, results
+
+    flights, runs, results = asyncio.run(scenario())
+    assert results == ["result"] * 5
+    assert len(runs) == 1
+    assert flights.get_metrics() == {"calls": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_cancelling_the_leader_keeps_the_followers_run():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def call():
+            await release.wait()
+            return "result"
+
+        leader = asyncio.create_task(flights.do("key", call))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.do("key", call))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower, len(flights)
+
+    assert asyncio.run(scenario()) == ("result", 0)
+
+
+def test_exceptions_reach_every_caller():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.01)
+            raise ValueError("backend down")
+
+        return await asyncio.gather(*(flights.do("key", call) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelling_every_caller_cancels_the_run():
+    async def scenario():
+        flights = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def call():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        callers = [asyncio.create_task(flights.do("key", call)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), 1)
+        return len(flights)
+
+    assert asyncio.run(scenario()) == 0
@@ -0,0 +1,60 @@
+import asyncio
+import json
+import threading
+
+from apis.services.cache_service import CacheService
+from apis.services.translation_service import TranslationService
+from apis.urls.stream import stream_translations
+
+
+class BlockingGraph:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def invoke(self, state, config=None):
+        self.release.wait(5)
+        return {**state, "translated_text": state["source_text"].upper(), "quality_score": 0.9, "service_used": "test"}
+
+
+class DisconnectingRequest:
+    """Sends the body at once, then reports a disconnect when gone is set"""
+    def __init__(self, lines):
+        self.lines = lines
+        self.gone = asyncio.Event()
+
+    async def stream(self):
+        for line in self.lines:
+            yield line + b"\n"
+
+    async def receive(self):
+        await self.gone.wait()
+        return {"type": "http.disconnect"}
+
+
+def record(text):
+    return json.dumps({"msg_o": text, "msg": text, "name": "customer", "ts": "2024-01-01T00:00:00Z"}).encode()
+
+
+def test_disconnect_cancels_the_translation_being_awaited():
+    graph = BlockingGraph()
+    translation_service = TranslationService(2, graph)
+
+    async def scenario():
+        request = DisconnectingRequest([record("first"), record("second")])
+        stream = stream_translations(request, "es", "stream-test", translation_service, CacheService(redis_client=None))
+        first_result = asyncio.create_task(stream.__anext__())
+        await asyncio.sleep(0.1)
+        slots_in_use = translation_service.admission.in_use
+
+        request.gone.set()
+        await asyncio.wait([first_result], timeout=1)
+        # the stream ends without waiting for the graph run
+        stream_ended = first_result.done() and isinstance(first_result.exception(), StopAsyncIteration)
+        await asyncio.sleep(0.05)
+        return slots_in_use, stream_ended, translation_service.admission.in_use, len(translation_service.flights)
+
+    try:
+        assert asyncio.run(scenario()) == (2, True, 0, 0)
+    finally:
+        graph.release.set()
+        translation_service.close()
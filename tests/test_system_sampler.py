@@ -0,0 +1,52 @@
+import time
+
+from monitoring.system_sampler import SystemSampler
+
+
+def test_sections_are_stale_until_sampled():
+    sampler = SystemSampler(sample_interval=10, probe_interval=10)
+    snapshot = sampler.get_snapshot()
+    assert snapshot["system"]["stale"] and snapshot["system"]["age_seconds"] is None
+    assert snapshot["backends"]["stale"] and snapshot["backends"]["services"] == {}
+
+
+def test_probes_record_healthy_and_failing_backends():
+    def failing():
+        raise ConnectionError("refused")
+
+    sampler = SystemSampler({"up": lambda: "hola", "empty": lambda: "", "down": failing},
+                            sample_interval=10, probe_interval=10)
+    sampler.probe_backends()
+    backends = sampler.get_backends()
+
+    assert not backends["stale"]
+    assert {name: service["status"] for name, service in backends["services"].items()} == {
+        "up": "healthy", "empty": "unhealthy", "down": "unhealthy"
+    }
+    assert backends["services"]["down"]["error"] == "refused"
+
+
+def test_old_samples_are_flagged_stale():
+    sampler = SystemSampler(sample_interval=1, probe_interval=1)
+    sampler.sample_system()
+    assert not sampler.get_system()["stale"]
+    assert set(sampler.get_system()) >= {"cpu_usage", "memory_usage", "disk_usage", "load_average"}
+
+    sampler.system_sampled_at -= 3600
+    assert sampler.get_system()["stale"]
+
+
+def test_background_threads_refresh_the_snapshot():
+    sampler = SystemSampler({"up": lambda: True}, sample_interval=0.01, probe_interval=0.01)
+    sampler.start()
+    try:
+        deadline = time.monotonic() + 5
+        while sampler.backends_probed_at is None or sampler.system_sampled_at is None:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        first_sample = sampler.system_sampled_at
+        while sampler.system_sampled_at == first_sample:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        sampler.stop()
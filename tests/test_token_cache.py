@@ -0,0 +1,32 @@
+from agent_architecture.Agents.qa_agent import get_untranslated_tokens
+from agent_architecture.Agents.router_agent import router_agent
+from agent_architecture.States.token_cache import get_tokens, tokenize, update_token_cache
+from agent_architecture.States.translation_state import get_initial_translation_state, get_relevant_context
+
+
+def test_cached_tokens_are_reused_until_the_text_changes():
+    state = get_initial_translation_state({"source_text": "Hello world."})
+    state["token_cache"] = update_token_cache(state, source_text=["cached"])
+    assert get_tokens(state, "source_text") == ["cached"]
+
+    state["source_text"] = "Hello again."
+    assert get_tokens(state, "source_text") == ["Hello", "again", "."]
+
+
+def test_router_fills_the_cache_for_the_later_agents():
+    state = get_initial_translation_state({"source_text": "My mixer hums. Any idea?"})
+    state.update(router_agent(state))
+    assert state["token_cache"]["source_text"][1] == tokenize(state["source_text"])
+
+    # the context manager reads the router's tokens instead of splitting the text again
+    state["token_cache"] = update_token_cache(state, source_text=["mixer"])
+    state["conversation_context"] = ["Source: the mixer → Target: el mezclador", "Source: drums → Target: batería"]
+    assert get_relevant_context(state) == ["Source: the mixer → Target: el mezclador"]
+
+
+def test_multiword_product_names_are_not_reported_untranslated():
+    source_tokens = tokenize("Pro Tools crashes when I open the session")
+    translated_tokens = tokenize("Pro Tools se cierra cuando abro la sesión")
+    untranslated, ratio = get_untranslated_tokens(source_tokens, translated_tokens)
+    assert untranslated == []
+    assert ratio == 0.0
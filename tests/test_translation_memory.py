@@ -0,0 +1,69 @@
+import pytest
+
+from agent_architecture.States.translation_memory import (
+    BoundedTranslationMemory, get_entry_size, get_translation_memory_store
+)
+
+
+def test_lru_evicts_the_least_recently_used_entry():
+    memory = BoundedTranslationMemory(max_entries=2, max_bytes=10_000, policy="lru")
+    memory.put("hello", "es", "hola")
+    memory.put("bye", "es", "adiós")
+    memory.get("hello", "es")
+    memory.put("thanks", "es", "gracias")
+
+    assert list(memory) == [("hello", "es"), ("thanks", "es")]
+    assert memory.get_metrics()["evictions"] == 1
+
+
+def test_lfu_evicts_the_least_frequently_used_entry():
+    memory = BoundedTranslationMemory(max_entries=2, max_bytes=10_000, policy="lfu")
+    memory.put("hello", "es", "hola")
+    memory.put("bye", "es", "adiós")
+    for _ in range(3):
+        memory.get("bye", "es")
+    memory.get("hello", "es")
+    memory.put("thanks", "es", "gracias")
+
+    assert ("bye", "es") in memory
+    assert ("hello", "es") not in memory
+    assert ("thanks", "es") in memory
+
+
+def test_byte_bound_and_accounting():
+    size_bytes = get_entry_size(("hello", "es"), "hola") + get_entry_size(("hello", "fr"), "salut")
+    memory = BoundedTranslationMemory(max_entries=100, max_bytes=size_bytes, policy="lru")
+    memory.put("hello", "es", "hola")
+    memory.put("hello", "fr", "salut")  # keyed by the target language too
+    assert memory.size_bytes == size_bytes
+    assert memory.get_metrics()["evictions"] == 0
+
+    memory.put("hello", "de", "hallo")
+    assert memory.size_bytes <= memory.max_bytes
+    assert ("hello", "es") not in memory
+
+    memory.put("long", "es", "x" * 1000)  # larger than the whole memory, never stored
+    assert ("long", "es") not in memory
+
+
+def test_hits_and_misses_are_counted():
+    memory = BoundedTranslationMemory(max_entries=10, max_bytes=10_000, policy="lru")
+    memory.put("hello", "es", "hola")
+    assert memory["hello", "es"] == "hola"
+    assert memory.get("bye", "es") is None
+    with pytest.raises(KeyError):
+        memory["bye", "es"]
+    metrics = memory.get_metrics()
+    assert (metrics["hits"], metrics["misses"]) == (1, 2)
+
+
+def test_invalid_policy_is_rejected():
+    with pytest.raises(ValueError):
+        BoundedTranslationMemory(policy="fifo")
+
+
+def test_plain_dict_memory_is_migrated_with_the_target_language():
+    state = {"target_language": "fr", "translation_memory": {"hello": "bonjour", ("bye", "es"): "adiós"}}
+    store = get_translation_memory_store(state)
+    assert store.get("hello", "fr") == "bonjour"
+    assert store.get("bye", "es") == "adiós"
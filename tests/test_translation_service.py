@@ -0,0 +1,44 @@
+import asyncio
+
+from apis.services.cache_service import CacheService
+from apis.services.translation_service import TranslationService
+
+
+class FakeGraph:
+    def __init__(self):
+        self.runs = 0
+
+    def invoke(self, state, config=None):
+        self.runs += 1
+        return {**state, "translated_text": state["source_text"].upper(), "quality_score": 0.9,
+                "service_used": "test", "messages": ["router: simple", "translation: done"]}
+
+
+def test_processing_messages_are_only_serialized_on_demand():
+    translation_service = TranslationService(2, FakeGraph())
+    try:
+        result = asyncio.run(translation_service.translate("hello"))
+        assert result.translation == "HELLO"
+        assert result.agent_history == []
+
+        result = asyncio.run(translation_service.translate("hello", include_messages=True))
+        assert result.agent_history == ["router: simple", "translation: done"]
+    finally:
+        translation_service.close()
+
+
+def test_cached_translation_leaves_the_agent_history_out():
+    translation_service = TranslationService(2, FakeGraph())
+    cache_service = CacheService(redis_client=None)
+
+    async def translate_and_cache():
+        result = await translation_service.translate("hello", include_messages=True)
+        await cache_service.cache_translation("hello", "auto", "es", result)
+        return await cache_service.get_translation("hello", "auto", "es")
+
+    try:
+        cached = asyncio.run(translate_and_cache())
+    finally:
+        translation_service.close()
+    assert cached["translation"] == "HELLO"
+    assert "agent_history" not in cached
@@ -0,0 +1,71 @@
+import threading
+
+from db.memory_store import SQLiteMemoryStore
+from db.write_behind import WriteBehindQueue
+
+
+class RecordingStore:
+    def __init__(self):
+        self.batches = []
+        self.written = threading.Event()
+
+    def write_batch(self, records):
+        self.batches.append(list(records))
+        self.written.set()
+
+
+def test_flush_when_the_batch_is_full():
+    store = RecordingStore()
+    write_behind = WriteBehindQueue(store, batch_size=3, flush_interval=60)
+    write_behind.start()
+    for index in range(3):
+        write_behind.enqueue_conversation_context("session", f"entry {index}")
+
+    assert store.written.wait(5)
+    assert [len(batch) for batch in store.batches] == [3]
+    write_behind.close()
+
+
+def test_flush_after_the_interval():
+    store = RecordingStore()
+    write_behind = WriteBehindQueue(store, batch_size=100, flush_interval=0.05)
+    write_behind.start()
+    write_behind.enqueue_translation_memory("hello", "es", "hola")
+
+    assert store.written.wait(5)
+    assert store.batches == [[("translation_memory", "hello", "es", "hola")]]
+    write_behind.close()
+
+
+def test_close_flushes_the_pending_records():
+    store = RecordingStore()
+    write_behind = WriteBehindQueue(store, batch_size=100, flush_interval=60)
+    write_behind.start()
+    write_behind.enqueue_translation_memory("hello", "es", "hola")
+    write_behind.enqueue_translation_memory("bye", "es", "adiós")
+    write_behind.close()
+
+    assert [len(batch) for batch in store.batches] == [2]
+    assert write_behind.get_metrics()["flushed"] == 2
+    assert not write_behind.enqueue_translation_memory("late", "es", "tarde")
+
+
+def test_full_queue_drops_the_update():
+    write_behind = WriteBehindQueue(RecordingStore(), max_queue_size=1, put_timeout=0.01)
+    assert write_behind.enqueue_translation_memory("hello", "es", "hola")
+    assert not write_behind.enqueue_translation_memory("bye", "es", "adiós")
+    assert write_behind.get_metrics()["dropped"] == 1
+
+
+def test_records_reach_the_sqlite_store(tmp_path):
+    store = SQLiteMemoryStore(tmp_path / "memory.sqlite3", context_size=2)
+    write_behind = WriteBehindQueue(store, batch_size=100, flush_interval=60)
+    write_behind.start()
+    write_behind.enqueue_translation_memory("hello", "es", "hola")
+    for index in range(3):
+        write_behind.enqueue_conversation_context("session", f"entry {index}")
+    write_behind.close()
+
+    assert store.get_translation("hello", "es") == "hola"
+    assert store.get_conversation_context("session") == ["entry 1", "entry 2"]
+    store.close()
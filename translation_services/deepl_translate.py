@@ -1,4 +1,4 @@
-from Translator.base_translate import TranslateText
+from translation_services.base_translate import TranslateText
 
 
 class DeeplTranslate(TranslateText):
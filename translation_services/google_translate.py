@@ -1,4 +1,4 @@
-from Translator.base_translate import TranslateText
+from translation_services.base_translate import TranslateText
 
 class GoogleTranslate(TranslateText):
     def translate_text(self, data:dict, source_lang:str, target_lang:str):
@@ -1,25 +1,39 @@
+import logging
 import requests
-from Translator.base_translate import TranslateText
-from monitoring.monitoring import setup_logging
+from translation_services.base_translate import TranslateText
+from config.settings import config
 
-logger = setup_logging(__name__)
+logger = logging.getLogger(__name__)
 
 class LibreTranslate(TranslateText):
     def __init__(self):
-        self.base_url = "https://libretranslate.com/"
+        self.base_url = config.LIBRETRANSLATE_URL.rstrip("/") + "/"
         self.headers = {"Content-Type": "application/json"}
 
-    def translate_text(self, data:dict, source_language:str="auto", target_language:str="es"):
-        translated_text = self.libre_translate(data, source_language, target_language)
-        
+    def translate_text(self, data, source_language:str="auto", target_language:str="es"):
+        """
+        Translate a text (or a message dict with value_o/value) and return the text with its confidence.
+        LibreTranslate only reports a confidence for the detected language, a translation of an
+        explicit source language gets LIBRETRANSLATE_CONFIDENCE.
+        """
+        if isinstance(data, str):
+            data = {"value": data}
+        response_json = self.libre_translate(data, source_language, target_language)
+        translated_text = response_json.get("translatedText") or ""
+        detected_language = response_json.get("detectedLanguage") or {}
+        if not translated_text:
+            confidence = 0.0
+        elif detected_language.get("confidence") is not None:
+            confidence = detected_language["confidence"] / 100
+        else:
+            confidence = config.LIBRETRANSLATE_CONFIDENCE
+
         return {
-        "source_language": source_language,
+        "source_language": detected_language.get("language", source_language),
         "target_language": target_language,
         "source_text": data["value_o"] if data.get("value_o") else data["value"],
-        'translated_text': translated_text.get('translatedText'),
-        'confidence': translated_text.get('confidence', 0),
-        'quality_metrics': self.calculate_quality_metrics(data["value_o"], translated_text.get('translatedText')),
-        'agent_decision': self.make_agent_decision(self.calculate_quality_metrics(data["value_o"], translated_text.get('translatedText')))
+        'translated_text': translated_text,
+        'confidence': confidence,
         }
     
     def libre_translate(self, data:dict, source_language:str="auto", target_language:str="es", detect_language:bool=False):
@@ -42,6 +56,7 @@ class LibreTranslate(TranslateText):
             target_language: str: The target language of the text. Default is "es".
 
         Returns:
+            dict: The response json, or the detectedLanguage when detect_language is set
         """
         try:
             url = self.base_url + "translate"
@@ -50,8 +65,10 @@ class LibreTranslate(TranslateText):
                 "source": data.get("source_lang", source_language),
                 "target": target_language,
             }
+            if config.LIBRETRANSLATE_API_KEY:
+                payload["api_key"] = config.LIBRETRANSLATE_API_KEY
             res = requests.post(url,
-                                payload,
+                                json=payload,
                                 headers=self.headers,
                                 timeout=10)
             
@@ -61,7 +78,7 @@ class LibreTranslate(TranslateText):
             if detect_language:
                 return response_json.get("detectedLanguage")
             else:
-                return response_json.get("translatedText")
+                return response_json
 
         except requests.exceptions.RequestException as e:
             logger.error(f"LibreTranslate API error: {str(e)}")
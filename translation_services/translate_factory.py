@@ -1,7 +1,7 @@
-from Translator.base_translate import TranslateText
-from Translator.google_translate import GoogleTranslate
-from Translator.libre_translate import LibreTranslate
-from Translator.deepl_translate import DeeplTranslate
+from translation_services.base_translate import TranslateText
+from translation_services.google_translate import GoogleTranslate
+from translation_services.libre_translate import LibreTranslate
+from translation_services.deepl_translate import DeeplTranslate
 
 
 